@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare single-process and partitioned duplicate grouping on a synthetic library.
+
+Reports wall time and the CPU time of the parent process, which bounds the
+speedup: the workers run in parallel, the parent does not.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_duplicate_workers.py [TRACKS] [WORKERS...]
+"""
+
+import random
+import sys
+import time
+
+from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector
+from musiclist_for_soundiiz.parallel_duplicates import PartitionedDuplicateDetector
+
+
+def make_library(size, seed=5):
+    """Create tracks where about a quarter of the titles repeat."""
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"Song {rng.randrange(size // 4)}",
+            "artist": f"Artist {i % 97}",
+            "duration": str(rng.randrange(120, 300)),
+            "file_path": f"/music/{i}.mp3",
+        }
+        for i in range(size)
+    ]
+
+
+def measure(label, run):
+    """Run once and print the wall and parent CPU time."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = run()
+    print(
+        f"{label:<28} wall {time.perf_counter() - wall:6.2f}s  "
+        f"parent cpu {time.process_time() - cpu:6.2f}s"
+    )
+    return result
+
+
+def main():
+    """Run the benchmark."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or [2, 4]
+    library = make_library(size)
+    detector = DuplicateDetector()
+
+    expected = measure("single process", lambda: detector.build_index(library))
+
+    def complete(workers):
+        return PartitionedDuplicateDetector(detector, workers=workers).build_index(library)
+
+    def streamed(workers):
+        partitioned = PartitionedDuplicateDetector(detector, workers=workers)
+        for metadata in library:
+            partitioned.add(metadata)
+        return partitioned.build_index(library)
+
+    for workers in worker_counts:
+        for mode, build in (("complete list", complete), ("streamed", streamed)):
+            label = f"{workers} workers, {mode}"
+            index = measure(label, lambda: build(workers))  # noqa: B023 - called right away
+            if index.groups != expected.groups:
+                sys.exit(f"{label}: groups differ from the single-process result")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,20 @@ __version__ = "1.0.8"
 __author__ = "Luc Muss"
 __license__ = "MIT"
 
+from .bloom_filter import BloomFilter
 from .cli import main
+from .duplicate_detector import DuplicateDetector, DuplicateIndex
 from .exporter import CSVExporter, JSONExporter, M3UExporter
 from .extractor import MusicFileExtractor
+from .incremental_index import IncrementalDuplicateIndex
 
 __all__ = [
     "main",
     "MusicFileExtractor",
+    "DuplicateDetector",
+    "DuplicateIndex",
+    "IncrementalDuplicateIndex",
+    "BloomFilter",
     "CSVExporter",
     "JSONExporter",
     "M3UExporter",
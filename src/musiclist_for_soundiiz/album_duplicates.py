@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Album-level duplicate detection with MinHash signatures and LSH."""
+
+import hashlib
+import logging
+import os
+import random
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from .duplicate_detector import DuplicateDetector
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY = ("directory", "album")
+
+# Mersenne prime for the universal hash family
+_PRIME = (1 << 61) - 1
+
+
+def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) with bands * rows == num_perm for an LSH threshold.
+
+    Pairs with Jaccard similarity s become candidates with probability
+    1 - (1 - s^rows)^bands. The split whose threshold (1/bands)^(1/rows) is
+    the highest one not above the requested threshold is chosen, so similar
+    albums are rarely missed.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class AlbumDuplicateFinder:
+    """
+    Find near-identical albums stored in different places.
+
+    Each album (directory or album tag) becomes a set of normalized track
+    keys. Sets are summarized by MinHash signatures and split into LSH
+    bands, so only albums sharing a band are compared instead of all pairs.
+    Candidate pairs are scored by the exact Jaccard similarity of their sets.
+    """
+
+    def __init__(
+        self,
+        detector: Optional[DuplicateDetector] = None,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        group_by: str = "directory",
+        min_tracks: int = 3,
+        seed: int = 1,
+    ):
+        """
+        Initialize the finder.
+
+        Args:
+            detector: Detector whose track keys are compared
+            threshold: Minimum Jaccard similarity of two albums
+            num_perm: Number of MinHash permutations
+            group_by: 'directory' or 'album' (album and artist tags)
+            min_tracks: Albums with fewer distinct tracks are ignored
+            seed: Seed of the hash permutations
+
+        Raises:
+            ValueError: If an argument is out of range
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Invalid threshold: {threshold}")
+        if num_perm < 1:
+            raise ValueError(f"Invalid number of permutations: {num_perm}")
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unknown grouping: {group_by}")
+
+        self.detector = detector or DuplicateDetector()
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.group_by = group_by
+        self.min_tracks = min_tracks
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)
+        ]
+
+    def _album_id(self, metadata: Dict[str, str]) -> Optional[str]:
+        """Get the album a track belongs to."""
+        if self.group_by == "directory":
+            file_path = metadata.get("file_path")
+            return os.path.dirname(file_path) if file_path else None
+
+        album = metadata.get("album", "").strip()
+        if not album:
+            return None
+        artist = metadata.get("artist", "").strip()
+        return f"{album} - {artist}" if artist else album
+
+    def album_sets(self, metadata_list: List[Dict[str, str]]) -> Dict[str, FrozenSet[str]]:
+        """
+        Build the track key set of every album.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+
+        Returns:
+            Mapping of album id to its set of track keys (small albums omitted)
+        """
+        albums: Dict[str, Set[str]] = {}
+        for metadata in metadata_list:
+            album_id = self._album_id(metadata)
+            key = self.detector.track_key(metadata)
+            if album_id is not None and key is not None:
+                albums.setdefault(album_id, set()).add(key)
+
+        return {
+            album_id: frozenset(keys)
+            for album_id, keys in albums.items()
+            if len(keys) >= self.min_tracks
+        }
+
+    def signature(self, keys: FrozenSet[str]) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a key set.
+
+        Args:
+            keys: Non-empty set of track keys
+
+        Returns:
+            Tuple of num_perm minimum hash values
+        """
+        values = [
+            int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+            for key in keys
+        ]
+        return tuple(min((a * x + b) % _PRIME for x in values) for a, b in self._permutations)
+
+    def find(self, metadata_list: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Find pairs of near-identical albums.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+
+        Returns:
+            List of matches sorted by descending similarity, each a dictionary
+            with albums (pair of album ids), similarity, shared and tracks
+            (track counts of both albums)
+        """
+        sets = self.album_sets(metadata_list)
+        album_ids = sorted(sets)
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        for index, album_id in enumerate(album_ids):
+            signature = self.signature(sets[album_id])
+            for band in range(self.bands):
+                band_values = signature[band * self.rows : (band + 1) * self.rows]
+                buckets.setdefault((band, band_values), []).append(index)
+
+        candidates: Set[Tuple[int, int]] = set()
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1 :]:
+                    candidates.add((first, second))
+
+        matches: List[Dict[str, Any]] = []
+        for first, second in candidates:
+            first_set, second_set = sets[album_ids[first]], sets[album_ids[second]]
+            shared = len(first_set & second_set)
+            similarity = shared / len(first_set | second_set)
+            if similarity >= self.threshold:
+                matches.append(
+                    {
+                        "albums": (album_ids[first], album_ids[second]),
+                        "similarity": similarity,
+                        "shared": shared,
+                        "tracks": (len(first_set), len(second_set)),
+                    }
+                )
+
+        matches.sort(key=lambda match: (-match["similarity"], match["albums"]))
+        logger.info(
+            f"Album duplicates: {len(matches)} matches from {len(candidates)} "
+            f"candidate pairs among {len(album_ids)} albums"
+        )
+        return matches
+
+
+def format_album_report(matches: List[Dict[str, Any]]) -> str:
+    """
+    Generate a human-readable report of duplicate albums.
+
+    Args:
+        matches: Matches as returned by AlbumDuplicateFinder.find()
+
+    Returns:
+        Formatted report string
+    """
+    if not matches:
+        return "No duplicate albums found."
+
+    lines = [f"Found {len(matches)} duplicate album pairs:\n"]
+    for i, match in enumerate(matches, 1):
+        first, second = match["albums"]
+        first_count, second_count = match["tracks"]
+        lines.append(f"{i}. {match['similarity']:.0%} similar ({match['shared']} shared tracks)")
+        lines.append(f"   [1] {first} ({first_count} tracks)")
+        lines.append(f"   [2] {second} ({second_count} tracks)")
+        lines.append("")
+
+    return "\n".join(lines)
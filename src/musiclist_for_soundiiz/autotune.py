@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Adaptive concurrency for metadata extraction."""
+
+import logging
+import time
+from typing import Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of workers for --jobs auto
+AUTO_MAX_JOBS = 32
+
+
+class ConcurrencyTuner:
+    """
+    Find the number of extraction workers at the throughput knee.
+
+    Completed files are measured in windows of at least ``window_seconds``
+    and ``window_files`` files. Probing starts upwards: the number of jobs
+    doubles as long as a window is at least ``GAIN`` times faster than the
+    best one so far, then the tuner settles on the best level. Once settled,
+    a window whose throughput moves by more than ``CHANGE`` (e.g. the scan
+    moved from cached to uncached files) starts a new probe: upwards if the
+    throughput rose, otherwise downwards, halving the jobs as long as that
+    costs less than the ``GAIN`` factor.
+    """
+
+    GAIN = 1.1
+    CHANGE = 0.25
+
+    def __init__(
+        self,
+        min_jobs: int = 1,
+        max_jobs: int = AUTO_MAX_JOBS,
+        window_seconds: float = 1.0,
+        window_files: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the tuner.
+
+        Args:
+            min_jobs: Lowest number of jobs (also the starting point)
+            max_jobs: Highest number of jobs
+            window_seconds: Minimum duration of a measurement window
+            window_files: Minimum number of files of a measurement window
+            clock: Time source in seconds
+
+        Raises:
+            ValueError: If the job bounds are invalid
+        """
+        if not 1 <= min_jobs <= max_jobs:
+            raise ValueError(f"Invalid job bounds: {min_jobs}-{max_jobs}")
+
+        self.min_jobs = min_jobs
+        self.max_jobs = max_jobs
+        self.window_seconds = window_seconds
+        self.window_files = window_files
+        self.jobs = min_jobs
+        # (jobs, files/s, seconds/file) of every window
+        self.history: List[Tuple[int, float, float]] = []
+        self._clock = clock
+        # Probe direction: 1 up, -1 down, 0 settled
+        self._direction = 1
+        # Best level of the current probe (no rate measured yet: 0.0)
+        self._best_jobs = min_jobs
+        self._best_rate = 0.0
+        self._window_start = clock()
+        self._latencies: List[float] = []
+
+    @property
+    def probing(self) -> bool:
+        """Whether the tuner is still searching for the knee."""
+        return self._direction != 0
+
+    def record(self, latency: float) -> int:
+        """
+        Record a completed file.
+
+        Args:
+            latency: Seconds spent on the file
+
+        Returns:
+            Number of jobs to run from now on
+        """
+        self._latencies.append(latency)
+        now = self._clock()
+        elapsed = now - self._window_start
+        if elapsed < self.window_seconds or len(self._latencies) < max(
+            self.window_files, 2 * self.jobs
+        ):
+            return self.jobs
+
+        rate = len(self._latencies) / elapsed
+        mean_latency = sum(self._latencies) / len(self._latencies)
+        self._latencies = []
+        self._window_start = now
+        self.history.append((self.jobs, rate, mean_latency))
+        self._adjust(rate, f"{rate:.1f} files/s, {mean_latency * 1000:.0f} ms/file")
+        return self.jobs
+
+    def _step(self, rate: float) -> None:
+        """Keep the current level as the best one and move one step on."""
+        self._best_jobs, self._best_rate = self.jobs, rate
+        if self._direction > 0:
+            self.jobs = min(self.jobs * 2, self.max_jobs)
+        else:
+            self.jobs = max(self.jobs // 2, self.min_jobs)
+
+    def _adjust(self, rate: float, measured: str) -> None:
+        """Choose the jobs for the next window."""
+        previous = self.jobs
+
+        if not self.probing:
+            if abs(rate - self._best_rate) <= self._best_rate * self.CHANGE:
+                return
+            self._direction = 1 if rate > self._best_rate else -1
+            self._step(rate)
+            logger.info(
+                f"Extraction autotune: throughput changed ({measured}), "
+                f"probing {previous} -> {self.jobs} jobs"
+            )
+        elif (
+            rate > self._best_rate * self.GAIN
+            if self._direction > 0
+            else rate * self.GAIN >= self._best_rate
+        ):
+            self._step(rate)
+            if self.jobs == previous:
+                self._direction = 0
+                logger.info(f"Extraction autotune: settled at {self.jobs} jobs ({measured})")
+            else:
+                logger.info(f"Extraction autotune: {previous} -> {self.jobs} jobs ({measured})")
+        else:
+            self.jobs = self._best_jobs
+            self._direction = 0
+            logger.info(
+                f"Extraction autotune: knee at {self.jobs} jobs ({self._best_rate:.1f} files/s; "
+                f"{previous} jobs gave {measured})"
+            )
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""On-disk Bloom filter of previously exported track keys."""
+
+import hashlib
+import logging
+import math
+import mmap
+import struct
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Set, Tuple, Union
+
+from .duplicate_detector import DuplicateDetector
+from .export_history import iter_exported_tracks
+from .fileutil import atomic_write
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MLBF"
+FORMAT_VERSION = 1
+# Magic, format version, number of hashes, number of bits, number of keys
+_HEADER = struct.Struct("<4sIIQQ")
+
+
+def _hashes(key: str) -> Tuple[int, int]:
+    """Get the two base hashes used for double hashing."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """
+    Probabilistic set of normalized track keys.
+
+    Membership tests never miss an added key but report keys that were never
+    added with the configured false-positive rate. The bit array is saved to
+    a file that open() memory-maps read-only, so a filter of tens of millions
+    of keys is usable without loading it (about 1.8 bytes per key at 0.1%).
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int):
+        """
+        Create an empty in-memory filter.
+
+        Args:
+            num_bits: Size of the bit array
+            num_hashes: Number of bits set per key
+
+        Raises:
+            ValueError: If a size is not positive
+        """
+        if num_bits < 1 or num_hashes < 1:
+            raise ValueError(f"Invalid Bloom filter size: {num_bits} bits, {num_hashes} hashes")
+
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = 0
+        self._bits: Union[bytearray, memoryview] = bytearray((num_bits + 7) // 8)
+        self._mmap: Optional[mmap.mmap] = None
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = 0.001) -> "BloomFilter":
+        """
+        Create a filter sized for a number of keys and a false-positive rate.
+
+        Args:
+            capacity: Expected number of keys
+            false_positive_rate: Target false-positive rate (0.0-1.0, exclusive)
+
+        Returns:
+            Empty filter
+
+        Raises:
+            ValueError: If the rate is out of range
+        """
+        if not 0.0 < false_positive_rate < 1.0:
+            raise ValueError(f"Invalid false-positive rate: {false_positive_rate}")
+
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        first, second = _hashes(key)
+        return ((first + i * second) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        """
+        Add a normalized key.
+
+        Args:
+            key: Normalized key string
+
+        Raises:
+            TypeError: If the filter is memory-mapped (read-only)
+        """
+        if self._mmap is not None:
+            raise TypeError("Memory-mapped Bloom filter is read-only")
+
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: object) -> bool:
+        """Check whether a key was probably added."""
+        if not isinstance(key, str):
+            return False
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        """Return the number of keys added."""
+        return self.count
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate for the number of keys added."""
+        return (1.0 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path: str) -> None:
+        """
+        Write the filter to a file (atomically).
+
+        Args:
+            path: Destination file
+        """
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, self.num_hashes, self.num_bits, self.count)
+        atomic_write(Path(path), header + bytes(self._bits))
+        logger.info(
+            f"Saved Bloom filter with {self.count} keys to {path} "
+            f"({len(self._bits)} bytes, expected false-positive rate "
+            f"{self.false_positive_rate:.4%})"
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "BloomFilter":
+        """
+        Memory-map a filter written by save() (read-only).
+
+        Args:
+            path: Filter file
+
+        Returns:
+            Read-only filter backed by the file
+
+        Raises:
+            ValueError: If the file is not a Bloom filter of this format
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(mapped) < _HEADER.size:
+                raise ValueError(f"Not a Bloom filter file: {path}")
+            magic, version, num_hashes, num_bits, count = _HEADER.unpack_from(mapped)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Not a Bloom filter file: {path}")
+            if len(mapped) != _HEADER.size + (num_bits + 7) // 8:
+                raise ValueError(f"Truncated Bloom filter file: {path}")
+        except ValueError:
+            mapped.close()
+            raise
+
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.count = count
+        bloom._mmap = mapped
+        bloom._bits = memoryview(mapped)[_HEADER.size :]
+        return bloom
+
+    def close(self) -> None:
+        """Unmap the file of a memory-mapped filter."""
+        if self._mmap is not None:
+            if isinstance(self._bits, memoryview):
+                self._bits.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "BloomFilter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def build_from_exports(
+    export_path: str,
+    filter_path: str,
+    false_positive_rate: float = 0.001,
+    detector: Optional[DuplicateDetector] = None,
+) -> BloomFilter:
+    """
+    Build a Bloom filter file from the tracks of previous exports.
+
+    The exports are streamed twice: once to count the keys for sizing the
+    filter and once to add them.
+
+    Args:
+        export_path: Export file, base path of a split export or directory
+        filter_path: Destination of the filter file
+        false_positive_rate: Target false-positive rate
+        detector: Detector whose key normalization is used
+
+    Returns:
+        The filter (in memory)
+    """
+    detector = detector or DuplicateDetector()
+
+    capacity = sum(
+        1 for metadata in iter_exported_tracks(export_path) if detector.track_key(metadata)
+    )
+    bloom = BloomFilter.for_capacity(capacity, false_positive_rate)
+    for metadata in iter_exported_tracks(export_path):
+        key = detector.track_key(metadata)
+        if key is not None:
+            bloom.add(key)
+
+    bloom.save(filter_path)
+    return bloom
+
+
+def exact_confirmer(
+    export_path: str, detector: Optional[DuplicateDetector] = None
+) -> Callable[[Set[str]], Set[str]]:
+    """
+    Create a function that checks candidate keys against the exports exactly.
+
+    Args:
+        export_path: Export file, base path of a split export or directory
+        detector: Detector whose key normalization is used
+
+    Returns:
+        Function taking probable keys and returning those really exported
+    """
+    detector = detector or DuplicateDetector()
+
+    def confirm(candidates: Set[str]) -> Set[str]:
+        found: Set[str] = set()
+        if not candidates:
+            return found
+        for metadata in iter_exported_tracks(export_path):
+            key = detector.track_key(metadata)
+            if key in candidates:
+                found.add(key)
+                if len(found) == len(candidates):
+                    break
+        return found
+
+    return confirm
@@ -3,14 +3,25 @@
 
 import argparse
 import logging
+import re
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 
 from . import __version__
+from .album_duplicates import AlbumDuplicateFinder, format_album_report
+from .bloom_filter import BloomFilter, build_from_exports, exact_confirmer
+from .content_duplicates import ContentDuplicateFinder
 from .duplicate_detector import DuplicateDetector
-from .exporter import get_exporter
+from .export_history import filter_new_tracks, load_exported_keys
+from .exporter import BaseExporter, CSVExporter, get_exporter
+from .external_dedup import ExternalDeduplicator
 from .extractor import MusicFileExtractor
+from .mmap_reader import READ_BACKENDS
+from .parallel_duplicates import PartitionedDuplicateDetector
+from .scanner import normalize_roots, scan_roots
+from .schedule import SCHEDULES, benchmark_schedules
+from .soundiiz_diff import diff_library
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +41,54 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
+def memory_size(text: str) -> int:
+    """
+    Parse a memory size such as ``512M`` or ``2G`` (binary units).
+
+    Args:
+        text: Number of bytes with an optional K, M or G suffix
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        argparse.ArgumentTypeError: If the size is invalid
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMG]?)(?:I?B)?", text.strip().upper())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"invalid memory size: {text!r}")
+
+    units = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    size = int(float(match.group(1)) * units[match.group(2)])
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"memory size must be positive: {text!r}")
+    return size
+
+
+def job_count(text: str) -> Union[int, str]:
+    """
+    Parse a number of extraction jobs: a positive integer or ``auto``.
+
+    Args:
+        text: Command-line value
+
+    Returns:
+        Number of jobs, or 'auto'
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is invalid
+    """
+    if text.strip().lower() == "auto":
+        return "auto"
+    try:
+        jobs = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of jobs: {text!r}") from None
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"number of jobs must be at least 1: {text!r}")
+    return jobs
+
+
 def parse_args(args: Optional[list] = None) -> argparse.Namespace:
     """
     Parse command-line arguments.
@@ -63,6 +122,9 @@ Examples:
   # Detect and remove duplicates
   musiclist-for-soundiiz -i /path/to/music --remove-duplicates -o output.csv
 
+  # Export only songs missing from an existing Soundiiz CSV
+  musiclist-for-soundiiz -i /path/to/music --diff-against soundiiz.csv -o missing.csv
+
   # Save duplicate detection report
   musiclist-for-soundiiz -i /path/to/music --detect-duplicates --duplicate-report duplicates.txt
 
@@ -117,6 +179,102 @@ Supported audio formats:
         action="store_true",
         help="Don't scan subdirectories recursively",
     )
+    scan_group.add_argument(
+        "-j",
+        "--jobs",
+        type=job_count,
+        default=1,
+        metavar="N|auto",
+        help=(
+            "Number of files extracted in parallel, or 'auto' to tune it to the measured "
+            "throughput while scanning (default: 1)"
+        ),
+    )
+    scan_group.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        metavar="K",
+        help=(
+            "Read the headers of the next K files ahead while parsing and drop parsed "
+            "files from the page cache (Linux only, default: 0)"
+        ),
+    )
+    scan_group.add_argument(
+        "--read-backend",
+        choices=READ_BACKENDS,
+        default="read",
+        help=(
+            "How tags are read: regular reads, or memory-mapped files on local "
+            "filesystems (default: read)"
+        ),
+    )
+    scan_group.add_argument(
+        "--schedule",
+        choices=SCHEDULES,
+        default="path",
+        help=(
+            "Order in which files are read: by path, by inode, or by physical disk offset "
+            "(FIEMAP, Linux) to reduce seeks on spinning disks. Output order is unchanged "
+            "(default: path)"
+        ),
+    )
+    scan_group.add_argument(
+        "--benchmark-schedule",
+        action="store_true",
+        help="Measure how fast file headers are read in each --schedule order, then exit",
+    )
+    scan_group.add_argument(
+        "--list-aliases",
+        action="store_true",
+        help=(
+            "List every path of hardlinked or symlinked files (parsed once) instead of "
+            "only the first"
+        ),
+    )
+    scan_group.add_argument(
+        "--walk-jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Number of threads listing subdirectories in parallel, useful on network "
+            "filesystems (default: 1)"
+        ),
+    )
+    scan_group.add_argument(
+        "--max-read-mbps",
+        type=float,
+        metavar="MB",
+        help=(
+            "Limit the rate at which file contents are read across all extraction "
+            "threads, e.g. on shared storage (MB/s, default: unlimited)"
+        ),
+    )
+    scan_group.add_argument(
+        "--max-files-per-sec",
+        type=float,
+        metavar="N",
+        help="Limit the number of files opened per second (default: unlimited)",
+    )
+    scan_group.add_argument(
+        "--file-timeout",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Parse files in worker processes and skip a file (restarting its worker) "
+            "after this many seconds"
+        ),
+    )
+    scan_group.add_argument(
+        "--file-memory-limit",
+        type=memory_size,
+        metavar="SIZE",
+        help=(
+            "Parse files in worker processes limited to this much memory (e.g. 512M; "
+            "Unix only) and skip files that need more"
+        ),
+    )
 
     # Export options
     export_group = parser.add_argument_group("Export Options")
@@ -131,6 +289,84 @@ Supported audio formats:
         action="store_true",
         help="Disable pretty-printing for JSON output",
     )
+    export_group.add_argument(
+        "--write-manifest",
+        action="store_true",
+        help="Write a manifest listing each output file's SHA-256 hash and song count",
+    )
+    export_group.add_argument(
+        "--since-export",
+        type=str,
+        metavar="PATH",
+        help=(
+            "Only export songs not contained in a previous CSV/JSON export "
+            "(file, base path of split files, or directory)"
+        ),
+    )
+
+    export_group.add_argument(
+        "--seen-filter",
+        type=str,
+        metavar="FILE",
+        help=(
+            "Bloom filter of previously exported songs; songs probably in it are not "
+            "exported. Built from --seen-source if FILE does not exist"
+        ),
+    )
+    export_group.add_argument(
+        "--seen-source",
+        type=str,
+        metavar="PATH",
+        help="Previous CSV/JSON exports used to build --seen-filter and by --confirm-seen",
+    )
+    export_group.add_argument(
+        "--seen-fpr",
+        type=float,
+        default=0.001,
+        metavar="RATE",
+        help="False-positive rate when building --seen-filter (default: 0.001)",
+    )
+    export_group.add_argument(
+        "--confirm-seen",
+        action="store_true",
+        help="Check songs matched by --seen-filter exactly against --seen-source",
+    )
+    export_group.add_argument(
+        "--keep-seen",
+        action="store_true",
+        help="Only report songs matched by --seen-filter instead of dropping them",
+    )
+
+    export_group.add_argument(
+        "--max-memory",
+        type=memory_size,
+        metavar="SIZE",
+        help=(
+            "Bound memory use (e.g. 512M, 2G): metadata and duplicate keys are spilled "
+            "to temporary files and merged from disk. Supports exact duplicate removal "
+            "and --since-export"
+        ),
+    )
+
+    # Diff options
+    diff_group = parser.add_argument_group("Soundiiz Diff")
+    diff_group.add_argument(
+        "--diff-against",
+        type=str,
+        metavar="CSV",
+        help=(
+            "Compare the library with an existing Soundiiz CSV and export only "
+            "local songs missing from it"
+        ),
+    )
+    diff_group.add_argument(
+        "--remote-only-output",
+        type=str,
+        metavar="FILE",
+        help=(
+            "CSV file for Soundiiz entries without a local file (default: <output>_remote_only.csv)"
+        ),
+    )
 
     # Duplicate detection options
     dup_group = parser.add_argument_group("Duplicate Detection")
@@ -150,12 +386,98 @@ Supported audio formats:
         default="keep_first",
         help="Strategy for keeping duplicates (default: keep_first)",
     )
+    dup_group.add_argument(
+        "--isrc-duplicates",
+        action="store_true",
+        help="Match duplicates by ISRC first; title/artist is only used for songs without ISRC",
+    )
+    dup_group.add_argument(
+        "--content-duplicates",
+        action="store_true",
+        help=(
+            "Match duplicates by hashing the audio data (ignoring tags) instead of "
+            "title/artist; finds byte-identical files that were re-tagged or renamed"
+        ),
+    )
+    dup_group.add_argument(
+        "--hash-cache",
+        type=str,
+        metavar="FILE",
+        help="Persistent cache of audio hashes for --content-duplicates",
+    )
+    dup_group.add_argument(
+        "--hash-workers",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Number of parallel hashing workers for --content-duplicates (default: 4)",
+    )
+    dup_group.add_argument(
+        "--duplicate-workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Group duplicates in N worker processes, partitioned by key while "
+            "scanning (default: 1; fuzzy and ISRC matching always use one process)"
+        ),
+    )
+    dup_group.add_argument(
+        "--fuzzy-duplicates",
+        action="store_true",
+        help=(
+            "Fuzzy matching: ignore accents, punctuation and remaster/live/feat. "
+            "suffixes and merge similar titles"
+        ),
+    )
+    dup_group.add_argument(
+        "--similarity-threshold",
+        type=float,
+        default=0.9,
+        metavar="RATIO",
+        help="Minimum similarity (0.0-1.0) for fuzzy matching (default: 0.9)",
+    )
+    dup_group.add_argument(
+        "--duration-tolerance",
+        type=int,
+        metavar="SECONDS",
+        help=(
+            "Only treat songs as duplicates if their durations differ by at most "
+            "SECONDS (keeps radio edits and extended mixes apart)"
+        ),
+    )
     dup_group.add_argument(
         "--duplicate-report",
         type=str,
         metavar="FILE",
         help="Save duplicate detection report to file",
     )
+    dup_group.add_argument(
+        "--duplicate-report-format",
+        choices=["text", "jsonl"],
+        help=(
+            "Format of --duplicate-report: text, or jsonl with one JSON object per "
+            "group (default: jsonl for .jsonl files, text otherwise)"
+        ),
+    )
+    dup_group.add_argument(
+        "--album-duplicates",
+        action="store_true",
+        help="Detect copies of whole albums stored in different directories",
+    )
+    dup_group.add_argument(
+        "--album-similarity",
+        type=float,
+        default=0.8,
+        metavar="RATIO",
+        help="Minimum share of common tracks (0.0-1.0) for duplicate albums (default: 0.8)",
+    )
+    dup_group.add_argument(
+        "--album-report",
+        type=str,
+        metavar="FILE",
+        help="Save duplicate album report to file",
+    )
 
     # Logging options
     log_group = parser.add_argument_group("Logging")
@@ -178,9 +500,232 @@ Supported audio formats:
     if parsed_args.quiet and parsed_args.verbose:
         parser.error("Cannot use --quiet and --verbose together")
 
+    if not 0.0 < parsed_args.similarity_threshold <= 1.0:
+        parser.error("--similarity-threshold must be between 0.0 and 1.0")
+
+    if not 0.0 < parsed_args.album_similarity <= 1.0:
+        parser.error("--album-similarity must be between 0.0 and 1.0")
+
+    if parsed_args.duplicate_workers < 1:
+        parser.error("--duplicate-workers must be at least 1")
+
+    if parsed_args.prefetch < 0:
+        parser.error("--prefetch must not be negative")
+
+    if parsed_args.walk_jobs < 1:
+        parser.error("--walk-jobs must be at least 1")
+
+    if parsed_args.max_read_mbps is not None and parsed_args.max_read_mbps <= 0:
+        parser.error("--max-read-mbps must be positive")
+
+    if parsed_args.max_files_per_sec is not None and parsed_args.max_files_per_sec <= 0:
+        parser.error("--max-files-per-sec must be positive")
+
+    if parsed_args.file_timeout is not None and parsed_args.file_timeout <= 0:
+        parser.error("--file-timeout must be positive")
+
+    if parsed_args.hash_workers < 1:
+        parser.error("--hash-workers must be at least 1")
+
+    if parsed_args.duration_tolerance is not None and parsed_args.duration_tolerance < 0:
+        parser.error("--duration-tolerance must not be negative")
+
+    if parsed_args.duplicate_report_format is None:
+        report_path = parsed_args.duplicate_report or ""
+        parsed_args.duplicate_report_format = (
+            "jsonl" if report_path.lower().endswith(".jsonl") else "text"
+        )
+
+    if not 0.0 < parsed_args.seen_fpr < 1.0:
+        parser.error("--seen-fpr must be between 0.0 and 1.0")
+
+    if parsed_args.confirm_seen and not parsed_args.seen_source:
+        parser.error("--confirm-seen requires --seen-source")
+
+    if parsed_args.max_memory is not None:
+        unsupported = [
+            option
+            for option, enabled in (
+                ("--fuzzy-duplicates", parsed_args.fuzzy_duplicates),
+                ("--duration-tolerance", parsed_args.duration_tolerance is not None),
+                ("--isrc-duplicates", parsed_args.isrc_duplicates),
+                ("--content-duplicates", parsed_args.content_duplicates),
+                ("--detect-duplicates", parsed_args.detect_duplicates),
+                ("--duplicate-report", parsed_args.duplicate_report),
+                ("--album-duplicates", parsed_args.album_duplicates or parsed_args.album_report),
+                ("--diff-against", parsed_args.diff_against),
+                ("--seen-filter", parsed_args.seen_filter),
+                ("--list-aliases", parsed_args.list_aliases),
+            )
+            if enabled
+        ]
+        if unsupported:
+            parser.error(f"--max-memory cannot be combined with {', '.join(unsupported)}")
+
     return parsed_args
 
 
+def build_exporter(args: argparse.Namespace) -> BaseExporter:
+    """
+    Create the exporter selected by the command-line arguments.
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exporter instance
+    """
+    exporter_kwargs: Dict[str, Any] = {"write_manifest": args.write_manifest}
+    if args.format == "csv":
+        exporter_kwargs["max_songs_per_file"] = args.max_songs_per_file
+    elif args.format == "json":
+        exporter_kwargs["pretty"] = not args.no_pretty_json
+        exporter_kwargs["max_songs_per_file"] = args.max_songs_per_file
+    elif args.format == "m3u" or args.format == "txt":
+        exporter_kwargs["max_songs_per_file"] = args.max_songs_per_file
+
+    return get_exporter(args.format, **exporter_kwargs)
+
+
+def filter_seen(
+    args: argparse.Namespace, metadata_list: List[Dict[str, str]]
+) -> List[Dict[str, str]]:
+    """
+    Drop (or only report) songs found in the --seen-filter Bloom filter.
+
+    Args:
+        args: Parsed arguments
+        metadata_list: Songs to export
+
+    Returns:
+        Songs to export
+    """
+    detector = DuplicateDetector()
+    if not Path(args.seen_filter).exists():
+        if not args.seen_source:
+            raise FileNotFoundError(
+                f"Seen filter not found: {args.seen_filter} (use --seen-source to build it)"
+            )
+        logger.info(f"Building seen filter from: {args.seen_source}")
+        build_from_exports(args.seen_source, args.seen_filter, args.seen_fpr, detector)
+
+    confirm = exact_confirmer(args.seen_source, detector) if args.confirm_seen else None
+    with BloomFilter.open(args.seen_filter) as seen:
+        logger.info(
+            f"Loaded seen filter with {len(seen)} songs "
+            f"(expected false-positive rate {seen.false_positive_rate:.4%})"
+        )
+        new_tracks, seen_tracks = detector.split_seen(metadata_list, seen, confirm)
+
+    if args.keep_seen:
+        for metadata in seen_tracks:
+            logger.debug(
+                f"Probably exported before: {metadata.get('title')} - {metadata.get('artist')}"
+            )
+        logger.info(f"{len(seen_tracks)} songs probably exported before (kept)")
+        return metadata_list
+
+    logger.info(f"{len(new_tracks)} new songs, {len(seen_tracks)} probably exported before")
+    return new_tracks
+
+
+def run_schedule_benchmark(
+    args: argparse.Namespace, input_dirs: List[str], extractor: MusicFileExtractor
+) -> int:
+    """
+    Compare the read throughput of the file schedules (--benchmark-schedule).
+
+    Args:
+        args: Parsed arguments
+        input_dirs: Directories to scan
+        extractor: Extractor used to find the files
+
+    Returns:
+        Exit code
+    """
+    file_paths = [
+        file_path
+        for input_dir in input_dirs
+        for file_path in extractor.find_music_files(input_dir, not args.no_recursive)
+    ]
+    if not file_paths:
+        logger.warning("No music files found!")
+        return 0
+
+    results = benchmark_schedules(file_paths)
+    print(f"\nRead throughput of {len(file_paths)} file headers:")
+    for schedule, result in results.items():
+        print(
+            f"  {schedule:<9} {result['seconds']:8.2f}s  {result['files_per_sec']:9.1f} files/s"
+            f"  {result['mb_per_sec']:7.1f} MB/s"
+        )
+    return 0
+
+
+def run_out_of_core(
+    args: argparse.Namespace, input_dirs: List[str], extractor: MusicFileExtractor
+) -> int:
+    """
+    Scan, deduplicate and export with bounded memory (--max-memory).
+
+    Args:
+        args: Parsed arguments
+        input_dirs: Directories to scan
+        extractor: Metadata extractor
+
+    Returns:
+        Exit code
+    """
+    exported_keys = None
+    if args.since_export:
+        logger.info(f"Loading previous export: {args.since_export}")
+        exported_keys = load_exported_keys(args.since_export)
+
+    with ExternalDeduplicator(
+        strategy=args.duplicate_strategy if args.remove_duplicates else None,
+        max_memory=args.max_memory,
+        exclude_keys=exported_keys,
+    ) as deduplicator:
+        for input_dir in input_dirs:
+            logger.info(f"Extracting metadata from: {input_dir}")
+            for metadata in extractor.iter_metadata(str(input_dir), not args.no_recursive):
+                deduplicator.add(metadata)
+
+        if not len(deduplicator):
+            logger.warning("No music files found!")
+            return 0
+
+        logger.info(f"Successfully extracted metadata from {len(deduplicator)} total files")
+        if extractor.throttle is not None:
+            logger.info(f"Effective read rate: {extractor.throttle.summary()}")
+        if extractor.failures:
+            logger.warning(f"{len(extractor.failures)} files could not be read and were skipped")
+        records = deduplicator.finish()
+
+        if args.remove_duplicates:
+            logger.info(
+                f"Removed duplicates in {deduplicator.duplicate_groups} groups "
+                f"(strategy: {args.duplicate_strategy})"
+            )
+        if exported_keys is not None:
+            logger.info(f"{deduplicator.excluded} songs already exported in {args.since_export}")
+
+        if not records:
+            logger.info("No songs to export.")
+            return 0
+
+        logger.info(
+            "Exporting %s songs to %s format: %s",
+            len(records),
+            args.format.upper(),
+            args.output,
+        )
+        build_exporter(args).export(records, args.output)
+
+    logger.info("Export completed successfully.")
+    return 0
+
+
 def main(argv: Optional[list] = None) -> int:
     """
     Main entry point for the CLI.
@@ -205,6 +750,7 @@ def main(argv: Optional[list] = None) -> int:
     input_dirs = args.input if isinstance(args.input, list) else [args.input]
     logger.info(f"Scanning {len(input_dirs)} director{'ies' if len(input_dirs) > 1 else 'y'}...")
 
+    partitioned: Optional[PartitionedDuplicateDetector] = None
     try:
         # Validate input directories
         for input_dir in input_dirs:
@@ -216,18 +762,49 @@ def main(argv: Optional[list] = None) -> int:
                 logger.error(f"Input path is not a directory: {input_dir}")
                 return 1
 
-        # Initialize extractor
-        extractor = MusicFileExtractor(include_extensions=args.extensions)
+        input_dirs = normalize_roots(input_dirs, not args.no_recursive)
+
+        # Initialize extractor (each physical file is parsed once)
+        extractor = MusicFileExtractor(
+            include_extensions=args.extensions,
+            walk_jobs=args.walk_jobs,
+            unique_files=True,
+            list_aliases=args.list_aliases,
+            jobs=args.jobs,
+            prefetch=args.prefetch,
+            read_backend=args.read_backend,
+            schedule=args.schedule,
+            max_read_mbps=args.max_read_mbps,
+            max_files_per_sec=args.max_files_per_sec,
+            file_timeout=args.file_timeout,
+            file_memory_limit=args.file_memory_limit,
+        )
+
+        if args.benchmark_schedule:
+            return run_schedule_benchmark(args, input_dirs, extractor)
+
+        if args.max_memory is not None:
+            return run_out_of_core(args, input_dirs, extractor)
+
+        detect = args.detect_duplicates or args.remove_duplicates or args.duplicate_report
+        detector = DuplicateDetector(
+            case_sensitive=False,
+            fuzzy=args.fuzzy_duplicates,
+            similarity_threshold=args.similarity_threshold,
+            duration_tolerance=args.duration_tolerance,
+            use_isrc=args.isrc_duplicates,
+        )
+        if detect and not args.content_duplicates and args.duplicate_workers > 1:
+            # Partition tracks across worker processes while scanning
+            partitioned = PartitionedDuplicateDetector(detector, workers=args.duplicate_workers)
 
         # Extract metadata from all directories
         all_metadata = []
-        for input_dir in input_dirs:
-            logger.info(f"Extracting metadata from: {input_dir}")
-            metadata_list = extractor.extract_all(
-                directory=str(input_dir),
-                recursive=not args.no_recursive,
-            )
+        for input_dir, metadata_list in scan_roots(extractor, input_dirs, not args.no_recursive):
             all_metadata.extend(metadata_list)
+            if partitioned is not None:
+                for metadata in metadata_list:
+                    partitioned.add(metadata)
             logger.info(f"  Found {len(metadata_list)} files in {input_dir}")
 
         if not all_metadata:
@@ -235,38 +812,57 @@ def main(argv: Optional[list] = None) -> int:
             return 0
 
         logger.info(f"Successfully extracted metadata from {len(all_metadata)} total files")
+        if extractor.throttle is not None:
+            logger.info(f"Effective read rate: {extractor.throttle.summary()}")
+        if extractor.failures:
+            logger.warning(f"{len(extractor.failures)} files could not be read and were skipped")
+        if extractor.aliases:
+            logger.info(
+                f"{extractor.aliases} paths were hardlinks or symlinks to files already scanned"
+                + (" (listed)" if args.list_aliases else " (skipped)")
+            )
 
         # Duplicate detection and removal
         metadata_to_export = all_metadata
-        if args.detect_duplicates or args.remove_duplicates or args.duplicate_report:
-            detector = DuplicateDetector(case_sensitive=False)
+        if detect:
+            logger.info("Detecting duplicates...")
+            if args.content_duplicates:
+                finder = ContentDuplicateFinder(
+                    workers=args.hash_workers,
+                    cache_path=args.hash_cache,
+                    throttle=extractor.throttle,
+                )
+                duplicate_index = finder.build_index(all_metadata)
+                if extractor.throttle is not None:
+                    logger.info(f"Effective read rate: {extractor.throttle.summary()}")
+            elif partitioned is not None:
+                duplicate_index = partitioned.build_index(all_metadata)
+            else:
+                duplicate_index = detector.build_index(all_metadata)
 
             if args.detect_duplicates or args.duplicate_report:
-                logger.info("Detecting duplicates...")
-                duplicates = detector.find_duplicates(all_metadata)
-
-                if duplicates:
+                if duplicate_index.groups:
                     logger.warning(
-                        f"Found {len(duplicates)} duplicate song groups "
-                        f"({sum(len(v) for v in duplicates.values())} total files)"
+                        f"Found {len(duplicate_index)} duplicate song groups "
+                        f"({duplicate_index.total_files} total files)"
                     )
 
-                    # Generate and save/display report
-                    report = detector.get_duplicate_report(all_metadata)
-
+                    # Stream the report to the file or the console
                     if args.duplicate_report:
                         with open(args.duplicate_report, "w", encoding="utf-8") as f:
-                            f.write(report)
+                            duplicate_index.write_report(f, args.duplicate_report_format)
                         logger.info(f"Duplicate report saved to: {args.duplicate_report}")
                     else:
-                        print("\n" + report)
+                        print()
+                        duplicate_index.write_report(sys.stdout)
+                        print()
                 else:
                     logger.info("No duplicates found.")
 
             if args.remove_duplicates:
                 logger.info(f"Removing duplicates (strategy: {args.duplicate_strategy})...")
-                unique_list, removed_list = detector.remove_duplicates(
-                    all_metadata, strategy=args.duplicate_strategy
+                unique_list, removed_list = duplicate_index.remove_duplicates(
+                    strategy=args.duplicate_strategy
                 )
                 metadata_to_export = unique_list
                 logger.info(
@@ -274,22 +870,70 @@ def main(argv: Optional[list] = None) -> int:
                     f"{len(unique_list)} unique songs remaining"
                 )
 
+        # Album-level duplicates
+        if args.album_duplicates or args.album_report:
+            logger.info("Detecting duplicate albums...")
+            album_finder = AlbumDuplicateFinder(
+                detector=DuplicateDetector(fuzzy=args.fuzzy_duplicates),
+                threshold=args.album_similarity,
+            )
+            album_report = format_album_report(album_finder.find(all_metadata))
+
+            if args.album_report:
+                with open(args.album_report, "w", encoding="utf-8") as f:
+                    f.write(album_report)
+                logger.info(f"Duplicate album report saved to: {args.album_report}")
+            else:
+                print("\n" + album_report)
+
         # Use the (possibly filtered) metadata for export
         if not metadata_to_export:
             logger.warning("No songs to export after duplicate removal!")
             return 0
 
-        # Initialize exporter
-        exporter_kwargs = {}
-        if args.format == "csv":
-            exporter_kwargs["max_songs_per_file"] = args.max_songs_per_file
-        elif args.format == "json":
-            exporter_kwargs["pretty"] = not args.no_pretty_json
-            exporter_kwargs["max_songs_per_file"] = args.max_songs_per_file
-        elif args.format == "m3u" or args.format == "txt":
-            exporter_kwargs["max_songs_per_file"] = args.max_songs_per_file
+        # Delta export against a previous export
+        if args.since_export:
+            logger.info(f"Loading previous export: {args.since_export}")
+            exported_keys = load_exported_keys(args.since_export)
+            metadata_to_export, skipped = filter_new_tracks(metadata_to_export, exported_keys)
+            logger.info(
+                f"{len(metadata_to_export)} new songs, "
+                f"{skipped} already exported in {args.since_export}"
+            )
+            if not metadata_to_export:
+                logger.info("No new songs since previous export.")
+                return 0
+
+        if args.seen_filter:
+            metadata_to_export = filter_seen(args, metadata_to_export)
+            if not metadata_to_export:
+                logger.info("No new songs since previous export.")
+                return 0
+
+        # Diff against an existing Soundiiz CSV
+        if args.diff_against:
+            logger.info(f"Comparing library with: {args.diff_against}")
+            metadata_to_export, remote_only = diff_library(metadata_to_export, args.diff_against)
+
+            output_path = Path(args.output)
+            remote_only_output = args.remote_only_output or str(
+                output_path.with_name(f"{output_path.stem}_remote_only.csv")
+            )
+            if remote_only:
+                CSVExporter(max_songs_per_file=args.max_songs_per_file).export(
+                    remote_only, remote_only_output
+                )
+                logger.info(
+                    f"{len(remote_only)} Soundiiz entries without local file "
+                    f"saved to: {remote_only_output}"
+                )
 
-        exporter = get_exporter(args.format, **exporter_kwargs)
+            if not metadata_to_export:
+                logger.info(f"All local songs are already in {args.diff_against}.")
+                return 0
+
+        # Initialize exporter
+        exporter = build_exporter(args)
 
         # Export metadata
         logger.info(
@@ -311,6 +955,10 @@ def main(argv: Optional[list] = None) -> int:
         logger.error(f"Error: {e}", exc_info=args.verbose)
         return 1
 
+    finally:
+        if partitioned is not None:
+            partitioned.close()
+
 
 if __name__ == "__main__":
     sys.exit(main())
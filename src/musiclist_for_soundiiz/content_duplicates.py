@@ -0,0 +1,488 @@
+# -*- coding: utf-8 -*-
+"""Exact duplicate detection by hashing the audio payload of music files."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .duplicate_detector import CONTENT_KEY_PREFIX, DuplicateIndex
+from .throttle import Throttle, ThrottledFile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 1 << 20  # 1 MiB
+EDGE_SIZE = 64 * 1024  # Bytes hashed at each end of the payload by the prefilter
+
+
+def _synchsafe(data: bytes) -> int:
+    """Decode a 4-byte ID3v2 synchsafe integer."""
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _open(file_path: str, throttle: Optional[Throttle], buffering: int = -1) -> Any:
+    """Open a file for binary reads, paced by a throttle if given."""
+    if throttle is None:
+        return open(file_path, "rb", buffering=buffering)
+    throttle.open_file()
+    return ThrottledFile(open(file_path, "rb", buffering=buffering), throttle)
+
+
+def _read_payload_range(
+    file_path: str, throttle: Optional[Throttle] = None
+) -> Tuple[int, int, int]:
+    """Locate the audio payload, also returning the number of bytes read."""
+    file_size = os.path.getsize(file_path)
+    start = 0
+    end = file_size
+    bytes_read = 0
+
+    with _open(file_path, throttle) as f:
+        # ID3v2 tags (there may be more than one)
+        header = f.read(10)
+        bytes_read += len(header)
+        while len(header) == 10 and header[:3] == b"ID3":
+            footer = 10 if header[5] & 0x10 else 0
+            start += 10 + _synchsafe(header[6:10]) + footer
+            f.seek(start)
+            header = f.read(10)
+            bytes_read += len(header)
+
+        # FLAC metadata blocks
+        if header[:4] == b"fLaC":
+            position = start + 4
+            while True:
+                f.seek(position)
+                block_header = f.read(4)
+                bytes_read += len(block_header)
+                if len(block_header) < 4:
+                    break
+                position += 4 + int.from_bytes(block_header[1:4], "big")
+                if block_header[0] & 0x80:  # Last metadata block
+                    break
+            start = position
+
+        # ID3v1 tag
+        if end - start >= 128:
+            f.seek(end - 128)
+            bytes_read += 3
+            if f.read(3) == b"TAG":
+                end -= 128
+
+        # APEv2 tag (footer, optionally preceded by a header)
+        if end - start >= 32:
+            f.seek(end - 32)
+            ape_footer = f.read(32)
+            bytes_read += len(ape_footer)
+            if ape_footer[:8] == b"APETAGEX":
+                tag_size = int.from_bytes(ape_footer[12:16], "little")
+                flags = int.from_bytes(ape_footer[20:24], "little")
+                end -= tag_size + (32 if flags & 0x80000000 else 0)
+
+    if not 0 <= start <= end <= file_size:
+        # Corrupt tag sizes: fall back to the whole file
+        return 0, file_size, bytes_read
+
+    return start, end - start, bytes_read
+
+
+def audio_payload_range(file_path: str) -> Tuple[int, int]:
+    """
+    Locate the audio payload of a file, excluding tags.
+
+    Leading ID3v2 tags and FLAC metadata blocks as well as trailing APEv2
+    and ID3v1 tags are skipped. Formats with embedded tags (OGG, MP4, WMA)
+    are hashed as a whole.
+
+    Args:
+        file_path: Path to the music file
+
+    Returns:
+        Tuple of (offset, length) of the audio payload
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    offset, length, _bytes_read = _read_payload_range(file_path)
+    return offset, length
+
+
+def hash_range(
+    file_path: str,
+    offset: int,
+    length: int,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    throttle: Optional[Throttle] = None,
+) -> str:
+    """
+    Hash a byte range of a file with streaming reads.
+
+    Args:
+        file_path: Path to the file
+        offset: Start of the range
+        length: Number of bytes to hash
+        buffer_size: Read buffer size
+        throttle: Throttle pacing every buffer read, or None
+
+    Returns:
+        Hex digest (BLAKE2b, 128 bit)
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    remaining = length
+
+    with _open(file_path, throttle, buffering=0) as f:
+        f.seek(offset)
+        while remaining > 0:
+            read = f.readinto(view[: min(buffer_size, remaining)])
+            if not read:
+                break
+            hasher.update(view[:read])
+            remaining -= read
+
+    return hasher.hexdigest()
+
+
+def hash_edges(
+    file_path: str,
+    offset: int,
+    length: int,
+    edge_size: int = EDGE_SIZE,
+    throttle: Optional[Throttle] = None,
+) -> str:
+    """
+    Hash the first and last bytes of a range.
+
+    Args:
+        file_path: Path to the file
+        offset: Start of the range
+        length: Length of the range
+        edge_size: Number of bytes hashed at each end
+        throttle: Throttle pacing the reads, or None
+
+    Returns:
+        Hex digest of both edges (the whole range if it is not longer than
+        two edges)
+    """
+    if length <= 2 * edge_size:
+        return hash_range(file_path, offset, length, throttle=throttle)
+
+    hasher = hashlib.blake2b(digest_size=16)
+    with _open(file_path, throttle, buffering=0) as f:
+        f.seek(offset)
+        hasher.update(f.read(edge_size))
+        f.seek(offset + length - edge_size)
+        hasher.update(f.read(edge_size))
+    return hasher.hexdigest()
+
+
+def hash_audio_payload(file_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE) -> str:
+    """
+    Hash the audio payload of a music file, ignoring tags.
+
+    Args:
+        file_path: Path to the music file
+        buffer_size: Read buffer size
+
+    Returns:
+        Hex digest of the audio payload
+    """
+    offset, length = audio_payload_range(file_path)
+    return hash_range(file_path, offset, length, buffer_size)
+
+
+class HashCache:
+    """
+    Persistent cache of payload locations and hashes (SQLite).
+
+    Entries are keyed by path and only valid while the file size and
+    modification time are unchanged. Edge and full digests are only
+    present for files that reached the corresponding stage.
+    """
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path: str):
+        """
+        Open or create a hash cache.
+
+        Args:
+            path: Path to the cache database
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS hashes")
+            self._conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "payload_offset INTEGER, payload_length INTEGER, edges TEXT, digest TEXT)"
+        )
+
+    def get(self, file_path: str, size: int, mtime_ns: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached entry.
+
+        Args:
+            file_path: Path to the file
+            size: Current file size
+            mtime_ns: Current modification time in nanoseconds
+
+        Returns:
+            Dictionary with offset, length, edges and digest, or None if
+            missing or stale
+        """
+        row = self._conn.execute(
+            "SELECT payload_offset, payload_length, edges, digest FROM hashes "
+            "WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (file_path, size, mtime_ns),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"offset": row[0], "length": row[1], "edges": row[2], "digest": row[3]}
+
+    def put_many(
+        self,
+        entries: Iterable[Tuple[str, int, int, int, int, Optional[str], Optional[str]]],
+    ) -> None:
+        """
+        Store entries.
+
+        Args:
+            entries: Tuples of (path, size, mtime_ns, payload_offset,
+                     payload_length, edges, digest)
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)", entries
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+
+class ContentDuplicateFinder:
+    """
+    Find files whose audio payload is byte-identical.
+
+    Candidates are narrowed in stages so most files are never hashed:
+
+    1. ``payload``: group by audio payload size (a ``stat`` for cached files,
+       plus a few header/footer bytes otherwise)
+    2. ``edges``: hash the first and last 64 KB of payloads with equal size
+    3. ``full``: hash the whole payload of files whose edges still collide
+
+    After a run, ``stats`` holds the number of files and bytes read per stage.
+    With a throttle, every read of all hashing threads is paced by its limits.
+    """
+
+    STAGES = ("payload", "edges", "full")
+
+    def __init__(
+        self,
+        workers: int = 4,
+        cache_path: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        edge_size: int = EDGE_SIZE,
+        throttle: Optional[Throttle] = None,
+    ):
+        """
+        Initialize the finder.
+
+        Args:
+            workers: Number of parallel hashing threads
+            cache_path: Path to a persistent hash cache (None disables caching)
+            buffer_size: Read buffer size
+            edge_size: Bytes hashed at each end of the payload in stage 2
+            throttle: Read limits shared with the metadata scan, or None
+        """
+        if workers < 1:
+            raise ValueError(f"Invalid number of workers: {workers}")
+
+        self.workers = workers
+        self.cache_path = cache_path
+        self.buffer_size = buffer_size
+        self.edge_size = edge_size
+        self.throttle = throttle
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _reset_stats(self) -> None:
+        self.stats = {stage: {"files": 0, "bytes_read": 0} for stage in self.STAGES}
+
+    def _run_stage(
+        self,
+        stage: str,
+        entries: List[Dict[str, Any]],
+        task: Callable[[Dict[str, Any]], Tuple[Any, int]],
+        field: str,
+    ) -> None:
+        """
+        Compute a field for entries in parallel and record the bytes read.
+
+        Entries whose task fails with OSError are marked with ``error``.
+        """
+
+        def run(entry: Dict[str, Any]) -> Tuple[Any, int]:
+            try:
+                return task(entry)
+            except OSError as e:
+                logger.warning(f"Cannot read {entry['path']}: {e}")
+                return None, 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for entry, (value, bytes_read) in zip(entries, executor.map(run, entries)):
+                if value is None:
+                    entry["error"] = True
+                else:
+                    entry[field] = value
+                    entry["dirty"] = True
+                self.stats[stage]["files"] += 1
+                self.stats[stage]["bytes_read"] += bytes_read
+
+    def _locate(self, entry: Dict[str, Any]) -> Tuple[Any, int]:
+        offset, length, bytes_read = _read_payload_range(entry["path"], self.throttle)
+        entry["offset"] = offset
+        return length, bytes_read
+
+    def _hash_edges(self, entry: Dict[str, Any]) -> Tuple[Any, int]:
+        edges = hash_edges(
+            entry["path"], entry["offset"], entry["length"], self.edge_size, self.throttle
+        )
+        bytes_read = min(entry["length"], 2 * self.edge_size)
+        if entry["length"] <= 2 * self.edge_size:
+            # The edges cover the whole payload
+            entry["digest"] = edges
+        return edges, bytes_read
+
+    def _hash_full(self, entry: Dict[str, Any]) -> Tuple[Any, int]:
+        digest = hash_range(
+            entry["path"], entry["offset"], entry["length"], self.buffer_size, self.throttle
+        )
+        return digest, entry["length"]
+
+    @staticmethod
+    def _colliding(entries: List[Dict[str, Any]], field: str) -> List[Dict[str, Any]]:
+        """Keep entries sharing the value of field (and the payload length)."""
+        groups: Dict[Tuple[int, Any], List[Dict[str, Any]]] = {}
+        for entry in entries:
+            if not entry.get("error"):
+                groups.setdefault((entry["length"], entry[field]), []).append(entry)
+        return [entry for group in groups.values() if len(group) > 1 for entry in group]
+
+    def content_digests(self, paths: List[str]) -> Dict[str, str]:
+        """
+        Run the staged pipeline and hash files that may have a duplicate.
+
+        Args:
+            paths: File paths
+
+        Returns:
+            Mapping of path to payload digest for every file whose payload
+            size and edges collide with another file (unique files are omitted)
+        """
+        self._reset_stats()
+        cache = HashCache(self.cache_path) if self.cache_path else None
+        entries: List[Dict[str, Any]] = []
+
+        try:
+            # Stage 1: payload size
+            to_locate = []
+            for file_path in dict.fromkeys(paths):
+                try:
+                    stat = os.stat(file_path)
+                except OSError as e:
+                    logger.warning(f"Cannot stat {file_path}: {e}")
+                    continue
+                entry: Dict[str, Any] = {
+                    "path": file_path,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+                cached = cache.get(file_path, stat.st_size, stat.st_mtime_ns) if cache else None
+                if cached is not None:
+                    entry.update(cached)
+                else:
+                    entry.update(edges=None, digest=None)
+                    to_locate.append(entry)
+                entries.append(entry)
+
+            self._run_stage("payload", to_locate, self._locate, "length")
+            candidates = self._colliding(entries, "length")
+
+            # Stage 2: first and last bytes
+            self._run_stage(
+                "edges",
+                [entry for entry in candidates if entry["edges"] is None],
+                self._hash_edges,
+                "edges",
+            )
+            candidates = self._colliding(candidates, "edges")
+
+            # Stage 3: full payload
+            self._run_stage(
+                "full",
+                [entry for entry in candidates if entry["digest"] is None],
+                self._hash_full,
+                "digest",
+            )
+
+            if cache:
+                cache.put_many(
+                    (
+                        e["path"],
+                        e["size"],
+                        e["mtime_ns"],
+                        e["offset"],
+                        e["length"],
+                        e["edges"],
+                        e["digest"],
+                    )
+                    for e in entries
+                    if e.get("dirty") and not e.get("error")
+                )
+        finally:
+            if cache:
+                cache.close()
+
+        for stage in self.STAGES:
+            logger.info(
+                f"Content stage {stage}: read {self.stats[stage]['bytes_read']} bytes "
+                f"from {self.stats[stage]['files']} files"
+            )
+
+        return {
+            entry["path"]: entry["digest"]
+            for entry in candidates
+            if not entry.get("error") and entry["digest"] is not None
+        }
+
+    def build_index(self, metadata_list: List[Dict[str, str]]) -> DuplicateIndex:
+        """
+        Build a duplicate index of files with identical audio payload.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+
+        Returns:
+            DuplicateIndex keyed by content hash
+        """
+        paths = [m["file_path"] for m in metadata_list if m.get("file_path")]
+        digests = self.content_digests(paths)
+
+        groups: Dict[str, List[int]] = {}
+        for position, metadata in enumerate(metadata_list):
+            digest = digests.get(metadata.get("file_path", ""))
+            if digest is not None:
+                groups.setdefault(CONTENT_KEY_PREFIX + digest, []).append(position)
+
+        index = DuplicateIndex(metadata_list, groups)
+        logger.info(
+            f"Found {len(index)} content duplicate groups ({index.total_files} total files)"
+        )
+        return index
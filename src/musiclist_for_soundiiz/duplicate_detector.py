@@ -1,23 +1,331 @@
 # -*- coding: utf-8 -*-
 """Duplicate detection for music files."""
 
+import json
 import logging
-from typing import Dict, List, Set, Tuple
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from .extractor import normalize_isrc
+from .fuzzy_matching import FuzzyNormalizer, cluster_similar_keys
 
 logger = logging.getLogger(__name__)
 
+STRATEGIES = ("keep_first", "keep_last", "keep_shortest_path")
+REPORT_FORMATS = ("text", "jsonl")
+
+# Prefixes of ISRC and content hash group keys (title|artist keys always contain a "|")
+ISRC_KEY_PREFIX = "isrc:"
+CONTENT_KEY_PREFIX = "content:"
+
+
+def _parse_duration(value: str) -> Optional[int]:
+    """Parse a duration in seconds, returning None if it is missing or invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def split_by_duration(
+    song_index: Dict[str, List[int]],
+    duration_of: Callable[[int], Optional[int]],
+    tolerance: int,
+) -> Dict[str, List[int]]:
+    """
+    Split groups into runs of tracks with similar durations.
+
+    Each group is sorted by duration and swept once: a new run starts when
+    a duration exceeds the run's first duration by more than the tolerance.
+    Tracks without a duration form their own run.
+
+    Args:
+        song_index: Mapping of keys to positions
+        duration_of: Function returning the duration in seconds of a position
+        tolerance: Maximum duration difference in seconds within a run
+
+    Returns:
+        Mapping of ``key|duration`` keys to positions in scan order
+    """
+    split: Dict[str, List[int]] = {}
+
+    for key, positions in song_index.items():
+        if len(positions) < 2:
+            split[key] = positions
+            continue
+
+        timed: List[Tuple[int, int]] = []
+        untimed: List[int] = []
+        for position in positions:
+            duration = duration_of(position)
+            if duration is None:
+                untimed.append(position)
+            else:
+                timed.append((duration, position))
+
+        if untimed:
+            split[f"{key}|?"] = untimed
+
+        timed.sort()
+        run_start = None
+        run: List[int] = []
+        for duration, position in timed:
+            if run_start is None or duration - run_start > tolerance:
+                if run:
+                    split[f"{key}|{run_start}"] = sorted(run)
+                run_start, run = duration, []
+            run.append(position)
+        if run:
+            split[f"{key}|{run_start}"] = sorted(run)
+
+    return split
+
+
+class DuplicateIndex:
+    """
+    Duplicate groups of a metadata list, computed once.
+
+    Groups are stored as positions into the metadata list, so the groups,
+    the report and removal under any strategy reuse the same index instead
+    of re-hashing every track.
+    """
+
+    def __init__(self, metadata_list: List[Dict[str, str]], groups: Dict[str, List[int]]):
+        """
+        Initialize the index.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+            groups: Mapping of duplicate keys to positions in metadata_list.
+                    Only groups with 2 or more positions are kept.
+        """
+        self.metadata_list = metadata_list
+        self.groups = {key: positions for key, positions in groups.items() if len(positions) > 1}
+
+    def __len__(self) -> int:
+        """Return the number of duplicate groups."""
+        return len(self.groups)
+
+    @property
+    def total_files(self) -> int:
+        """Total number of files in duplicate groups."""
+        return sum(len(positions) for positions in self.groups.values())
+
+    @staticmethod
+    def matched_by(key: str) -> str:
+        """
+        Get the kind of key a duplicate group was matched on.
+
+        Args:
+            key: Group key
+
+        Returns:
+            'isrc', 'content' or 'title_artist'
+        """
+        if "|" not in key:
+            if key.startswith(ISRC_KEY_PREFIX):
+                return "isrc"
+            if key.startswith(CONTENT_KEY_PREFIX):
+                return "content"
+        return "title_artist"
+
+    @property
+    def duplicates(self) -> Dict[str, List[Dict[str, str]]]:
+        """Mapping of duplicate keys to lists of duplicate entries."""
+        return {
+            key: [self.metadata_list[position] for position in positions]
+            for key, positions in self.groups.items()
+        }
+
+    def positions_to_remove(self, strategy: str = "keep_first") -> List[int]:
+        """
+        Get the positions removed by a strategy.
+
+        Args:
+            strategy: 'keep_first', 'keep_last' or 'keep_shortest_path'
+
+        Returns:
+            Sorted list of positions in metadata_list to remove
+
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+
+        to_remove: List[int] = []
+        for positions in self.groups.values():
+            if strategy == "keep_first":
+                # Remove all but first
+                to_remove.extend(positions[1:])
+            elif strategy == "keep_last":
+                # Remove all but last
+                to_remove.extend(positions[:-1])
+            else:
+                # Keep file with the shortest path (first one on ties)
+                keep = min(
+                    positions,
+                    key=lambda p: len(self.metadata_list[p].get("file_path", "")),
+                )
+                to_remove.extend(p for p in positions if p != keep)
+
+        to_remove.sort()
+        return to_remove
+
+    def remove_duplicates(
+        self, strategy: str = "keep_first"
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Split the metadata list into kept and removed entries.
+
+        Args:
+            strategy: 'keep_first', 'keep_last' or 'keep_shortest_path'
+
+        Returns:
+            Tuple of (unique_list, removed_list)
+        """
+        to_remove = self.positions_to_remove(strategy)
+
+        unique_list: List[Dict[str, str]] = []
+        removed_list: List[Dict[str, str]] = []
+        start = 0
+        for position in to_remove:
+            unique_list.extend(self.metadata_list[start:position])
+            removed_list.append(self.metadata_list[position])
+            start = position + 1
+        unique_list.extend(self.metadata_list[start:])
+
+        logger.info(f"Removed {len(removed_list)} duplicate files using strategy '{strategy}'")
+
+        return unique_list, removed_list
+
+    def _report_lines(self) -> Iterator[str]:
+        """Yield the lines of the text report one group at a time."""
+        yield f"Found {len(self.groups)} duplicate song groups:\n"
+
+        for i, key in enumerate(sorted(self.groups), 1):
+            entries = [self.metadata_list[position] for position in self.groups[key]]
+
+            # Get title and artist from first entry
+            title = entries[0].get("title", "Unknown")
+            artist = entries[0].get("artist", "Unknown")
+            album = entries[0].get("album", "Unknown")
+
+            yield f"{i}. '{title}' by {artist} (Album: {album})"
+            matched_by = self.matched_by(key)
+            if matched_by == "isrc":
+                yield f"   Matched by: ISRC {key[len(ISRC_KEY_PREFIX) :]}"
+            elif matched_by == "content":
+                yield f"   Matched by: audio content {key[len(CONTENT_KEY_PREFIX) :]}"
+            else:
+                yield "   Matched by: title/artist"
+            yield f"   {len(entries)} copies found:"
+
+            for j, entry in enumerate(entries, 1):
+                file_path = entry.get("file_path", "Unknown")
+                yield f"   [{j}] {file_path}"
+
+            yield ""  # Empty line between groups
+
+    def _report_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield one JSON-serializable record per group."""
+        for key in sorted(self.groups):
+            entries = [self.metadata_list[position] for position in self.groups[key]]
+            yield {
+                "key": key,
+                "matched_by": self.matched_by(key),
+                "title": entries[0].get("title", ""),
+                "artist": entries[0].get("artist", ""),
+                "album": entries[0].get("album", ""),
+                "count": len(entries),
+                "files": [entry.get("file_path", "") for entry in entries],
+            }
+
+    def get_report(self) -> str:
+        """
+        Generate a human-readable report of duplicates.
+
+        Returns:
+            Formatted report string
+        """
+        if not self.groups:
+            return "No duplicates found."
+
+        return "\n".join(self._report_lines())
+
+    def write_report(self, file: TextIO, report_format: str = "text") -> None:
+        """
+        Write the report group by group without building it in memory.
+
+        Args:
+            file: Text file to write to
+            report_format: 'text' (same content as get_report()) or 'jsonl'
+                           (one JSON object per group)
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format: {report_format}")
+
+        if report_format == "jsonl":
+            for record in self._report_records():
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif not self.groups:
+            file.write("No duplicates found.")
+        else:
+            for i, line in enumerate(self._report_lines()):
+                file.write(line if i == 0 else "\n" + line)
+
 
 class DuplicateDetector:
     """Detect duplicate music files based on metadata."""
 
-    def __init__(self, case_sensitive: bool = False):
+    def __init__(
+        self,
+        case_sensitive: bool = False,
+        fuzzy: bool = False,
+        similarity_threshold: float = 0.9,
+        duration_tolerance: Optional[int] = None,
+        use_isrc: bool = False,
+    ):
         """
         Initialize the duplicate detector.
 
         Args:
             case_sensitive: Whether to perform case-sensitive comparison
+                            (ignored in fuzzy mode)
+            fuzzy: Whether to normalize Unicode, punctuation, diacritics and
+                   remaster/live/featuring suffixes and merge similar keys
+            similarity_threshold: Minimum similarity ratio (0.0-1.0) for
+                                  merging keys in fuzzy mode
+            duration_tolerance: If set, tracks only count as duplicates when
+                                their durations differ by at most this many
+                                seconds (e.g. radio edit vs. extended mix)
+            use_isrc: Whether to match tracks by ISRC first. Title/artist keys
+                      are only used for tracks without an ISRC.
         """
+        if not 0.0 < similarity_threshold <= 1.0:
+            raise ValueError(f"Invalid similarity threshold: {similarity_threshold}")
+        if duration_tolerance is not None and duration_tolerance < 0:
+            raise ValueError(f"Invalid duration tolerance: {duration_tolerance}")
+
         self.case_sensitive = case_sensitive
+        self.fuzzy = fuzzy
+        self.similarity_threshold = similarity_threshold
+        self.duration_tolerance = duration_tolerance
+        self.use_isrc = use_isrc
+        self._fuzzy_normalizer = FuzzyNormalizer() if fuzzy else None
 
     def _normalize_key(self, title: str, artist: str) -> str:
         """
@@ -30,49 +338,264 @@ class DuplicateDetector:
         Returns:
             Normalized key string
         """
+        if self._fuzzy_normalizer is not None:
+            return f"{self._fuzzy_normalizer(title)}|{self._fuzzy_normalizer(artist)}"
+
         key = f"{title}|{artist}"
         if not self.case_sensitive:
             key = key.lower()
         return key.strip()
 
-    def find_duplicates(
-        self, metadata_list: List[Dict[str, str]]
-    ) -> Dict[str, List[Dict[str, str]]]:
+    def track_key(self, metadata: Dict[str, str]) -> Optional[str]:
         """
-        Find duplicate songs based on title and artist.
+        Get the normalized duplicate key of a track.
+
+        Args:
+            metadata: Metadata dictionary
+
+        Returns:
+            Normalized key, or None if the track has no title or artist
+        """
+        title = metadata.get("title", "")
+        artist = metadata.get("artist", "")
+        if not title or not artist:
+            return None
+        return self._normalize_key(title, artist)
+
+    def _group_positions(self, metadata_list: List[Dict[str, str]]) -> Dict[str, List[int]]:
+        """
+        Group positions of metadata entries by duplicate key.
 
         Args:
             metadata_list: List of metadata dictionaries
 
         Returns:
-            Dictionary mapping duplicate keys to lists of duplicate entries.
-            Only includes entries that have duplicates (2 or more files).
+            Dictionary mapping keys to positions (including single entries)
         """
-        # Build index of all songs
-        song_index: Dict[str, List[Dict[str, str]]] = {}
+        song_index: Dict[str, List[int]] = {}
+        isrc_index: Dict[str, List[int]] = {}
+        untagged: List[Tuple[int, str]] = []
+
+        for position, metadata in enumerate(metadata_list):
+            if self.use_isrc:
+                isrc = normalize_isrc(metadata.get("isrc"))
+                if isrc:
+                    isrc_index.setdefault(ISRC_KEY_PREFIX + isrc, []).append(position)
+                    continue
 
-        for metadata in metadata_list:
-            title = metadata.get("title", "")
-            artist = metadata.get("artist", "")
+            key = self.track_key(metadata)
 
             # Skip entries without title or artist
-            if not title or not artist:
+            if key is None:
+                continue
+
+            if self.use_isrc:
+                untagged.append((position, key))
                 continue
 
-            key = self._normalize_key(title, artist)
             if key not in song_index:
                 song_index[key] = []
-            song_index[key].append(metadata)
+            song_index[key].append(position)
+
+        if self.use_isrc:
+            song_index = self._attach_untagged(isrc_index, untagged, metadata_list)
+
+        if self.fuzzy and self.similarity_threshold < 1.0:
+            song_index = self._merge_similar(song_index)
+
+        if self.duration_tolerance is not None:
+            song_index = self._split_by_duration(song_index, metadata_list)
+
+        song_index.update(isrc_index)
+        return song_index
+
+    def _attach_untagged(
+        self,
+        isrc_index: Dict[str, List[int]],
+        untagged: List[Tuple[int, str]],
+        metadata_list: List[Dict[str, str]],
+    ) -> Dict[str, List[int]]:
+        """
+        Add untagged tracks to ISRC groups where their title/artist is unambiguous.
+
+        An untagged track joins an ISRC group if its title/artist key belongs
+        to exactly one ISRC. Keys shared by several ISRCs are different
+        recordings, so such tracks are only grouped by title/artist. With a
+        duration tolerance, the track's duration must also be within the
+        tolerance of every tagged track of the group (tracks without a
+        duration only join groups without durations); other tracks are
+        grouped by title/artist and split by duration there.
+
+        Args:
+            isrc_index: Mapping of ISRC keys to positions (updated in place)
+            untagged: (position, title/artist key) of tracks without ISRC
+            metadata_list: List of metadata dictionaries
 
-        # Filter for actual duplicates (2+ entries)
-        duplicates = {key: entries for key, entries in song_index.items() if len(entries) > 1}
+        Returns:
+            Mapping of title/artist keys to positions of remaining untagged tracks
+        """
+        isrc_by_key: Dict[str, Optional[str]] = {}
+        for isrc_key, positions in isrc_index.items():
+            for position in positions:
+                key = self.track_key(metadata_list[position])
+                if key is None:
+                    continue
+                if isrc_by_key.get(key, isrc_key) != isrc_key:
+                    isrc_by_key[key] = None  # Ambiguous: several recordings
+                else:
+                    isrc_by_key[key] = isrc_key
+
+        def duration_of(position: int) -> Optional[int]:
+            return _parse_duration(metadata_list[position].get("duration", ""))
+
+        # Durations of the tagged tracks, by ISRC key (only with a tolerance)
+        group_durations: Dict[str, List[int]] = {}
+        song_index: Dict[str, List[int]] = {}
+        attached = set()
+        for position, key in untagged:
+            target = isrc_by_key.get(key)
+            if target is not None and self.duration_tolerance is not None:
+                if target not in group_durations:
+                    group_durations[target] = [
+                        duration
+                        for duration in map(duration_of, isrc_index[target])
+                        if duration is not None
+                    ]
+                durations = group_durations[target]
+                duration = duration_of(position)
+                if duration is None or not durations:
+                    matches = duration is None and not durations
+                else:
+                    matches = all(
+                        abs(duration - other) <= self.duration_tolerance for other in durations
+                    )
+                if not matches:
+                    target = None
+            if target is not None:
+                isrc_index[target].append(position)
+                attached.add(target)
+            else:
+                song_index.setdefault(key, []).append(position)
+
+        # Keep scan order within groups (keep_first/keep_last rely on it)
+        for target in attached:
+            isrc_index[target].sort()
+
+        return song_index
+
+    def _merge_similar(self, song_index: Dict[str, List[int]]) -> Dict[str, List[int]]:
+        """
+        Merge groups whose keys are similar (fuzzy mode).
+
+        Args:
+            song_index: Mapping of normalized keys to positions
+
+        Returns:
+            Mapping of representative keys to merged, ordered positions
+        """
+        representatives = cluster_similar_keys(song_index, self.similarity_threshold)
 
-        logger.info(
-            f"Found {len(duplicates)} duplicate song groups "
-            f"({sum(len(v) for v in duplicates.values())} total files)"
+        merged: Dict[str, List[int]] = {}
+        for key, positions in song_index.items():
+            merged.setdefault(representatives[key], []).extend(positions)
+
+        # Keep scan order within merged groups (keep_first/keep_last rely on it)
+        for positions in merged.values():
+            positions.sort()
+
+        return merged
+
+    def _split_by_duration(
+        self, song_index: Dict[str, List[int]], metadata_list: List[Dict[str, str]]
+    ) -> Dict[str, List[int]]:
+        """
+        Split groups into runs of tracks with similar durations.
+
+        Args:
+            song_index: Mapping of keys to positions
+            metadata_list: List of metadata dictionaries
+
+        Returns:
+            Mapping of ``key|duration`` keys to positions in scan order
+        """
+        return split_by_duration(
+            song_index,
+            lambda position: _parse_duration(metadata_list[position].get("duration", "")),
+            self.duration_tolerance or 0,
         )
 
-        return duplicates
+    def build_index(self, metadata_list: List[Dict[str, str]]) -> DuplicateIndex:
+        """
+        Build a reusable duplicate index.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+
+        Returns:
+            DuplicateIndex with all duplicate groups
+        """
+        index = DuplicateIndex(metadata_list, self._group_positions(metadata_list))
+
+        logger.info(f"Found {len(index)} duplicate song groups ({index.total_files} total files)")
+
+        return index
+
+    def split_seen(
+        self,
+        metadata_list: List[Dict[str, str]],
+        seen: Container[str],
+        confirm: Optional[Callable[[Set[str]], Set[str]]] = None,
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Split tracks into new ones and ones probably seen before.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+            seen: Keys seen before, e.g. a BloomFilter of previous exports
+                  (may report false positives)
+            confirm: Optional function receiving the keys reported by seen
+                     and returning those that were really seen, to rule out
+                     false positives
+
+        Returns:
+            Tuple of (new_tracks, seen_tracks). Tracks without title or
+            artist are always new.
+        """
+        keys = [self.track_key(metadata) for metadata in metadata_list]
+        probable = {key for key in keys if key is not None and key in seen}
+
+        if confirm is not None and probable:
+            confirmed = confirm(probable)
+            logger.info(
+                f"Confirmed {len(confirmed)} of {len(probable)} probably seen keys "
+                f"({len(probable) - len(confirmed)} false positives)"
+            )
+            probable = confirmed
+
+        new_tracks: List[Dict[str, str]] = []
+        seen_tracks: List[Dict[str, str]] = []
+        for metadata, key in zip(metadata_list, keys):
+            if key is not None and key in probable:
+                seen_tracks.append(metadata)
+            else:
+                new_tracks.append(metadata)
+
+        return new_tracks, seen_tracks
+
+    def find_duplicates(
+        self, metadata_list: List[Dict[str, str]]
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Find duplicate songs based on title and artist.
+
+        Args:
+            metadata_list: List of metadata dictionaries
+
+        Returns:
+            Dictionary mapping duplicate keys to lists of duplicate entries.
+            Only includes entries that have duplicates (2 or more files).
+        """
+        return self.build_index(metadata_list).duplicates
 
     def remove_duplicates(
         self, metadata_list: List[Dict[str, str]], strategy: str = "keep_first"
@@ -90,35 +613,10 @@ class DuplicateDetector:
         Returns:
             Tuple of (unique_list, removed_list)
         """
-        duplicates = self.find_duplicates(metadata_list)
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
 
-        # Create set of files to remove
-        files_to_remove: Set[str] = set()
-
-        for entries in duplicates.values():
-            if strategy == "keep_first":
-                # Remove all but first
-                to_remove = entries[1:]
-            elif strategy == "keep_last":
-                # Remove all but last
-                to_remove = entries[:-1]
-            elif strategy == "keep_shortest_path":
-                # Sort by path length and keep shortest
-                sorted_entries = sorted(entries, key=lambda x: len(x.get("file_path", "")))
-                to_remove = sorted_entries[1:]
-            else:
-                raise ValueError(f"Unknown strategy: {strategy}")
-
-            for entry in to_remove:
-                files_to_remove.add(entry.get("file_path", ""))
-
-        # Split into unique and removed lists
-        unique_list = [m for m in metadata_list if m.get("file_path", "") not in files_to_remove]
-        removed_list = [m for m in metadata_list if m.get("file_path", "") in files_to_remove]
-
-        logger.info(f"Removed {len(removed_list)} duplicate files using strategy '{strategy}'")
-
-        return unique_list, removed_list
+        return self.build_index(metadata_list).remove_duplicates(strategy)
 
     def get_duplicate_report(self, metadata_list: List[Dict[str, str]]) -> str:
         """
@@ -130,26 +628,4 @@ class DuplicateDetector:
         Returns:
             Formatted report string
         """
-        duplicates = self.find_duplicates(metadata_list)
-
-        if not duplicates:
-            return "No duplicates found."
-
-        lines = [f"Found {len(duplicates)} duplicate song groups:\n"]
-
-        for i, (_key, entries) in enumerate(sorted(duplicates.items()), 1):
-            # Get title and artist from first entry
-            title = entries[0].get("title", "Unknown")
-            artist = entries[0].get("artist", "Unknown")
-            album = entries[0].get("album", "Unknown")
-
-            lines.append(f"{i}. '{title}' by {artist} (Album: {album})")
-            lines.append(f"   {len(entries)} copies found:")
-
-            for j, entry in enumerate(entries, 1):
-                file_path = entry.get("file_path", "Unknown")
-                lines.append(f"   [{j}] {file_path}")
-
-            lines.append("")  # Empty line between groups
-
-        return "\n".join(lines)
+        return self.build_index(metadata_list).get_report()
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""Read previous exports for delta (incremental) exports."""
+
+import csv
+import hashlib
+import heapq
+import json
+import logging
+import re
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .duplicate_detector import DuplicateDetector
+
+logger = logging.getLogger(__name__)
+
+EXPORT_EXTENSIONS = {".csv", ".json"}
+
+
+def hash_key(key: str) -> int:
+    """
+    Hash a normalized key to a 64-bit integer.
+
+    Args:
+        key: Normalized key string
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class ExportedKeySet:
+    """
+    Compact set of normalized track keys.
+
+    Keys are stored as sorted 64-bit hashes in an ``array`` (8 bytes per key)
+    instead of a set of strings, so millions of keys fit in a few dozen MB.
+    Keys are collected in sorted runs while loading and merged on first lookup.
+    """
+
+    RUN_SIZE = 1 << 20
+
+    def __init__(self, keys: Iterable[str] = ()):
+        """
+        Initialize the key set.
+
+        Args:
+            keys: Normalized keys to add
+        """
+        self._hashes = array("Q")
+        self._runs: List[array] = []
+        self._pending: List[int] = []
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str) -> None:
+        """
+        Add a normalized key.
+
+        Args:
+            key: Normalized key string
+        """
+        self._pending.append(hash_key(key))
+        if len(self._pending) >= self.RUN_SIZE:
+            self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Sort pending hashes into a run."""
+        if self._pending:
+            self._runs.append(array("Q", sorted(self._pending)))
+            self._pending = []
+
+    def _merge(self) -> None:
+        """Merge all runs into the sorted, de-duplicated hash array."""
+        self._flush_pending()
+        if not self._runs:
+            return
+
+        merged = array("Q")
+        last = None
+        for value in heapq.merge(self._hashes, *self._runs):
+            if value != last:
+                merged.append(value)
+                last = value
+        self._hashes = merged
+        self._runs = []
+
+    def __contains__(self, key: object) -> bool:
+        """Check whether a normalized key is in the set."""
+        if not isinstance(key, str):
+            return False
+        return self.contains_hash(hash_key(key))
+
+    def contains_hash(self, value: int) -> bool:
+        """
+        Check whether a key hash is in the set.
+
+        Args:
+            value: Hash as returned by hash_key()
+
+        Returns:
+            True if the hash is in the set
+        """
+        if self._runs or self._pending:
+            self._merge()
+        index = bisect_left(self._hashes, value)
+        return index < len(self._hashes) and self._hashes[index] == value
+
+    def __len__(self) -> int:
+        """Return the number of distinct keys."""
+        if self._runs or self._pending:
+            self._merge()
+        return len(self._hashes)
+
+
+def find_export_files(path: str) -> List[Path]:
+    """
+    Find the chunk files of a previous export.
+
+    Args:
+        path: Export file, base path of a split export (e.g. ``output.csv`` for
+              ``output_1.csv``, ``output_2.csv``, ...) or directory of exports
+
+    Returns:
+        List of CSV/JSON file paths in chunk order
+
+    Raises:
+        FileNotFoundError: If no export files are found
+    """
+    path_obj = Path(path)
+
+    if path_obj.is_dir():
+        files = sorted(
+            p
+            for p in path_obj.iterdir()
+            if p.is_file()
+            and p.suffix.lower() in EXPORT_EXTENSIONS
+            and not p.name.endswith(".manifest.json")
+        )
+    elif path_obj.is_file():
+        files = [path_obj]
+    else:
+        pattern = re.compile(rf"^{re.escape(path_obj.stem)}_(\d+){re.escape(path_obj.suffix)}$")
+        chunks = []
+        if path_obj.parent.is_dir():
+            for p in path_obj.parent.iterdir():
+                match = pattern.match(p.name)
+                if match:
+                    chunks.append((int(match.group(1)), p))
+        files = [p for _index, p in sorted(chunks)]
+
+    if not files:
+        raise FileNotFoundError(f"No previous export found: {path}")
+
+    return files
+
+
+def iter_exported_tracks(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream tracks from a previous CSV or JSON export.
+
+    CSV files are read row by row using their header (Soundiiz format:
+    ``title,artist,album,isrc,``), JSON files one chunk at a time.
+
+    Args:
+        path: Export file, base path of a split export or directory
+
+    Yields:
+        Metadata dictionaries with at least title and artist
+
+    Raises:
+        ValueError: If a file has an unsupported format
+    """
+    for file_path in find_export_files(path):
+        suffix = file_path.suffix.lower()
+        logger.debug(f"Reading previous export: {file_path}")
+
+        if suffix == ".csv":
+            with open(file_path, encoding="utf-8", newline="") as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None)
+                if header is None:
+                    continue
+                columns = [
+                    (index, name.strip().lower())
+                    for index, name in enumerate(header)
+                    if name.strip()
+                ]
+                for row in reader:
+                    yield {name: row[index] for index, name in columns if index < len(row)}
+        elif suffix == ".json":
+            with open(file_path, encoding="utf-8") as jsonfile:
+                data = json.load(jsonfile)
+            songs = data.get("songs", []) if isinstance(data, dict) else data
+            yield from songs
+        else:
+            raise ValueError(f"Unsupported export format: {file_path}")
+
+
+def load_exported_keys(path: str, detector: Optional[DuplicateDetector] = None) -> ExportedKeySet:
+    """
+    Load the normalized keys of all tracks in a previous export.
+
+    Args:
+        path: Export file, base path of a split export or directory
+        detector: Detector whose key normalization is used
+
+    Returns:
+        Compact set of exported keys
+    """
+    detector = detector or DuplicateDetector()
+    key_set = ExportedKeySet()
+
+    for metadata in iter_exported_tracks(path):
+        key = detector.track_key(metadata)
+        if key is not None:
+            key_set.add(key)
+
+    logger.info(f"Loaded {len(key_set)} previously exported tracks from {path}")
+    return key_set
+
+
+def filter_new_tracks(
+    metadata_list: List[Dict[str, str]],
+    exported_keys: ExportedKeySet,
+    detector: Optional[DuplicateDetector] = None,
+) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Keep only tracks that were not part of a previous export.
+
+    Args:
+        metadata_list: List of metadata dictionaries
+        exported_keys: Keys of previously exported tracks
+        detector: Detector whose key normalization is used
+
+    Returns:
+        Tuple of (new_tracks, skipped_count)
+    """
+    detector = detector or DuplicateDetector()
+    new_tracks = []
+
+    for metadata in metadata_list:
+        key = detector.track_key(metadata)
+        if key is None or key not in exported_keys:
+            new_tracks.append(metadata)
+
+    skipped = len(metadata_list) - len(new_tracks)
+    logger.info(f"Skipped {skipped} tracks already present in previous export")
+    return new_tracks, skipped
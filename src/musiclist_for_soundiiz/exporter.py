@@ -1,20 +1,28 @@
 # -*- coding: utf-8 -*-
 """Export music metadata to various formats."""
 
+import hashlib
 import json
 import logging
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Type
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+from .fileutil import atomic_write
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_SUFFIX = ".manifest.json"
+
 
 class BaseExporter(ABC):
     """Base class for metadata exporters."""
 
+    write_manifest: bool = False
+
     @abstractmethod
-    def export(self, metadata_list: List[Dict[str, str]], output_path: str) -> None:
+    def export(self, metadata_list: Sequence[Dict[str, str]], output_path: str) -> None:
         """
         Export metadata to a file.
 
@@ -24,21 +32,118 @@ class BaseExporter(ABC):
         """
         pass
 
+    @staticmethod
+    def _write_chunk(
+        file_path: Path, lines: Iterable[str], newline: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Write one chunk file, skipping the write if its content is unchanged.
+
+        The SHA-256 digest is computed while the formatted lines are encoded.
+        If a file with the same size and digest already exists it is left
+        untouched, otherwise the content is written to a temporary file in the
+        same directory and renamed into place.
+
+        Args:
+            file_path: Destination path of the chunk
+            lines: Formatted lines (including line endings)
+            newline: Line ending "\n" is translated to, like the newline
+                     argument of open(): None for the platform default
+                     (os.linesep), "" to keep line endings unchanged
+
+        Returns:
+            Dictionary with keys: file, sha256, size, changed
+        """
+        line_ending = os.linesep if newline is None else newline
+        hasher = hashlib.sha256()
+        parts = []
+        for line in lines:
+            if line_ending not in ("", "\n"):
+                line = line.replace("\n", line_ending)
+            encoded = line.encode("utf-8")
+            hasher.update(encoded)
+            parts.append(encoded)
+        data = b"".join(parts)
+        digest = hasher.hexdigest()
+
+        changed = not _file_matches(file_path, len(data), digest)
+        if changed:
+            atomic_write(file_path, data)
+        else:
+            logger.debug(f"Unchanged, skipping write: {file_path}")
+
+        return {"file": file_path.name, "sha256": digest, "size": len(data), "changed": changed}
+
+    @staticmethod
+    def _log_chunk(
+        file_path: Path, entry: Dict[str, Any], file_index: int, total_files: int
+    ) -> None:
+        """
+        Log whether a chunk file was written or left unchanged.
+
+        Args:
+            file_path: Path of the chunk file
+            entry: Chunk entry as returned by _write_chunk, with a "songs" count
+            file_index: Zero-based index of the chunk
+            total_files: Number of chunks of the export
+        """
+        if entry["changed"]:
+            message = f"Exported {entry['songs']} songs to {file_path}"
+        else:
+            message = f"Unchanged {entry['songs']} songs in {file_path}"
+        logger.info(f"{message} (file {file_index + 1}/{total_files})")
+
+    @staticmethod
+    def _write_manifest(output_dir: Path, base_name: str, entries: List[Dict[str, Any]]) -> Path:
+        """
+        Write a manifest describing the chunk files of an export.
+
+        Args:
+            output_dir: Directory containing the chunk files
+            base_name: Base name of the export (output file stem)
+            entries: Chunk entries as returned by _write_chunk, with a "songs" count
+
+        Returns:
+            Path to the manifest file
+        """
+        manifest = {
+            "total_songs": sum(entry["songs"] for entry in entries),
+            "files": entries,
+        }
+        manifest_path = output_dir / f"{base_name}{MANIFEST_SUFFIX}"
+        data = (json.dumps(manifest, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+        atomic_write(manifest_path, data)
+        logger.info(f"Wrote export manifest to {manifest_path}")
+        return manifest_path
+
+
+def _file_matches(file_path: Path, size: int, digest: str) -> bool:
+    """Check whether an existing file has the given size and SHA-256 digest."""
+    try:
+        if file_path.stat().st_size != size:
+            return False
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest() == digest
+    except OSError:
+        return False
+
 
 class CSVExporter(BaseExporter):
     """Export metadata to CSV format compatible with Soundiiz."""
 
-    def __init__(self, max_songs_per_file: int = 500):
+    def __init__(self, max_songs_per_file: int = 500, write_manifest: bool = False):
         """
         Initialize CSV exporter.
 
         Args:
             max_songs_per_file: Maximum number of songs per CSV file.
                                If exceeded, multiple files will be created.
+            write_manifest: Whether to write a manifest with each chunk's hash
         """
         self.max_songs_per_file = max_songs_per_file
+        self.write_manifest = write_manifest
 
-    def export(self, metadata_list: List[Dict[str, str]], output_path: str) -> None:
+    def export(self, metadata_list: Sequence[Dict[str, str]], output_path: str) -> None:
         """
         Export metadata to CSV file(s) in Soundiiz format.
 
@@ -63,6 +168,7 @@ class CSVExporter(BaseExporter):
 
         # Split into multiple files if necessary
         total_files = (len(metadata_list) + self.max_songs_per_file - 1) // self.max_songs_per_file
+        manifest_entries: List[Dict[str, Any]] = []
 
         for file_index in range(total_files):
             start_idx = file_index * self.max_songs_per_file
@@ -77,23 +183,27 @@ class CSVExporter(BaseExporter):
 
             file_path = output_dir / filename
 
-            # Write CSV file
-            with open(file_path, "w", encoding="utf-8", newline="") as csvfile:
-                # Soundiiz CSV header with trailing comma
-                csvfile.write("title,artist,album,isrc,\n")
+            # Soundiiz CSV header with trailing comma
+            lines = ["title,artist,album,isrc,\n"]
+
+            for metadata in chunk:
+                title = self._escape_csv(metadata["title"])
+                artist = self._escape_csv(metadata["artist"])
+                album = self._escape_csv(metadata["album"])
+                isrc = self._escape_csv(metadata.get("isrc", ""))
+
+                # Row with trailing comma
+                lines.append(f"{title},{artist},{album},{isrc},\n")
 
-                for metadata in chunk:
-                    title = self._escape_csv(metadata["title"])
-                    artist = self._escape_csv(metadata["artist"])
-                    album = self._escape_csv(metadata["album"])
-                    isrc = self._escape_csv(metadata.get("isrc", ""))
+            # Written with newline="" before, so rows always end with "\n"
+            entry = self._write_chunk(file_path, lines, newline="")
+            entry["songs"] = len(chunk)
+            manifest_entries.append(entry)
 
-                    # Write row with trailing comma
-                    csvfile.write(f"{title},{artist},{album},{isrc},\n")
+            self._log_chunk(file_path, entry, file_index, total_files)
 
-            logger.info(
-                f"Exported {len(chunk)} songs to {file_path} (file {file_index + 1}/{total_files})"
-            )
+        if self.write_manifest:
+            self._write_manifest(output_dir, base_name, manifest_entries)
 
     @staticmethod
     def _escape_csv(text: str) -> str:
@@ -118,18 +228,22 @@ class CSVExporter(BaseExporter):
 class JSONExporter(BaseExporter):
     """Export metadata to JSON format."""
 
-    def __init__(self, pretty: bool = True, max_songs_per_file: int = 500):
+    def __init__(
+        self, pretty: bool = True, max_songs_per_file: int = 500, write_manifest: bool = False
+    ):
         """
         Initialize JSON exporter.
 
         Args:
             pretty: Whether to format JSON with indentation
             max_songs_per_file: Maximum number of songs per JSON file
+            write_manifest: Whether to write a manifest with each chunk's hash
         """
         self.pretty = pretty
         self.max_songs_per_file = max_songs_per_file
+        self.write_manifest = write_manifest
 
-    def export(self, metadata_list: List[Dict[str, str]], output_path: str) -> None:
+    def export(self, metadata_list: Sequence[Dict[str, str]], output_path: str) -> None:
         """
         Export metadata to JSON file(s).
 
@@ -151,6 +265,7 @@ class JSONExporter(BaseExporter):
 
         # Split into multiple files if necessary
         total_files = (len(metadata_list) + self.max_songs_per_file - 1) // self.max_songs_per_file
+        manifest_entries: List[Dict[str, Any]] = []
 
         for file_index in range(total_files):
             start_idx = file_index * self.max_songs_per_file
@@ -170,32 +285,40 @@ class JSONExporter(BaseExporter):
                 "songs": chunk,
             }
 
-            with open(file_path, "w", encoding="utf-8") as jsonfile:
-                if self.pretty:
-                    json.dump(export_data, jsonfile, indent=2, ensure_ascii=False)
-                else:
-                    json.dump(export_data, jsonfile, ensure_ascii=False)
+            if self.pretty:
+                content = json.dumps(export_data, indent=2, ensure_ascii=False)
+            else:
+                content = json.dumps(export_data, ensure_ascii=False)
+
+            entry = self._write_chunk(file_path, [content])
+            entry["songs"] = len(chunk)
+            manifest_entries.append(entry)
 
-            logger.info(
-                f"Exported {len(chunk)} songs to {file_path} (file {file_index + 1}/{total_files})"
-            )
+            self._log_chunk(file_path, entry, file_index, total_files)
+
+        if self.write_manifest:
+            self._write_manifest(output_dir, base_name, manifest_entries)
 
 
 class M3UExporter(BaseExporter):
     """Export metadata to M3U playlist format."""
 
-    def __init__(self, extended: bool = True, max_songs_per_file: int = 500):
+    def __init__(
+        self, extended: bool = True, max_songs_per_file: int = 500, write_manifest: bool = False
+    ):
         """
         Initialize M3U exporter.
 
         Args:
             extended: Whether to use extended M3U format (M3U8) with metadata
             max_songs_per_file: Maximum number of songs per M3U file
+            write_manifest: Whether to write a manifest with each chunk's hash
         """
         self.extended = extended
         self.max_songs_per_file = max_songs_per_file
+        self.write_manifest = write_manifest
 
-    def export(self, metadata_list: List[Dict[str, str]], output_path: str) -> None:
+    def export(self, metadata_list: Sequence[Dict[str, str]], output_path: str) -> None:
         """
         Export metadata to M3U playlist file(s).
 
@@ -217,6 +340,7 @@ class M3UExporter(BaseExporter):
 
         # Split into multiple files if necessary
         total_files = (len(metadata_list) + self.max_songs_per_file - 1) // self.max_songs_per_file
+        manifest_entries: List[Dict[str, Any]] = []
 
         for file_index in range(total_files):
             start_idx = file_index * self.max_songs_per_file
@@ -231,38 +355,45 @@ class M3UExporter(BaseExporter):
 
             file_path = output_dir / filename
 
-            with open(file_path, "w", encoding="utf-8") as m3ufile:
+            lines = []
+            if self.extended:
+                lines.append("#EXTM3U\n")
+
+            for metadata in chunk:
                 if self.extended:
-                    m3ufile.write("#EXTM3U\n")
+                    duration = metadata.get("duration", "-1")
+                    artist = metadata["artist"]
+                    title = metadata["title"]
+                    lines.append(f"#EXTINF:{duration},{artist} - {title}\n")
+
+                path = metadata.get("file_path", "")
+                lines.append(f"{path}\n")
 
-                for metadata in chunk:
-                    if self.extended:
-                        duration = metadata.get("duration", "-1")
-                        artist = metadata["artist"]
-                        title = metadata["title"]
-                        m3ufile.write(f"#EXTINF:{duration},{artist} - {title}\n")
+            entry = self._write_chunk(file_path, lines)
+            entry["songs"] = len(chunk)
+            manifest_entries.append(entry)
 
-                    path = metadata.get("file_path", "")
-                    m3ufile.write(f"{path}\n")
+            self._log_chunk(file_path, entry, file_index, total_files)
 
-            logger.info(
-                f"Exported {len(chunk)} songs to {file_path} (file {file_index + 1}/{total_files})"
-            )
+        if self.write_manifest:
+            self._write_manifest(output_dir, base_name, manifest_entries)
 
 
 class TXTExporter(BaseExporter):
     """Export metadata to simple text format."""
 
-    def __init__(self, max_songs_per_file: int = 500):
+    def __init__(self, max_songs_per_file: int = 500, write_manifest: bool = False):
         """
         Initialize TXT exporter.
 
         Args:
             max_songs_per_file: Maximum number of songs per TXT file
+            write_manifest: Whether to write a manifest with each chunk's hash
         """
         self.max_songs_per_file = max_songs_per_file
+        self.write_manifest = write_manifest
 
-    def export(self, metadata_list: List[Dict[str, str]], output_path: str) -> None:
+    def export(self, metadata_list: Sequence[Dict[str, str]], output_path: str) -> None:
         """
         Export metadata to text file(s) (format: Title - Artist).
 
@@ -284,6 +415,7 @@ class TXTExporter(BaseExporter):
 
         # Split into multiple files if necessary
         total_files = (len(metadata_list) + self.max_songs_per_file - 1) // self.max_songs_per_file
+        manifest_entries: List[Dict[str, Any]] = []
 
         for file_index in range(total_files):
             start_idx = file_index * self.max_songs_per_file
@@ -298,15 +430,20 @@ class TXTExporter(BaseExporter):
 
             file_path = output_dir / filename
 
-            with open(file_path, "w", encoding="utf-8") as txtfile:
-                for metadata in chunk:
-                    title = metadata["title"]
-                    artist = metadata["artist"]
-                    txtfile.write(f"{title} - {artist}\n")
+            lines = []
+            for metadata in chunk:
+                title = metadata["title"]
+                artist = metadata["artist"]
+                lines.append(f"{title} - {artist}\n")
+
+            entry = self._write_chunk(file_path, lines)
+            entry["songs"] = len(chunk)
+            manifest_entries.append(entry)
+
+            self._log_chunk(file_path, entry, file_index, total_files)
 
-            logger.info(
-                f"Exported {len(chunk)} songs to {file_path} (file {file_index + 1}/{total_files})"
-            )
+        if self.write_manifest:
+            self._write_manifest(output_dir, base_name, manifest_entries)
 
 
 def get_exporter(format_type: str, **kwargs) -> BaseExporter:
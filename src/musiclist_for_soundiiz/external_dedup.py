@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""Out-of-core duplicate removal for libraries that do not fit in memory."""
+
+import heapq
+import json
+import logging
+import shutil
+import sys
+import tempfile
+from array import array
+from itertools import groupby
+from pathlib import Path
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from .duplicate_detector import STRATEGIES, DuplicateDetector
+from .export_history import ExportedKeySet
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry overhead of a buffered (key, seq, path_length) tuple
+_ENTRY_OVERHEAD = 120
+
+# Runs merged at once, bounding the number of open files
+MAX_MERGE_RUNS = 128
+
+
+class ExternalDeduplicator:
+    """
+    Remove duplicates with bounded memory by spilling to disk.
+
+    Records are appended in arrival order to a spill file. Their duplicate
+    keys are buffered as (key, seq, path_length) entries and written as
+    sorted runs whenever the buffer exceeds the memory budget. finish()
+    k-way merges the runs (in several passes of at most MAX_MERGE_RUNS runs
+    if there are more), so each duplicate group is seen consecutively and
+    the strategy picks the entry to keep; only the sequence numbers of
+    removed records stay in memory (8 bytes each). Kept records are then
+    streamed back from the spill file in their original order.
+
+    Only exact title/artist keys are supported (no fuzzy, duration or ISRC
+    grouping, which need the whole library in memory).
+    """
+
+    def __init__(
+        self,
+        detector: Optional[DuplicateDetector] = None,
+        strategy: Optional[str] = "keep_first",
+        max_memory: int = 256 * 1024 * 1024,
+        exclude_keys: Optional[ExportedKeySet] = None,
+        temp_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            detector: Detector whose track keys are used
+            strategy: 'keep_first', 'keep_last', 'keep_shortest_path', or None
+                      to keep all records
+            max_memory: Memory budget of the key buffer in bytes
+            exclude_keys: Keys of a previous export; groups whose key is in
+                          this set are dropped after deduplication
+            temp_dir: Directory for spill files (system default if None)
+
+        Raises:
+            ValueError: If the strategy is unknown or the budget is not positive
+        """
+        if strategy is not None and strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        if max_memory <= 0:
+            raise ValueError(f"Invalid memory budget: {max_memory}")
+
+        self.detector = detector or DuplicateDetector()
+        self.strategy = strategy
+        self.max_memory = max_memory
+        self.exclude_keys = exclude_keys
+
+        self._dir = Path(tempfile.mkdtemp(prefix="musiclist-spill-", dir=temp_dir))
+        # Closed by finish() or cleanup()
+        self._records: IO[str] = open(  # noqa: SIM115
+            self._dir / "records.jsonl", "w", encoding="utf-8"
+        )
+        self._runs: List[Path] = []
+        self._spilled_runs = 0
+        # Number of the next run file (merge passes write runs too)
+        self._next_run = 0
+        self._buffer: List[Tuple[str, int, int]] = []
+        self._buffer_size = 0
+        self._count = 0
+        self._removed = array("Q")
+        self.duplicate_groups = 0
+        self.excluded = 0
+
+    def add(self, metadata: Dict[str, str]) -> None:
+        """
+        Add a record.
+
+        Args:
+            metadata: Metadata dictionary
+        """
+        seq = self._count
+        self._count += 1
+        self._records.write(json.dumps(metadata, ensure_ascii=False) + "\n")
+
+        key = self.detector.track_key(metadata)
+        if key is None:
+            # Records without title or artist are always kept
+            return
+
+        self._buffer.append((key, seq, len(metadata.get("file_path", ""))))
+        self._buffer_size += sys.getsizeof(key) + _ENTRY_OVERHEAD
+        if self._buffer_size >= self.max_memory:
+            self._spill()
+
+    def __len__(self) -> int:
+        """Return the number of records added."""
+        return self._count
+
+    def _spill(self) -> None:
+        """Write the key buffer as a sorted run."""
+        if not self._buffer:
+            return
+
+        self._buffer.sort()
+        run_path = self._write_run(self._buffer)
+        logger.debug(f"Spilled {len(self._buffer)} keys to {run_path}")
+
+        self._runs.append(run_path)
+        self._spilled_runs += 1
+        self._buffer = []
+        self._buffer_size = 0
+
+    def _write_run(self, entries: Iterable[Tuple[str, int, int]]) -> Path:
+        """Write sorted entries to a new run file."""
+        run_path = self._dir / f"run_{self._next_run:05d}.jsonl"
+        self._next_run += 1
+        with open(run_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return run_path
+
+    def _reduce_runs(self) -> None:
+        """Merge runs into fewer, larger runs until at most MAX_MERGE_RUNS are left."""
+        while len(self._runs) > MAX_MERGE_RUNS:
+            runs: List[Path] = []
+            for start in range(0, len(self._runs), MAX_MERGE_RUNS):
+                batch = self._runs[start : start + MAX_MERGE_RUNS]
+                if len(batch) == 1:
+                    runs.append(batch[0])
+                    continue
+                runs.append(self._write_run(heapq.merge(*(self._read_run(path) for path in batch))))
+                for path in batch:
+                    path.unlink()
+            logger.debug(f"Merged {len(self._runs)} runs into {len(runs)}")
+            self._runs = runs
+
+    @staticmethod
+    def _read_run(run_path: Path) -> Iterator[Tuple[str, int, int]]:
+        with open(run_path, encoding="utf-8") as f:
+            for line in f:
+                key, seq, path_length = json.loads(line)
+                yield key, seq, path_length
+
+    def _keep(self, group: List[Tuple[str, int, int]]) -> int:
+        """Get the sequence number kept from a group sorted by seq."""
+        if self.strategy == "keep_last":
+            return group[-1][1]
+        if self.strategy == "keep_shortest_path":
+            # min() returns the first entry on ties
+            return min(group, key=lambda entry: entry[2])[1]
+        return group[0][1]
+
+    def finish(self) -> "SpilledRecords":
+        """
+        Merge the runs and decide which records are kept.
+
+        Returns:
+            Sequence of kept records in their original order
+        """
+        self._records.close()
+        if self._runs:
+            self._spill()
+            self._reduce_runs()
+            merged: Iterator[Tuple[str, int, int]] = heapq.merge(
+                *(self._read_run(run_path) for run_path in self._runs)
+            )
+        else:
+            # Everything fit in memory: no need to write a run
+            self._buffer.sort()
+            merged = iter(self._buffer)
+
+        removed_runs: List[array] = []
+        removed: List[int] = []
+        for key, entries in groupby(merged, key=lambda entry: entry[0]):
+            group = list(entries)
+
+            if self.strategy is not None and len(group) > 1:
+                self.duplicate_groups += 1
+                keep = self._keep(group)
+                kept = [keep]
+                removed.extend(entry[1] for entry in group if entry[1] != keep)
+            else:
+                kept = [entry[1] for entry in group]
+
+            if self.exclude_keys is not None and key in self.exclude_keys:
+                removed.extend(kept)
+                self.excluded += len(kept)
+
+            # Move removed sequence numbers to compact sorted arrays
+            if len(removed) >= 65536:
+                removed_runs.append(array("Q", sorted(removed)))
+                removed = []
+
+        removed_runs.append(array("Q", sorted(removed)))
+        self._removed = array("Q", heapq.merge(*removed_runs))
+        self._buffer = []
+
+        logger.info(
+            f"Merged {self._spilled_runs} sorted runs: {self.duplicate_groups} duplicate groups, "
+            f"{len(self._removed)} records removed"
+        )
+        return SpilledRecords(self._dir / "records.jsonl", self._count, self._removed)
+
+    def cleanup(self) -> None:
+        """Delete the spill files."""
+        if not self._records.closed:
+            self._records.close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+    def __enter__(self) -> "ExternalDeduplicator":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.cleanup()
+
+
+class SpilledRecords(Sequence[Dict[str, str]]):
+    """
+    Read-only sequence of the records kept by ExternalDeduplicator.
+
+    Records are streamed from the spill file. Forward slices (as used by the
+    exporters to build chunks) continue from the last position, so a full
+    pass reads the file once.
+    """
+
+    def __init__(self, path: Path, total: int, removed: array):
+        """
+        Initialize the sequence.
+
+        Args:
+            path: Spill file with one JSON record per line
+            total: Number of records in the spill file
+            removed: Sorted sequence numbers of removed records
+        """
+        self._path = path
+        self._total = total
+        self._removed = removed
+        self._iterator: Optional[Iterator[Dict[str, str]]] = None
+        self._position = 0
+
+    def __len__(self) -> int:
+        """Return the number of kept records."""
+        return self._total - len(self._removed)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        """Iterate over the kept records in their original order."""
+        removed = iter(self._removed)
+        next_removed = next(removed, None)
+        with open(self._path, encoding="utf-8") as f:
+            for seq, line in enumerate(f):
+                if seq == next_removed:
+                    next_removed = next(removed, None)
+                    continue
+                yield json.loads(line)
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, str]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Dict[str, str]]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, str], List[Dict[str, str]]]:
+        """Get a record or a list of records (contiguous slices only)."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Only contiguous slices are supported")
+            return self._read(start, max(stop - start, 0))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return self._read(index, 1)[0]
+
+    def _read(self, start: int, count: int) -> List[Dict[str, str]]:
+        """Read count kept records starting at position start."""
+        if self._iterator is None or start < self._position:
+            self._iterator = iter(self)
+            self._position = 0
+
+        for _ in range(start - self._position):
+            next(self._iterator)
+        records = [next(self._iterator) for _ in range(count)]
+        self._position = start + count
+        return records
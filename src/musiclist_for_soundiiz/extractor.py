@@ -1,15 +1,83 @@
 # -*- coding: utf-8 -*-
 """Music file metadata extraction."""
 
+import hashlib
+import itertools
 import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Dict, List, Mapping, Optional, Tuple
+from typing import (
+    IO,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from mutagen import File as MutagenFile
 
+from .autotune import ConcurrencyTuner
+from .isolation import WorkerPool
+from .mmap_reader import READ_BACKENDS, MappedFile, MmapBackend
+from .prefetch import Prefetcher
+from .schedule import SCHEDULES, iter_schedule
+from .throttle import Throttle, ThrottledFile
+
 logger = logging.getLogger(__name__)
 
 
+def normalize_isrc(isrc: Optional[str]) -> str:
+    """
+    Normalize an ISRC for comparison.
+
+    Args:
+        isrc: ISRC as found in tags or CSV (may contain hyphens)
+
+    Returns:
+        Upper-case ISRC without hyphens and whitespace, or empty string
+    """
+    if not isrc:
+        return ""
+    return isrc.replace("-", "").replace(" ", "").strip().upper()
+
+
+def compute_track_id(title: str, artist: str, album: str, isrc: str, duration: str) -> str:
+    """
+    Compute a stable track ID that does not depend on the file path.
+
+    The ID is derived from the ISRC when present, otherwise from the
+    normalized title, artist, album and duration.
+
+    Args:
+        title: Song title
+        artist: Artist name
+        album: Album name
+        isrc: ISRC code (may be empty)
+        duration: Duration in seconds (may be empty)
+
+    Returns:
+        16 character hex string
+    """
+    normalized_isrc = normalize_isrc(isrc)
+    if normalized_isrc:
+        source = f"isrc:{normalized_isrc}"
+    else:
+        tags = "|".join(" ".join(value.lower().split()) for value in (title, artist, album))
+        source = f"tags:{tags}|{duration}"
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=8).hexdigest()
+
+
 class MusicFileExtractor:
     """Extract metadata from music files."""
 
@@ -25,14 +93,93 @@ class MusicFileExtractor:
         ".wma",  # Windows Media Audio
     }
 
-    def __init__(self, include_extensions: Optional[List[str]] = None):
+    def __init__(
+        self,
+        include_extensions: Optional[List[str]] = None,
+        walk_jobs: int = 1,
+        unique_files: bool = False,
+        list_aliases: bool = False,
+        jobs: Union[int, str] = 1,
+        prefetch: int = 0,
+        read_backend: str = "read",
+        schedule: str = "path",
+        max_read_mbps: Optional[float] = None,
+        max_files_per_sec: Optional[float] = None,
+        file_timeout: Optional[float] = None,
+        file_memory_limit: Optional[int] = None,
+    ):
         """
         Initialize the extractor.
 
         Args:
             include_extensions: List of file extensions to include (e.g., ['.mp3', '.flac']).
                                If None, all supported extensions are used.
+            walk_jobs: Number of threads listing subdirectories in parallel during
+                       recursive scans (1 walks sequentially)
+            unique_files: Parse each physical file (device and inode) only once
+                          across all scans of this extractor, so hardlinks and
+                          symlinks to a file already seen are aliases. Only the
+                          device and inode of each file are kept, unless
+                          aliases are listed
+            list_aliases: With unique_files, still return aliases, with the
+                          metadata of the first path and their own file path
+            jobs: Number of files extracted in parallel, or 'auto' to adapt it
+                  to the measured throughput while extracting
+            prefetch: Number of upcoming files whose headers are read ahead
+                      with posix_fadvise (0 disables; no-op off Linux)
+            read_backend: 'read' for regular file reads, or 'mmap' to parse tags
+                          from memory-mapped files (local filesystems only)
+            schedule: Order in which files are read: 'path', or 'inode' or
+                      'physical' (disk offset) to reduce seeks on spinning
+                      disks; metadata is always returned in path order
+            max_read_mbps: Maximum rate (MB/s) at which file contents are read,
+                           shared by all extraction threads, or None
+            max_files_per_sec: Maximum number of files opened per second,
+                               shared by all extraction threads, or None
+            file_timeout: Extract files in worker processes and give up on a
+                          file (killing its worker) after this many seconds
+            file_memory_limit: Extract files in worker processes whose address
+                               space is limited to this many bytes (Unix only)
+
+        Raises:
+            ValueError: If walk_jobs, jobs, read_backend, schedule, a rate
+                        limit, file_timeout or file_memory_limit is invalid
         """
+        if walk_jobs < 1:
+            raise ValueError(f"Invalid number of walk jobs: {walk_jobs}")
+        if jobs != "auto" and (not isinstance(jobs, int) or jobs < 1):
+            raise ValueError(f"Invalid number of jobs: {jobs}")
+        self.walk_jobs = walk_jobs
+        self.jobs = jobs
+        self.prefetch = prefetch
+        if read_backend not in READ_BACKENDS:
+            raise ValueError(f"Unknown read backend: {read_backend}")
+        self._mmap_backend = MmapBackend() if read_backend == "mmap" else None
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unknown schedule: {schedule}")
+        self.schedule = schedule
+        self.throttle = (
+            Throttle(max_read_mbps, max_files_per_sec)
+            if max_read_mbps is not None or max_files_per_sec is not None
+            else None
+        )
+        if file_timeout is not None and file_timeout <= 0:
+            raise ValueError(f"Invalid file timeout: {file_timeout}")
+        if file_memory_limit is not None and file_memory_limit <= 0:
+            raise ValueError(f"Invalid file memory limit: {file_memory_limit}")
+        self.file_timeout = file_timeout
+        self.file_memory_limit = file_memory_limit
+        self.read_backend = read_backend
+        # (file path, reason) of every file that could not be extracted
+        self.failures: List[Tuple[str, str]] = []
+        self.unique_files = unique_files
+        self.list_aliases = list_aliases
+        self.aliases = 0
+        # Each physical file seen, with its metadata (None if extraction
+        # failed) only when aliases are listed, so nothing else is kept
+        self._files: Dict[Tuple[int, int], Optional[Future[Optional[Dict[str, str]]]]] = {}
+        self._files_lock = threading.Lock()
+
         if include_extensions:
             self.extensions = {ext.lower() for ext in include_extensions}
             # Validate extensions
@@ -66,6 +213,11 @@ class MusicFileExtractor:
         if not dir_path.is_dir():
             raise NotADirectoryError(f"Not a directory: {directory}")
 
+        if recursive and self.walk_jobs > 1:
+            music_files = self._walk_parallel(dir_path)
+            logger.info(f"Found {len(music_files)} music files in {directory}")
+            return sorted(music_files)
+
         music_files = []
 
         try:
@@ -86,6 +238,63 @@ class MusicFileExtractor:
         logger.info(f"Found {len(music_files)} music files in {directory}")
         return sorted(music_files)
 
+    def _scan_directory(self, directory: Path) -> Tuple[List[Path], List[Path]]:
+        """
+        List the music files and subdirectories of one directory.
+
+        Like the sequential glob, symlinked subdirectories are not descended
+        into, while symlinked files are included.
+
+        Args:
+            directory: Directory to list
+
+        Returns:
+            Tuple of (music_files, subdirectories)
+        """
+        music_files: List[Path] = []
+        subdirectories: List[Path] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(Path(entry.path))
+                    elif (
+                        not entry.name.startswith(".")
+                        and os.path.splitext(entry.name)[1].lower() in self.extensions
+                        and entry.is_file()
+                    ):
+                        music_files.append(Path(entry.path))
+        except OSError as e:
+            logger.warning(f"Cannot list directory {directory}: {e}")
+        return music_files, subdirectories
+
+    def _walk_parallel(self, root: Path) -> List[Path]:
+        """
+        Find music files below a directory, listing subdirectories in parallel.
+
+        Each listed directory queues its subdirectories on a pool of
+        walk_jobs threads, so the round-trips of network filesystems overlap.
+
+        Args:
+            root: Directory to walk
+
+        Returns:
+            List of music files (unordered)
+        """
+        music_files: List[Path] = []
+        with ThreadPoolExecutor(max_workers=self.walk_jobs, thread_name_prefix="walk") as executor:
+            pending = {executor.submit(self._scan_directory, root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirectories = future.result()
+                    music_files.extend(files)
+                    pending.update(
+                        executor.submit(self._scan_directory, subdirectory)
+                        for subdirectory in subdirectories
+                    )
+        return music_files
+
     def extract_metadata(self, file_path: Path) -> Dict[str, str]:
         """
         Extract metadata from a music file.
@@ -94,13 +303,18 @@ class MusicFileExtractor:
             file_path: Path to the music file
 
         Returns:
-            Dictionary with keys: title, artist, album, isrc, genre, year, duration
+            Dictionary with keys: title, artist, album, isrc, genre, year, duration,
+            track_id, file_path, filename
 
         Raises:
             ValueError: If file cannot be read or is not a supported format
         """
         try:
-            audio = MutagenFile(str(file_path), easy=True)
+            if self._mmap_backend is None and self.throttle is None:
+                audio = MutagenFile(str(file_path), easy=True)
+            else:
+                with self._open(file_path) as fileobj:
+                    audio = MutagenFile(fileobj, easy=True)
 
             if audio is None:
                 raise ValueError(f"Cannot read file or unsupported format: {file_path}")
@@ -143,6 +357,7 @@ class MusicFileExtractor:
                 "genre": genre,
                 "year": year,
                 "duration": duration,
+                "track_id": compute_track_id(title, artist, album, isrc, duration),
                 "file_path": str(file_path),
                 "filename": file_path.name,
             }
@@ -151,6 +366,230 @@ class MusicFileExtractor:
             logger.error(f"Error extracting metadata from {file_path}: {e}")
             raise ValueError(f"Failed to extract metadata: {e}") from e
 
+    def _open(self, file_path: Path) -> Union[MappedFile, ThrottledFile, IO[bytes]]:
+        """Open a file for parsing with the read backend, within the rate limits."""
+        if self.throttle is not None:
+            self.throttle.open_file()
+        if self._mmap_backend is not None:
+            fileobj: Union[MappedFile, IO[bytes]] = self._mmap_backend.open(file_path)
+        else:
+            fileobj = open(file_path, "rb")  # noqa: SIM115 - returned to the caller
+        if self.throttle is not None:
+            return ThrottledFile(fileobj, self.throttle)
+        return fileobj
+
+    def iter_metadata(self, directory: str, recursive: bool = True) -> Iterator[Dict[str, str]]:
+        """
+        Find music files in a directory and yield their metadata one by one.
+
+        Files whose metadata cannot be read are skipped with a warning. With a
+        schedule other than 'path', batches of files are read in disk order
+        (see iter_schedule()), so at most one batch of results is held back
+        to restore the path order.
+
+        Args:
+            directory: Path to the directory to scan
+            recursive: Whether to search subdirectories recursively
+
+        Yields:
+            Metadata dictionaries in path order
+        """
+        file_paths = self.find_music_files(directory, recursive)
+        if self.schedule == "path":
+            for metadata in self._extract_files(file_paths):
+                if metadata is not None:
+                    yield metadata
+            return
+
+        # Read in disk order, then restore the canonical order
+        order, reading = itertools.tee(iter_schedule(file_paths, self.schedule))
+        results = self._extract_files(file_paths[index] for index in reading)
+        slots: Dict[int, Optional[Dict[str, str]]] = {}
+        next_index = 0
+        for index, metadata in zip(order, results):
+            slots[index] = metadata
+            while next_index in slots:
+                metadata = slots.pop(next_index)
+                next_index += 1
+                if metadata is not None:
+                    yield metadata
+
+    def _extract_files(self, file_paths: Iterable[Path]) -> Iterator[Optional[Dict[str, str]]]:
+        """
+        Extract files in the given order (in parallel with jobs > 1).
+
+        Args:
+            file_paths: Files to extract
+
+        Yields:
+            Metadata of each file in the same order, None for skipped files
+        """
+        prefetcher = Prefetcher(self.prefetch)
+        pool = (
+            WorkerPool(self.file_timeout, self.file_memory_limit, self.read_backend)
+            if self.file_timeout is not None or self.file_memory_limit is not None
+            else None
+        )
+        try:
+            if self.jobs == 1:
+                for file_path in prefetcher.ahead(file_paths):
+                    metadata = self._process_file(file_path, pool)
+                    prefetcher.release(file_path)
+                    yield metadata
+            else:
+                yield from self._extract_parallel(prefetcher.ahead(file_paths), prefetcher, pool)
+        finally:
+            prefetcher.close()
+            if pool is not None:
+                pool.close()
+
+    def _process_file(
+        self, file_path: Path, pool: Optional[WorkerPool] = None
+    ) -> Optional[Dict[str, str]]:
+        """
+        Extract the metadata of a found file.
+
+        Args:
+            file_path: Path to the music file
+            pool: Worker processes to extract the file in, or None to extract
+                  it in this thread
+
+        Returns:
+            Metadata dictionary, or None if the file is skipped
+        """
+        claimed = None
+        if self.unique_files:
+            key = self._physical_key(file_path)
+            if key is not None:
+                with self._files_lock:
+                    seen = key in self._files
+                    if seen:
+                        earlier = self._files[key]
+                        self.aliases += 1
+                    else:
+                        claimed = self._files[key] = Future() if self.list_aliases else None
+                if seen:
+                    return self._alias(file_path, earlier)
+
+        metadata = None
+        try:
+            if pool is not None:
+                metadata = self._extract_isolated(file_path, pool)
+            else:
+                metadata = self.extract_metadata(file_path)
+        except Exception as e:
+            logger.warning(f"Skipping file {file_path}: {e}")
+            with self._files_lock:
+                self.failures.append((str(file_path), str(e)))
+        finally:
+            if claimed is not None:
+                claimed.set_result(metadata)
+        return metadata
+
+    def _extract_isolated(self, file_path: Path, pool: WorkerPool) -> Dict[str, str]:
+        """Extract a file in a worker process, within the rate limits."""
+        if self.throttle is None:
+            return pool.extract(file_path)[0]
+
+        self.throttle.open_file()
+        metadata, bytes_read = pool.extract(file_path)
+        # The worker reads freely, so later files wait for the bytes it read
+        self.throttle.read(bytes_read)
+        self.throttle.count(bytes_read)
+        return metadata
+
+    def _timed_process_file(
+        self, file_path: Path, prefetcher: Prefetcher, pool: Optional[WorkerPool]
+    ) -> Tuple[Optional[Dict[str, str]], float]:
+        """Extract the metadata of a file and measure the seconds it took."""
+        start = time.perf_counter()
+        metadata = self._process_file(file_path, pool)
+        prefetcher.release(file_path)
+        return metadata, time.perf_counter() - start
+
+    def _extract_parallel(
+        self,
+        file_paths: Iterable[Path],
+        prefetcher: Prefetcher,
+        pool: Optional[WorkerPool] = None,
+    ) -> Iterator[Optional[Dict[str, str]]]:
+        """
+        Extract files on a thread pool, yielding metadata in file order.
+
+        At most ``jobs`` files are extracted at once. With jobs='auto' the
+        limit follows a ConcurrencyTuner fed with the latency of every file.
+
+        Args:
+            file_paths: Files in the order their metadata is yielded
+            prefetcher: Prefetcher releasing each file after extraction
+            pool: Worker processes extracting the files, or None
+
+        Yields:
+            Metadata of each file, None for skipped files
+        """
+        tuner = ConcurrencyTuner() if self.jobs == "auto" else None
+        limit = tuner.jobs if tuner is not None else int(self.jobs)
+        max_workers = tuner.max_jobs if tuner is not None else limit
+
+        ordered: Deque[Future[Tuple[Optional[Dict[str, str]], float]]] = deque()
+        running: Set[Future[Tuple[Optional[Dict[str, str]], float]]] = set()
+        remaining = iter(file_paths)
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extract") as executor:
+            while ordered or not exhausted:
+                # Bound the results held back by a slow file at the head
+                while not exhausted and len(running) < limit and len(ordered) < 4 * limit + 16:
+                    file_path = next(remaining, None)
+                    if file_path is None:
+                        exhausted = True
+                        break
+                    future = executor.submit(self._timed_process_file, file_path, prefetcher, pool)
+                    ordered.append(future)
+                    running.add(future)
+
+                while ordered and ordered[0].done():
+                    yield ordered.popleft().result()[0]
+
+                if running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    if tuner is not None:
+                        for future in done:
+                            limit = tuner.record(future.result()[1])
+
+        if tuner is not None:
+            logger.info(f"Extraction autotune: finished with {tuner.jobs} jobs")
+
+    @staticmethod
+    def _physical_key(file_path: Path) -> Optional[Tuple[int, int]]:
+        """Get the (device, inode) of a file, following symlinks."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _alias(
+        self, file_path: Path, earlier: "Optional[Future[Optional[Dict[str, str]]]]"
+    ) -> Optional[Dict[str, str]]:
+        """
+        Get the metadata of a path to a physical file that was already seen.
+
+        The first path may still be parsed by another scan thread; parsing
+        never waits for other files, so waiting for its result cannot block.
+
+        Args:
+            file_path: Alias path
+            earlier: Metadata of the first path, or None if aliases are not listed
+
+        Returns:
+            Metadata with the alias file path if aliases are listed, else None
+        """
+        metadata = earlier.result() if earlier is not None else None
+        if metadata is None:
+            logger.debug(f"Skipping alias of an already scanned file: {file_path}")
+            return None
+        return dict(metadata, file_path=str(file_path), filename=file_path.name)
+
     def extract_all(self, directory: str, recursive: bool = True) -> List[Dict[str, str]]:
         """
         Find and extract metadata from all music files in a directory.
@@ -162,16 +601,7 @@ class MusicFileExtractor:
         Returns:
             List of metadata dictionaries
         """
-        music_files = self.find_music_files(directory, recursive)
-        metadata_list = []
-
-        for file_path in music_files:
-            try:
-                metadata = self.extract_metadata(file_path)
-                metadata_list.append(metadata)
-            except Exception as e:
-                logger.warning(f"Skipping file {file_path}: {e}")
-                continue
+        metadata_list = list(self.iter_metadata(directory, recursive))
 
         logger.info(f"Successfully extracted metadata from {len(metadata_list)} files")
         return metadata_list
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""File helpers shared by the exporters and on-disk indexes."""
+
+import contextlib
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+
+def _new_file_mode(file_path: Path) -> int:
+    """Get the mode of the file being replaced, or the umask default for new files."""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        pass
+    # The umask can only be read by setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def atomic_write(file_path: Path, data: bytes) -> None:
+    """
+    Write data to a temporary file next to file_path and rename it into place.
+
+    Readers never see a partially written file. The file gets the mode of
+    the file it replaces, or the mode a regular open() would create it with
+    (mkstemp creates temporary files as 0600).
+
+    Args:
+        file_path: Destination file
+        data: Complete file content
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=str(file_path.parent), prefix=f".{file_path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_name, _new_file_mode(file_path))
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        raise
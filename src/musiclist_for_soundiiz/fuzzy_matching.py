@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""Fuzzy title/artist normalization and similarity clustering."""
+
+import logging
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Version/credit suffixes that do not make a different song
+_SUFFIX_WORDS = r"(?:re-?master(?:ed)?|live|feat\.?|ft\.?|featuring)"
+_BRACKET_SUFFIX = re.compile(rf"\s*[(\[][^)\]]*\b{_SUFFIX_WORDS}(?:\W[^)\]]*)?[)\]]")
+_DASH_SUFFIX = re.compile(rf"\s+[-–—]\s+(?:[^-–—]*\s)?{_SUFFIX_WORDS}(?:\W.*)?$")
+_FEATURING = re.compile(r"\s+(?:feat\.?|ft\.?|featuring)\s+.*$")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class FuzzyNormalizer:
+    """
+    Normalize titles and artists for fuzzy comparison.
+
+    The pipeline applies Unicode NFKC and casefolding, strips
+    remaster/live/featuring suffixes, removes diacritics and punctuation and
+    collapses whitespace. Results are memoized per unique input string.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the normalizer with an empty cache."""
+        self._cache: Dict[str, str] = {}
+
+    def __call__(self, text: str) -> str:
+        """
+        Normalize a title or artist.
+
+        Args:
+            text: Raw tag value
+
+        Returns:
+            Normalized text
+        """
+        normalized = self._cache.get(text)
+        if normalized is None:
+            normalized = self._normalize(text)
+            self._cache[text] = normalized
+        return normalized
+
+    def __len__(self) -> int:
+        """Return the number of cached strings."""
+        return len(self._cache)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Run the normalization pipeline without caching."""
+        folded = unicodedata.normalize("NFKC", text).casefold()
+
+        stripped = _BRACKET_SUFFIX.sub("", folded)
+        stripped = _DASH_SUFFIX.sub("", stripped)
+        stripped = _FEATURING.sub("", stripped)
+        stripped = stripped.replace("&", " and ")
+
+        if stripped.isascii():
+            without_marks = stripped
+        else:
+            decomposed = unicodedata.normalize("NFKD", stripped)
+            without_marks = "".join(c for c in decomposed if not unicodedata.combining(c))
+
+        cleaned = _PUNCTUATION.sub(" ", without_marks)
+        cleaned = _WHITESPACE.sub(" ", cleaned).strip()
+
+        # Keep something comparable for titles made only of punctuation
+        return cleaned or folded.strip()
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    """Get the character trigrams of a string (padded so short strings have some)."""
+    padded = f"  {text} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def _blocking_keys(title: str, artist: str) -> List[Tuple[int, str]]:
+    """
+    Get the blocks a key is compared in, with the field that differs in them.
+
+    Keys are compared when they share the artist and the first characters
+    of the title (titles are scored), or the title and the first characters
+    of the artist (artists are scored).
+    """
+    return [(0, f"{artist}|{title[:3]}"), (1, f"{title}|{artist[:3]}")]
+
+
+class _UnionFind:
+    """Disjoint sets over key indices."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the smaller index as root so clusters are deterministic
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+
+def cluster_similar_keys(
+    keys: Iterable[str], threshold: float = 0.9, max_block_size: int = 200
+) -> Dict[str, str]:
+    """
+    Cluster normalized ``title|artist`` keys by similarity.
+
+    Candidate pairs come from blocking (see _blocking_keys), so only keys that
+    share a block are scored instead of all pairs. Since one field is equal
+    within a block, only the other field is scored. Pairs are filtered by
+    length and trigram overlap before the SequenceMatcher ratio is computed.
+
+    Args:
+        keys: Distinct normalized keys
+        threshold: Minimum similarity ratio for the differing field
+        max_block_size: Blocks larger than this are skipped to bound the cost
+
+    Returns:
+        Mapping of every key to the representative key of its cluster
+    """
+    key_list = list(keys)
+    fields: List[Tuple[str, str]] = []
+    blocks: Dict[Tuple[int, str], List[int]] = {}
+    for index, key in enumerate(key_list):
+        title, _sep, artist = key.partition("|")
+        fields.append((title, artist))
+        for block_key in _blocking_keys(title, artist):
+            blocks.setdefault(block_key, []).append(index)
+
+    clusters = _UnionFind(len(key_list))
+    trigram_cache: Dict[str, FrozenSet[str]] = {}
+    matcher = SequenceMatcher(autojunk=False)
+    comparisons = 0
+
+    def trigrams(text: str) -> FrozenSet[str]:
+        grams = trigram_cache.get(text)
+        if grams is None:
+            grams = trigram_cache[text] = _trigrams(text)
+        return grams
+
+    for (field, block_value), members in blocks.items():
+        if len(members) < 2:
+            continue
+        if len(members) > max_block_size:
+            logger.debug(f"Skipping oversized block {block_value!r} ({len(members)} keys)")
+            continue
+
+        for i, first in enumerate(members):
+            first_text = fields[first][field]
+            first_grams = trigrams(first_text)
+            matcher.set_seq2(first_text)
+
+            for second in members[i + 1 :]:
+                second_text = fields[second][field]
+                # Upper bound of the ratio from the lengths alone
+                total_length = len(first_text) + len(second_text)
+                if 2 * min(len(first_text), len(second_text)) < threshold * total_length:
+                    continue
+
+                # A ratio >= threshold allows at most this many insertions and
+                # deletions, and each one destroys at most 3 trigrams
+                max_edits = int((1.0 - threshold) * total_length)
+                second_grams = trigrams(second_text)
+                shared = len(first_grams & second_grams)
+                if shared < max(len(first_grams), len(second_grams)) - 3 * max_edits:
+                    continue
+
+                if clusters.find(first) == clusters.find(second):
+                    continue
+
+                comparisons += 1
+                matcher.set_seq1(second_text)
+                if matcher.ratio() >= threshold:
+                    clusters.union(first, second)
+
+    logger.debug(f"Fuzzy matching: {comparisons} scored pairs in {len(blocks)} blocks")
+
+    return {key: key_list[clusters.find(index)] for index, key in enumerate(key_list)}
@@ -10,6 +10,7 @@ from .duplicate_detector import DuplicateDetector
 from .exporter import get_exporter
 from .extractor import MusicFileExtractor
 from .i18n import I18n
+from .scanner import normalize_roots, scan_roots
 
 
 class MusicListGUI:
@@ -401,13 +402,16 @@ class MusicListGUI:
             self._log(_.get("starting_processing"))
 
             # Initialize extractor
-            extractor = MusicFileExtractor()
+            extractor = MusicFileExtractor(unique_files=True)
 
             # Extract metadata from all directories
             all_metadata = []
-            total_dirs = len(self.input_dirs)
+            input_dirs = normalize_roots(self.input_dirs, self.recursive.get())
+            total_dirs = len(input_dirs)
 
-            for dir_idx, directory in enumerate(self.input_dirs, 1):
+            # Directories on different devices are scanned in parallel
+            scanned = scan_roots(extractor, input_dirs, self.recursive.get())
+            for dir_idx, (directory, metadata_list) in enumerate(scanned, 1):
                 # Update progress bar
                 progress_percent = (dir_idx / total_dirs) * 100
                 self.progress_bar["value"] = progress_percent
@@ -417,9 +421,6 @@ class MusicListGUI:
                 self.status_label.config(text=status_msg)
 
                 self._log(f"{_.get('scanning')} {directory}")
-                metadata_list = extractor.extract_all(
-                    directory=directory, recursive=self.recursive.get()
-                )
                 all_metadata.extend(metadata_list)
                 self._log(f"  {_.get('found_files', count=len(metadata_list))}")
 
@@ -452,15 +453,20 @@ class MusicListGUI:
             if self.detect_duplicates.get() or self.remove_duplicates.get():
                 self._log(_.get("checking_duplicates"))
                 detector = DuplicateDetector()
-                duplicates = detector.find_duplicates(all_metadata)
-
-                if duplicates:
-                    dup_count = sum(len(v) for v in duplicates.values())
-                    self._log(_.get("found_duplicates", groups=len(duplicates), total=dup_count))
+                duplicate_index = detector.build_index(all_metadata)
+
+                if duplicate_index.groups:
+                    self._log(
+                        _.get(
+                            "found_duplicates",
+                            groups=len(duplicate_index),
+                            total=duplicate_index.total_files,
+                        )
+                    )
 
                     if self.remove_duplicates.get():
-                        unique_list, removed_list = detector.remove_duplicates(
-                            all_metadata, strategy=self.duplicate_strategy.get()
+                        unique_list, removed_list = duplicate_index.remove_duplicates(
+                            strategy=self.duplicate_strategy.get()
                         )
                         metadata_to_export = unique_list
                         self._log(_.get("removed_duplicates", count=len(removed_list)))
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""Duplicate index that is updated track by track instead of rebuilt."""
+
+import json
+import logging
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .duplicate_detector import DuplicateDetector, DuplicateIndex
+from .fileutil import atomic_write
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+class IncrementalDuplicateIndex:
+    """
+    Duplicate groups of a changing library.
+
+    Tracks are identified by their file path. Adding or removing a track
+    only touches its own group, and every change increments ``version``, so
+    a long-lived process can ask which groups changed since the version it
+    last saw instead of re-running duplicate detection over everything.
+
+    Groups are keyed like DuplicateDetector.track_key() and keep tracks in
+    the order they were added, so keep_first/keep_last behave as for a scan.
+    Fuzzy merging of similar keys, duration splitting and ISRC matching
+    relate different keys to each other and are not supported.
+    """
+
+    def __init__(self, detector: Optional[DuplicateDetector] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            detector: Detector whose track keys are used
+
+        Raises:
+            ValueError: If the detector uses matching that needs a full rebuild
+        """
+        detector = detector or DuplicateDetector()
+        if (
+            (detector.fuzzy and detector.similarity_threshold < 1.0)
+            or detector.duration_tolerance is not None
+            or detector.use_isrc
+        ):
+            raise ValueError(
+                "Incremental index supports exact and normalized title/artist keys only"
+            )
+
+        self.detector = detector
+        self.version = 0
+        self._tracks: Dict[str, Tuple[Optional[str], Dict[str, str]]] = {}
+        # Ordered sets of track ids per key (dicts keep insertion order)
+        self._groups: Dict[str, Dict[str, None]] = {}
+        self._duplicate_groups = 0
+        # Last version each key changed in, and a log of (version, key) changes
+        self._changed: Dict[str, int] = {}
+        self._log: List[Tuple[int, str]] = []
+
+    @staticmethod
+    def _track_id(metadata: Dict[str, str]) -> str:
+        """Get the identity of a track."""
+        track_id = metadata.get("file_path") or metadata.get("track_id")
+        if not track_id:
+            raise ValueError("Track needs a file_path or track_id")
+        return track_id
+
+    def __len__(self) -> int:
+        """Return the number of duplicate groups."""
+        return self._duplicate_groups
+
+    def __contains__(self, metadata: object) -> bool:
+        """Check whether a track (by file path) is in the index."""
+        return isinstance(metadata, dict) and self._track_id(metadata) in self._tracks
+
+    @property
+    def total_tracks(self) -> int:
+        """Number of tracks in the index."""
+        return len(self._tracks)
+
+    def _touch(self, key: str) -> None:
+        """Record a change of a key in the current version."""
+        self._changed[key] = self.version
+        self._log.append((self.version, key))
+        # Drop superseded log entries once they outnumber the live ones
+        if len(self._log) > 2 * len(self._changed) + 1024:
+            self._log = sorted((version, key) for key, version in self._changed.items())
+
+    def add(self, metadata: Dict[str, str]) -> int:
+        """
+        Add a track, replacing a previous track with the same file path.
+
+        Args:
+            metadata: Metadata dictionary
+
+        Returns:
+            New version of the index
+        """
+        track_id = self._track_id(metadata)
+        if track_id in self._tracks:
+            self._discard(track_id)
+
+        self.version += 1
+        key = self.detector.track_key(metadata)
+        self._tracks[track_id] = (key, metadata)
+
+        if key is not None:
+            group = self._groups.setdefault(key, {})
+            group[track_id] = None
+            if len(group) == 2:
+                self._duplicate_groups += 1
+            self._touch(key)
+
+        return self.version
+
+    def remove(self, metadata: Dict[str, str]) -> bool:
+        """
+        Remove a track.
+
+        Args:
+            metadata: Metadata dictionary (only the file path is used)
+
+        Returns:
+            True if the track was in the index
+        """
+        track_id = self._track_id(metadata)
+        if track_id not in self._tracks:
+            return False
+        self._discard(track_id)
+        return True
+
+    def _discard(self, track_id: str) -> None:
+        """Remove a track known to be in the index."""
+        self.version += 1
+        key, _metadata = self._tracks.pop(track_id)
+        if key is None:
+            return
+
+        group = self._groups[key]
+        del group[track_id]
+        if len(group) == 1:
+            self._duplicate_groups -= 1
+        elif not group:
+            del self._groups[key]
+        self._touch(key)
+
+    def group(self, key: str) -> List[Dict[str, str]]:
+        """
+        Get the tracks of a key in the order they were added.
+
+        Args:
+            key: Group key
+
+        Returns:
+            List of metadata dictionaries (empty if the key has no tracks)
+        """
+        return [self._tracks[track_id][1] for track_id in self._groups.get(key, ())]
+
+    @property
+    def duplicates(self) -> Dict[str, List[Dict[str, str]]]:
+        """Mapping of keys to tracks for all groups with two or more tracks."""
+        return {key: self.group(key) for key, group in self._groups.items() if len(group) > 1}
+
+    def groups_changed_since(self, version: int) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Get the groups that changed after a version.
+
+        Args:
+            version: A version previously returned by add() or read from
+                     ``version``
+
+        Returns:
+            Mapping of changed keys to their current tracks. A key with fewer
+            than two tracks no longer has duplicates (empty if all its tracks
+            were removed).
+        """
+        start = bisect_left(self._log, (version + 1, ""))
+        changed = dict.fromkeys(key for _version, key in self._log[start:])
+        return {key: self.group(key) for key in changed}
+
+    def to_duplicate_index(self) -> DuplicateIndex:
+        """
+        Build a DuplicateIndex of the current tracks for reports and removal.
+
+        Returns:
+            DuplicateIndex over the tracks in the order they were added
+        """
+        metadata_list: List[Dict[str, str]] = []
+        positions: Dict[str, int] = {}
+        for track_id, (_key, metadata) in self._tracks.items():
+            positions[track_id] = len(metadata_list)
+            metadata_list.append(metadata)
+
+        groups = {
+            key: sorted(positions[track_id] for track_id in group)
+            for key, group in self._groups.items()
+            if len(group) > 1
+        }
+        return DuplicateIndex(metadata_list, groups)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a JSON file (atomically).
+
+        Args:
+            path: Destination file
+        """
+        data = {
+            "format": FORMAT_VERSION,
+            "case_sensitive": self.detector.case_sensitive,
+            "fuzzy": self.detector.fuzzy,
+            "version": self.version,
+            "tracks": [metadata for _key, metadata in self._tracks.values()],
+            "changed": self._changed,
+        }
+        atomic_write(Path(path), json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        logger.info(f"Saved duplicate index with {len(self._tracks)} tracks to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalDuplicateIndex":
+        """
+        Load an index written by save().
+
+        Args:
+            path: Index file
+
+        Returns:
+            Index with the saved tracks, version and change history
+
+        Raises:
+            ValueError: If the file has an unsupported format
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported duplicate index format: {path}")
+
+        detector = DuplicateDetector(
+            case_sensitive=data["case_sensitive"],
+            fuzzy=data["fuzzy"],
+            similarity_threshold=1.0 if data["fuzzy"] else 0.9,
+        )
+        index = cls(detector)
+        for metadata in data["tracks"]:
+            index.add(metadata)
+
+        index.version = data["version"]
+        index._changed = data["changed"]
+        index._log = sorted((version, key) for key, version in index._changed.items())
+        logger.info(f"Loaded duplicate index with {len(index._tracks)} tracks from {path}")
+        return index
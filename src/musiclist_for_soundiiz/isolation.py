@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Metadata extraction in worker processes with a timeout and a memory cap."""
+
+import contextlib
+import logging
+import multiprocessing
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _limit_memory(memory_limit: int) -> None:
+    """Cap the address space of the current process (Unix only)."""
+    try:
+        import resource
+    except ImportError:
+        logger.warning("Memory limits are not supported on this platform")
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _extraction_worker(conn: Any, read_backend: str, memory_limit: Optional[int]) -> None:
+    """
+    Extract the files whose paths arrive on a connection until None arrives.
+
+    Each request is answered with (error message or None, metadata, bytes read).
+
+    Args:
+        conn: Connection to the parent process
+        read_backend: Read backend of the extractor
+        memory_limit: Address space limit in bytes, or None
+    """
+    # Imported here: the extractor module imports this one
+    from .extractor import MusicFileExtractor
+    from .throttle import Throttle
+
+    # Failures are logged by the parent
+    logging.disable(logging.ERROR)
+    if memory_limit is not None:
+        _limit_memory(memory_limit)
+
+    extractor = MusicFileExtractor(read_backend=read_backend)
+    # Only counts the bytes read, the parent applies the limits
+    extractor.throttle = counter = Throttle()
+    while True:
+        try:
+            file_path = conn.recv()
+        except EOFError:
+            break
+        if file_path is None:
+            break
+
+        bytes_before = counter.bytes_read
+        try:
+            metadata = extractor.extract_metadata(Path(file_path))
+            error = None
+        except Exception as e:
+            metadata = None
+            error = "Memory limit exceeded" if isinstance(e.__cause__, MemoryError) else str(e)
+        conn.send((error, metadata, counter.bytes_read - bytes_before))
+    conn.close()
+
+
+class _Worker:
+    """A worker process and the parent's end of its connection."""
+
+    __slots__ = ("process", "conn")
+
+    def __init__(self, process: Any, conn: Any):
+        self.process = process
+        self.conn = conn
+
+
+class WorkerPool:
+    """
+    Extract files in worker processes, one file per worker at a time.
+
+    extract() may be called from several threads; each call borrows an idle
+    worker or starts a new one, so the pool grows to the extraction
+    concurrency. A worker that exceeds the timeout is killed, and one that
+    dies (e.g. a crash in a parser) is discarded; either way a replacement
+    is started right away and the file fails with an exception, so the
+    scan continues with the same number of workers.
+
+    Workers are started with forkserver where available: forking a process
+    whose scan threads may hold locks is unsafe.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        read_backend: str = "read",
+    ):
+        """
+        Initialize the pool (workers are started on demand).
+
+        Args:
+            timeout: Seconds a file may take, or None to wait indefinitely
+            memory_limit: Address space limit of each worker in bytes
+                          (RLIMIT_AS, Unix only), or None
+            read_backend: Read backend used by the workers
+
+        Raises:
+            ValueError: If the timeout or memory limit is not positive
+        """
+        if timeout is not None and timeout <= 0:
+            raise ValueError(f"Invalid timeout: {timeout}")
+        if memory_limit is not None and memory_limit <= 0:
+            raise ValueError(f"Invalid memory limit: {memory_limit}")
+
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.read_backend = read_backend
+        self.timeouts = 0
+        self.crashes = 0
+        methods = multiprocessing.get_all_start_methods()
+        self._context: Any = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        self._idle: List[_Worker] = []
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+
+    def _start(self) -> _Worker:
+        """Start a worker process."""
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_extraction_worker,
+            args=(child_conn, self.read_backend, self.memory_limit),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, conn)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _borrow(self) -> _Worker:
+        """Take an idle worker, or start one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._start()
+
+    def _release(self, worker: _Worker) -> None:
+        """Make a worker available again."""
+        with self._lock:
+            self._idle.append(worker)
+
+    def _replace(self, worker: _Worker, crashed: bool) -> None:
+        """Kill a worker that timed out or crashed and start its replacement."""
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        with self._lock:
+            self._workers.remove(worker)
+            if crashed:
+                self.crashes += 1
+            else:
+                self.timeouts += 1
+        self._release(self._start())
+
+    def extract(self, file_path: Path) -> Tuple[Dict[str, str], int]:
+        """
+        Extract the metadata of a file in a worker process.
+
+        Args:
+            file_path: Path to the music file
+
+        Returns:
+            Metadata dictionary and the number of bytes read
+
+        Raises:
+            TimeoutError: If the file took longer than the timeout
+            RuntimeError: If the worker died while extracting the file
+            ValueError: If the file cannot be read or is not a supported format
+        """
+        worker = self._borrow()
+        try:
+            worker.conn.send(str(file_path))
+            finished = worker.conn.poll(self.timeout)
+            if finished:
+                error, metadata, bytes_read = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join()
+            exit_code = worker.process.exitcode
+            self._replace(worker, crashed=True)
+            raise RuntimeError(f"Extraction worker died (exit code {exit_code})") from None
+
+        if not finished:
+            self._replace(worker, crashed=False)
+            raise TimeoutError(f"Extraction timed out after {self.timeout:g}s")
+
+        self._release(worker)
+        if error is not None:
+            raise ValueError(f"Failed to extract metadata: {error}")
+        return metadata, bytes_read
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        with self._lock:
+            workers, self._workers, self._idle = self._workers, [], []
+        for worker in workers:
+            with contextlib.suppress(OSError):
+                worker.conn.send(None)
+        for worker in workers:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+        if self.timeouts or self.crashes:
+            logger.info(
+                f"Extraction workers: {self.timeouts} timed out, {self.crashes} died (replaced)"
+            )
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
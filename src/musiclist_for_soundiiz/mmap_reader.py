@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""Memory-mapped file access for tag parsing."""
+
+import logging
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+READ_BACKENDS = ("read", "mmap")
+
+# Filesystems where page faults turn into network round-trips
+NETWORK_FILESYSTEMS = frozenset(
+    {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "fuse.sshfs", "fuse.rclone"}
+)
+
+# Bytes mapped at the start and at the end of a file, where tags are stored
+WINDOW_SIZE = 4 * 1024 * 1024
+
+
+def filesystem_type(path: Union[str, Path]) -> Optional[str]:
+    """
+    Get the type of the filesystem a path is stored on (Linux only).
+
+    Args:
+        path: File or directory
+
+    Returns:
+        Filesystem type as listed in /proc/self/mounts, or None if unknown
+    """
+    try:
+        with open("/proc/self/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+
+    real_path = os.path.join(os.path.realpath(path), "")
+    best_point, best_type = "", None
+    for mount_point, fs_type in mounts:
+        # Spaces and other special characters are octal escapes
+        mount_point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), mount_point)
+        if real_path.startswith(os.path.join(mount_point, "")) and len(mount_point) > len(
+            best_point
+        ):
+            best_point, best_type = mount_point, fs_type
+    return best_type
+
+
+class MappedFile:
+    """
+    Read-only file object backed by memory maps of the head and tail of a file.
+
+    Files up to twice ``window_size`` are mapped whole; of larger files only
+    the first and the last ``window_size`` bytes are mapped (at offsets
+    aligned to mmap.ALLOCATIONGRANULARITY), so the address space used per
+    file is bounded. Reads inside a window are served from a memoryview of
+    the mapping without system calls, and pages are faulted in on demand,
+    so parsers that only look at the head and tail of a file (ID3v2, ID3v1,
+    APE) touch only those pages. read() still returns a copy of the slice,
+    as parsers need bytes. Reads outside the windows, or across a window
+    boundary, go to the file.
+    """
+
+    def __init__(self, file: IO[bytes], window_size: int = WINDOW_SIZE):
+        """
+        Map an open file.
+
+        Args:
+            file: File opened in binary mode (closed together with the maps)
+            window_size: Bytes mapped at each end of large files
+        """
+        self.name = file.name
+        self._file = file
+        self._size = os.fstat(file.fileno()).st_size
+        self._maps: List[mmap.mmap] = []
+        # (file offset, view of the mapping) of each window
+        self._windows: List[Tuple[int, memoryview]] = []
+        try:
+            if self._size <= 2 * window_size:
+                self._map(0, self._size)
+            else:
+                self._map(0, window_size)
+                granularity = mmap.ALLOCATIONGRANULARITY
+                tail = (self._size - window_size) // granularity * granularity
+                self._map(tail, self._size - tail)
+        except BaseException:
+            self._unmap()
+            raise
+        self._position = 0
+
+    def _map(self, offset: int, length: int) -> None:
+        """Map a window of the file."""
+        mapping = mmap.mmap(self._file.fileno(), length, access=mmap.ACCESS_READ, offset=offset)
+        self._maps.append(mapping)
+        self._windows.append((offset, memoryview(mapping)))
+
+    def _unmap(self) -> None:
+        """Release the views and close the maps."""
+        for _, view in self._windows:
+            view.release()
+        for mapping in self._maps:
+            mapping.close()
+        self._windows = []
+        self._maps = []
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Read up to size bytes (all remaining bytes if negative)."""
+        start = self._position
+        end = self._size if size is None or size < 0 else min(start + size, self._size)
+        if start >= end:
+            return b""
+
+        for offset, view in self._windows:
+            if offset <= start and end <= offset + len(view):
+                data = bytes(view[start - offset : end - offset])
+                break
+        else:
+            self._file.seek(start)
+            data = self._file.read(end - start)
+        self._position = start + len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Move the position (also past the end, like a file) and return it."""
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._size
+        elif whence != os.SEEK_SET:
+            raise ValueError(f"Invalid whence: {whence}")
+        if offset < 0:
+            raise ValueError(f"Negative seek position: {offset}")
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        """Get the current position."""
+        return self._position
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        self._unmap()
+        self._file.close()
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class MmapBackend:
+    """
+    Open files for tag parsing through memory maps where that is cheap.
+
+    Files on network filesystems and empty files are opened normally, as
+    are files that cannot be mapped (e.g. when the address space is
+    limited). The filesystem check is done once per device.
+    A file truncated by another process while it is mapped makes the
+    process crash (SIGBUS), so the backend is meant for libraries that are
+    not being written to during the scan.
+    """
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        """
+        Initialize the backend.
+
+        Args:
+            window_size: Bytes mapped at each end of large files
+        """
+        self.window_size = window_size
+        # Whether files of a device are mapped, by st_dev
+        self._devices: Dict[int, bool] = {}
+        self._lock = threading.Lock()
+
+    def _maps_device(self, device: int, file_path: Path) -> bool:
+        """Check (once per device) whether files of a device are mapped."""
+        with self._lock:
+            mapped = self._devices.get(device)
+        if mapped is None:
+            fs_type = filesystem_type(file_path)
+            mapped = fs_type not in NETWORK_FILESYSTEMS
+            if not mapped:
+                logger.info(f"Reading files on {fs_type} without mmap: {file_path.parent}")
+            with self._lock:
+                self._devices[device] = mapped
+        return mapped
+
+    def open(self, file_path: Path) -> Union[MappedFile, IO[bytes]]:
+        """
+        Open a file for reading.
+
+        Args:
+            file_path: File to open
+
+        Returns:
+            MappedFile, or a regular binary file where mapping does not pay off
+        """
+        file = open(file_path, "rb")  # noqa: SIM115 - returned to the caller
+        try:
+            stat = os.fstat(file.fileno())
+            if stat.st_size > 0 and self._maps_device(stat.st_dev, file_path):
+                return MappedFile(file, self.window_size)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Cannot map {file_path}, reading normally: {e}")
+            file.seek(0)
+        return file
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""Hash-partitioned duplicate grouping across worker processes."""
+
+import logging
+import multiprocessing
+import queue
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .duplicate_detector import (
+    DuplicateDetector,
+    DuplicateIndex,
+    _parse_duration,
+    split_by_duration,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entries sent to a worker per queue message
+BATCH_SIZE = 10000
+
+
+class _Batch:
+    """Keyed entries of one partition, stored column-wise for cheap pickling."""
+
+    __slots__ = ("keys", "positions", "durations")
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self.positions = array("Q")
+        self.durations: List[Optional[int]] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def payload(self) -> Tuple[List[str], array, List[Optional[int]]]:
+        return self.keys, self.positions, self.durations
+
+
+def _columns(
+    tracks: List[Dict[str, str]], tolerance: Optional[int]
+) -> Tuple[List[str], List[str], List[str]]:
+    """Get the titles, artists and (with a duration tolerance) durations of tracks."""
+    return (
+        [metadata.get("title", "") for metadata in tracks],
+        [metadata.get("artist", "") for metadata in tracks],
+        [metadata.get("duration", "") for metadata in tracks] if tolerance is not None else [],
+    )
+
+
+# Messages of the worker queues
+_RAW = "raw"  # Tracks to normalize, from the parent
+_KEYED = "keyed"  # Normalized entries of the receiving partition, from a worker
+_DONE = "done"  # The parent added all tracks
+_FLUSHED = "flushed"  # A worker sent all its keyed entries
+
+
+def _partition_worker(
+    index: int,
+    inboxes: List[Any],
+    outbox: Any,
+    detector: DuplicateDetector,
+    shared: Optional[Tuple[List[Dict[str, str]], int, int]] = None,
+) -> None:
+    """
+    Normalize tracks and group the entries of one partition.
+
+    Every worker normalizes the raw batches the parent sends it round-robin
+    and routes each key to the worker owning its partition (possibly
+    itself). Once the parent is done, the worker flushes its entries and
+    tells all workers; the partition is complete when every worker did.
+
+    Args:
+        index: Partition of this worker
+        inboxes: Queues of all workers
+        outbox: Queue receiving the partition's duplicate groups
+        detector: Detector whose keys and duration tolerance are used
+        shared: Metadata list inherited from the parent (fork only) with the
+                start and end positions this worker normalizes first
+    """
+    workers = len(inboxes)
+    tolerance = detector.duration_tolerance
+    outgoing = [_Batch() for _ in range(workers)]
+    song_index: Dict[str, List[int]] = {}
+    durations: Dict[int, Optional[int]] = {}
+    flushed = 0
+
+    def send(partition: int) -> None:
+        inboxes[partition].put((_KEYED, outgoing[partition].payload()))
+        outgoing[partition] = _Batch()
+
+    def normalize(start: int, titles: List[str], artists: List[str], raw: List[str]) -> None:
+        for offset, (title, artist) in enumerate(zip(titles, artists)):
+            if not title or not artist:
+                continue
+            key = detector._normalize_key(title, artist)
+            partition = zlib.crc32(key.encode("utf-8")) % workers
+            batch = outgoing[partition]
+            batch.keys.append(key)
+            batch.positions.append(start + offset)
+            if tolerance is not None:
+                batch.durations.append(_parse_duration(raw[offset]))
+            if len(batch) >= BATCH_SIZE:
+                send(partition)
+
+    if shared is not None:
+        metadata_list, start, end = shared
+        for batch_start in range(start, end, BATCH_SIZE):
+            normalize(
+                batch_start,
+                *_columns(
+                    metadata_list[batch_start : min(batch_start + BATCH_SIZE, end)], tolerance
+                ),
+            )
+
+    while flushed < workers:
+        kind, payload = inboxes[index].get()
+        if kind == _RAW:
+            normalize(*payload)
+        elif kind == _KEYED:
+            keys, positions, batch_durations = payload
+            for key, position in zip(keys, positions):
+                song_index.setdefault(key, []).append(position)
+            if tolerance is not None:
+                durations.update(zip(positions, batch_durations))
+        elif kind == _DONE:
+            for partition in range(workers):
+                if outgoing[partition]:
+                    send(partition)
+                inboxes[partition].put((_FLUSHED, None))
+        else:
+            flushed += 1
+
+    # Batches of different workers arrive interleaved: restore the list order
+    groups = {key: sorted(positions) for key, positions in song_index.items() if len(positions) > 1}
+    if tolerance is not None:
+        groups = split_by_duration(groups, durations.get, tolerance)
+        groups = {key: positions for key, positions in groups.items() if len(positions) > 1}
+
+    outbox.put(groups)
+
+
+class PartitionedDuplicateDetector:
+    """
+    Build duplicate groups in several processes.
+
+    The parent only collects the title, artist and duration of each track
+    and sends them in batches to the workers in turn. Each worker normalizes
+    its batches and hashes every key to one of ``workers`` partitions, then
+    sends the entry to the process owning that partition, so all tracks of
+    a group end up in the same process and partitions can be grouped
+    independently. Tracks can be added while the scan is still running;
+    workers process their batches as they arrive. The groups are identical
+    to DuplicateDetector.build_index().
+
+    Fuzzy and ISRC matching compare keys across groups and therefore fall back
+    to the single-process detector.
+    """
+
+    def __init__(self, detector: Optional[DuplicateDetector] = None, workers: int = 2):
+        """
+        Initialize the detector.
+
+        Args:
+            detector: Detector whose keys and duration tolerance are used
+            workers: Number of worker processes (one partition each)
+
+        Raises:
+            ValueError: If workers is less than 1
+        """
+        if workers < 1:
+            raise ValueError(f"Invalid number of workers: {workers}")
+
+        self.detector = detector or DuplicateDetector()
+        self.workers = workers
+        self.partitioned = not (self.detector.fuzzy or self.detector.use_isrc)
+        self._count = 0
+        # Tracks not yet sent to a worker, starting at position _sent
+        self._pending: List[Dict[str, str]] = []
+        self._sent = 0
+        # Worker receiving the next raw batch
+        self._next_worker = 0
+        self._processes: List[Any] = []
+        self._inboxes: List[Any] = []
+        self._outbox: Any = None
+
+    def _start(self, shared: Optional[List[Dict[str, str]]] = None) -> None:
+        """
+        Start the worker processes.
+
+        Args:
+            shared: Complete metadata list the forked workers read directly,
+                    each normalizing an equal slice, or None
+        """
+        context = multiprocessing.get_context()
+        self._outbox = context.Queue()
+        self._inboxes = [context.Queue() for _ in range(self.workers)]
+        for index in range(self.workers):
+            if shared is not None:
+                start = len(shared) * index // self.workers
+                end = len(shared) * (index + 1) // self.workers
+                worker_shared: Optional[Tuple[List[Dict[str, str]], int, int]] = (
+                    shared,
+                    start,
+                    end,
+                )
+            else:
+                worker_shared = None
+            process = context.Process(
+                target=_partition_worker,
+                args=(index, self._inboxes, self._outbox, self.detector, worker_shared),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        logger.debug(f"Started {self.workers} duplicate detection workers")
+
+    def add(self, metadata: Dict[str, str]) -> None:
+        """
+        Queue a track for normalization in a worker.
+
+        Tracks must be added in the order of the metadata list that is later
+        passed to build_index().
+
+        Args:
+            metadata: Metadata dictionary
+        """
+        self._count += 1
+        if not self.partitioned:
+            return
+
+        self._pending.append(metadata)
+        if len(self._pending) >= BATCH_SIZE:
+            self._send()
+
+    def _send(self) -> None:
+        """Send the title, artist and duration of the pending tracks to the next worker."""
+        if not self._processes:
+            self._start()
+        payload = (self._sent, *_columns(self._pending, self.detector.duration_tolerance))
+        self._inboxes[self._next_worker].put((_RAW, payload))
+        self._next_worker = (self._next_worker + 1) % self.workers
+        self._sent += len(self._pending)
+        self._pending = []
+
+    def _collect(self) -> Dict[str, List[int]]:
+        """Flush the pending tracks and merge the groups of all partitions."""
+        if self._pending or not self._processes:
+            self._send()
+        for inbox in self._inboxes:
+            inbox.put((_DONE, None))
+
+        groups: Dict[str, List[int]] = {}
+        remaining = self.workers
+        while remaining:
+            try:
+                # Partitions have disjoint keys, so merging is a plain update
+                groups.update(self._outbox.get(timeout=1))
+                remaining -= 1
+            except queue.Empty:
+                failed = [p for p in self._processes if not p.is_alive() and p.exitcode]
+                if failed:
+                    raise RuntimeError(
+                        f"Duplicate detection worker failed (exit code {failed[0].exitcode})"
+                    ) from None
+
+        for process in self._processes:
+            process.join()
+        return groups
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self._processes = []
+        self._inboxes = []
+
+    def build_index(self, metadata_list: List[Dict[str, str]]) -> DuplicateIndex:
+        """
+        Build the duplicate index.
+
+        Tracks not yet added are added first, so the index can be built from
+        a complete list as well as after streaming with add(). If no track was
+        added and processes are forked, the workers read the complete list
+        from the memory they share with the parent instead.
+
+        Args:
+            metadata_list: List of metadata dictionaries (in the order added)
+
+        Returns:
+            DuplicateIndex with all duplicate groups
+        """
+        if not self.partitioned:
+            logger.info("Fuzzy/ISRC matching is not partitionable, using a single process")
+            return self.detector.build_index(metadata_list)
+
+        if (
+            not self._count
+            and metadata_list
+            and multiprocessing.get_context().get_start_method() == "fork"
+        ):
+            self._start(metadata_list)
+            self._count = self._sent = len(metadata_list)
+        for metadata in metadata_list[self._count :]:
+            self.add(metadata)
+        if self._count != len(metadata_list):
+            raise ValueError(
+                f"Added {self._count} tracks but the metadata list has {len(metadata_list)}"
+            )
+
+        try:
+            groups = self._collect()
+        finally:
+            self.close()
+
+        index = DuplicateIndex(metadata_list, groups)
+        logger.info(
+            f"Found {len(index)} duplicate song groups ({index.total_files} total files) "
+            f"in {self.workers} partitions"
+        )
+        return index
+
+    def __enter__(self) -> "PartitionedDuplicateDetector":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Concurrent scanning of several input directories."""
+
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from .extractor import MusicFileExtractor
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_roots(roots: Sequence[str], recursive: bool = True) -> List[str]:
+    """
+    Drop input directories that are already covered by others.
+
+    Roots are compared by their real paths. Repeated roots are dropped, and
+    so are roots inside another root when scanning recursively, since their
+    files are found by the enclosing root anyway. Kept roots are returned as
+    given (e.g. relative or through a symlink), so exported paths keep that
+    form.
+
+    Args:
+        roots: Input directories
+        recursive: Whether the roots are scanned recursively
+
+    Returns:
+        Kept roots as given, in the order given (the first form of a
+        repeated root)
+    """
+    canonical = [os.path.realpath(root) for root in roots]
+    # Real path -> first root given for it
+    unique: Dict[str, str] = {}
+    for real_path, root in zip(canonical, roots):
+        unique.setdefault(real_path, root)
+
+    kept = []
+    for real_path, root in unique.items():
+        parent = next(
+            (
+                other
+                for other in unique
+                if recursive
+                and other != real_path
+                and real_path.startswith(os.path.join(other, ""))
+            ),
+            None,
+        )
+        if parent is not None:
+            logger.info(f"Skipping {root}: inside {unique[parent]}")
+        else:
+            kept.append(root)
+
+    if len(unique) < len(canonical):
+        logger.info(f"Skipping {len(canonical) - len(unique)} repeated directories")
+    return kept
+
+
+def group_by_device(roots: Sequence[str]) -> Dict[int, List[int]]:
+    """
+    Group input directories by the device they are stored on.
+
+    Args:
+        roots: Input directories
+
+    Returns:
+        Mapping of device id (st_dev) to the indices of its directories, in
+        the order given
+    """
+    groups: Dict[int, List[int]] = {}
+    for index, root in enumerate(roots):
+        groups.setdefault(os.stat(root).st_dev, []).append(index)
+    return groups
+
+
+def scan_roots(
+    extractor: MusicFileExtractor, roots: Sequence[str], recursive: bool = True
+) -> Iterator[Tuple[str, List[Dict[str, str]]]]:
+    """
+    Extract the metadata of several directories, one worker per device.
+
+    Directories on different devices (disks, network mounts) are scanned
+    concurrently, while directories on the same device are scanned one after
+    another so that no two threads compete for the same disk. Results are
+    yielded in the order the directories were given, each as soon as it and
+    all directories before it are done.
+
+    Args:
+        extractor: Metadata extractor
+        roots: Input directories
+        recursive: Whether to search subdirectories recursively
+
+    Yields:
+        Tuples of (directory, metadata list)
+
+    Raises:
+        Exception: Any error raised while scanning a directory, when its
+                   result is reached
+    """
+    groups = group_by_device(roots)
+    futures: List[Future[List[Dict[str, str]]]] = [Future() for _ in roots]
+
+    def scan_device(indices: List[int]) -> None:
+        for index in indices:
+            future = futures[index]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(extractor.extract_all(roots[index], recursive))
+            except BaseException as e:
+                future.set_exception(e)
+
+    if len(groups) > 1:
+        logger.info(f"Scanning {len(roots)} directories on {len(groups)} devices in parallel")
+
+    with ThreadPoolExecutor(max_workers=len(groups) or 1, thread_name_prefix="scan") as executor:
+        for indices in groups.values():
+            executor.submit(scan_device, indices)
+        try:
+            for root, future in zip(roots, futures):
+                yield root, future.result()
+        finally:
+            # Stop scanning directories whose results are no longer wanted
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Ordering of file reads by their location on disk."""
+
+import errno
+import logging
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEDULES = ("path", "inode", "physical")
+
+# Linux FS_IOC_FIEMAP: struct fiemap header followed by one struct fiemap_extent
+_FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_HEADER = struct.Struct("=QQIIII")
+_FIEMAP_EXTENT = struct.Struct("=QQQQQIIII")
+
+# ioctl errors meaning that a filesystem does not support FIEMAP
+_FIEMAP_UNSUPPORTED = frozenset({errno.EOPNOTSUPP, errno.ENOTTY})
+
+# Files ordered together by iter_schedule()
+SCHEDULE_BATCH_SIZE = 10000
+
+# Bytes read per file by benchmark_schedules() (where the tags are)
+BENCHMARK_READ_SIZE = 64 * 1024
+
+
+def physical_offset(file_path: Path) -> Optional[int]:
+    """
+    Get the disk offset of the first extent of a file with FIEMAP (Linux).
+
+    Args:
+        file_path: File to locate
+
+    Returns:
+        Physical byte offset, or None if the filesystem does not report it
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return _fiemap(file_path)
+    except OSError:
+        return None
+
+
+def _fiemap(file_path: Path) -> Optional[int]:
+    """
+    Get the disk offset of the first extent of a file (Linux only).
+
+    Args:
+        file_path: File to locate
+
+    Returns:
+        Physical byte offset, or None if the file has no located extent
+        (empty, inline or delayed-allocation data)
+
+    Raises:
+        OSError: If the file cannot be opened or the ioctl fails
+    """
+    import fcntl
+
+    request = bytearray(
+        _FIEMAP_HEADER.pack(0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0) + bytes(_FIEMAP_EXTENT.size)
+    )
+    with open(file_path, "rb") as f:
+        fcntl.ioctl(f.fileno(), _FS_IOC_FIEMAP, request, True)
+
+    mapped_extents = _FIEMAP_HEADER.unpack_from(request)[3]
+    if not mapped_extents:
+        return None
+    # fe_physical of the first extent (0 for extents without a location)
+    physical = _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)[1]
+    return physical or None
+
+
+def schedule_order(file_paths: Sequence[Path], schedule: str = "path") -> List[int]:
+    """
+    Get the order in which files are read.
+
+    'inode' sorts by device and inode number, which most filesystems
+    allocate close to where the file is stored. 'physical' sorts by the
+    disk offset of each file's first extent (FIEMAP) and falls back to the
+    inode order for files without a located extent and on filesystems
+    that do not support it. Ties keep the original order, so hardlinks are
+    read in path order.
+
+    Args:
+        file_paths: Files in canonical (path) order
+        schedule: 'path', 'inode' or 'physical'
+
+    Returns:
+        Indices into file_paths in reading order
+
+    Raises:
+        ValueError: If the schedule is unknown
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown schedule: {schedule}")
+    if schedule == "path":
+        return list(range(len(file_paths)))
+
+    use_fiemap = schedule == "physical" and sys.platform.startswith("linux")
+    no_fiemap: Set[int] = set()
+    keys: List[Tuple[int, int, int, int]] = []
+    for index, file_path in enumerate(file_paths):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Unreadable files fail quickly at the end
+            keys.append((sys.maxsize, 0, 0, index))
+            continue
+
+        offset = None
+        if use_fiemap and stat.st_dev not in no_fiemap:
+            try:
+                offset = _fiemap(file_path)
+            except OSError as e:
+                if e.errno in _FIEMAP_UNSUPPORTED:
+                    # Do not retry the ioctl for every file of an unsupported filesystem
+                    no_fiemap.add(stat.st_dev)
+                    logger.info(f"FIEMAP not available for {file_path.parent}, using inode order")
+        if offset is not None:
+            keys.append((stat.st_dev, 0, offset, index))
+        else:
+            keys.append((stat.st_dev, 1, stat.st_ino, index))
+
+    return [key[3] for key in sorted(keys)]
+
+
+def iter_schedule(
+    file_paths: Sequence[Path],
+    schedule: str = "path",
+    batch_size: int = SCHEDULE_BATCH_SIZE,
+) -> Iterator[int]:
+    """
+    Get the reading order batch by batch.
+
+    Each batch of ``batch_size`` consecutive files is ordered with
+    schedule_order() and read before the next one, so a reader restoring
+    the original order holds the results of at most one batch.
+
+    Args:
+        file_paths: Files in canonical (path) order
+        schedule: 'path', 'inode' or 'physical'
+        batch_size: Files ordered together
+
+    Yields:
+        Indices into file_paths in reading order
+
+    Raises:
+        ValueError: If the schedule is unknown or batch_size is less than 1
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}")
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown schedule: {schedule}")
+
+    for start in range(0, len(file_paths), batch_size):
+        batch = file_paths[start : start + batch_size]
+        for index in schedule_order(batch, schedule):
+            yield start + index
+
+
+def _drop_cache(file_path: Path) -> None:
+    """Evict a file from the page cache where the platform supports it."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def benchmark_schedules(
+    file_paths: Sequence[Path],
+    schedules: Sequence[str] = SCHEDULES,
+    read_size: int = BENCHMARK_READ_SIZE,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure how fast the tag regions of files are read in each order.
+
+    Before each run the files are evicted from the page cache (with
+    posix_fadvise where available), so the timing is dominated by seeks.
+    Without eviction, later runs may be served from the cache.
+
+    Args:
+        file_paths: Files in canonical order
+        schedules: Schedules to compare
+        read_size: Bytes read from the start of each file
+
+    Returns:
+        Mapping of schedule to {"seconds", "files_per_sec", "mb_per_sec"}
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for schedule in schedules:
+        for file_path in file_paths:
+            _drop_cache(file_path)
+
+        start = time.perf_counter()
+        order = schedule_order(file_paths, schedule)
+        bytes_read = 0
+        for index in order:
+            try:
+                with open(file_paths[index], "rb") as f:
+                    bytes_read += len(f.read(read_size))
+            except OSError as e:
+                logger.debug(f"Cannot read {file_paths[index]}: {e}")
+        seconds = max(time.perf_counter() - start, 1e-9)
+
+        results[schedule] = {
+            "seconds": seconds,
+            "files_per_sec": len(order) / seconds,
+            "mb_per_sec": bytes_read / seconds / (1024 * 1024),
+        }
+        logger.info(
+            f"Schedule {schedule}: {len(order)} files in {seconds:.2f}s "
+            f"({results[schedule]['files_per_sec']:.1f} files/s)"
+        )
+    return results
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Diff the scanned library against an existing Soundiiz CSV."""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .duplicate_detector import DuplicateDetector
+from .export_history import iter_exported_tracks
+from .extractor import normalize_isrc
+
+logger = logging.getLogger(__name__)
+
+
+class SoundiizIndex:
+    """
+    Hash index of remote (Soundiiz) tracks.
+
+    Rows are keyed by ISRC when present and by normalized title|artist
+    otherwise. Rows with an ISRC are also indexed by title|artist so local
+    files without an ISRC can still be matched.
+    """
+
+    def __init__(self, detector: Optional[DuplicateDetector] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            detector: Detector whose key normalization is used
+        """
+        self.detector = detector or DuplicateDetector()
+        self._rows: List[Tuple[str, str, str, str]] = []
+        self._has_isrc = bytearray()
+        self._matched = bytearray()
+        self._by_isrc: Dict[str, List[int]] = {}
+        self._by_key: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_csv(cls, path: str, detector: Optional[DuplicateDetector] = None) -> "SoundiizIndex":
+        """
+        Build an index by streaming a Soundiiz CSV (``title,artist,album,isrc,``).
+
+        Args:
+            path: CSV file, base path of split CSV files, or directory
+            detector: Detector whose key normalization is used
+
+        Returns:
+            Populated index
+        """
+        index = cls(detector)
+        for track in iter_exported_tracks(path):
+            index.add(track)
+        logger.info(f"Indexed {len(index)} remote tracks from {path}")
+        return index
+
+    def add(self, track: Dict[str, str]) -> None:
+        """
+        Add a remote track to the index.
+
+        Args:
+            track: Dictionary with title, artist, album and isrc
+        """
+        row_id = len(self._rows)
+        isrc = normalize_isrc(track.get("isrc"))
+        self._rows.append(
+            (
+                track.get("title", ""),
+                track.get("artist", ""),
+                track.get("album", ""),
+                track.get("isrc", ""),
+            )
+        )
+        self._has_isrc.append(1 if isrc else 0)
+        self._matched.append(0)
+
+        if isrc:
+            self._by_isrc.setdefault(isrc, []).append(row_id)
+        key = self.detector.track_key(track)
+        if key is not None:
+            self._by_key.setdefault(key, []).append(row_id)
+
+    def __len__(self) -> int:
+        """Return the number of indexed rows."""
+        return len(self._rows)
+
+    def match(self, metadata: Dict[str, str]) -> bool:
+        """
+        Match a local track against the index and mark the matched rows.
+
+        A local ISRC is looked up first. If it is missing from the index, the
+        title|artist key is used, but only against rows without an ISRC, since
+        a different ISRC identifies a different recording.
+
+        Args:
+            metadata: Local metadata dictionary
+
+        Returns:
+            True if at least one remote row matched
+        """
+        isrc = normalize_isrc(metadata.get("isrc"))
+        if isrc:
+            rows = self._by_isrc.get(isrc)
+            if rows:
+                for row_id in rows:
+                    self._matched[row_id] = 1
+                return True
+
+        key = self.detector.track_key(metadata)
+        rows = self._by_key.get(key) if key is not None else None
+        if not rows:
+            return False
+        if isrc:
+            rows = [row_id for row_id in rows if not self._has_isrc[row_id]]
+        for row_id in rows:
+            self._matched[row_id] = 1
+        return bool(rows)
+
+    def unmatched(self) -> List[Dict[str, str]]:
+        """
+        Get remote rows that were not matched by any local track.
+
+        Returns:
+            List of dictionaries with title, artist, album and isrc
+        """
+        return [
+            {"title": title, "artist": artist, "album": album, "isrc": isrc}
+            for (title, artist, album, isrc), matched in zip(self._rows, self._matched)
+            if not matched
+        ]
+
+
+def diff_library(
+    metadata_list: List[Dict[str, str]],
+    remote_csv: str,
+    detector: Optional[DuplicateDetector] = None,
+) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Hash-join the local library against a Soundiiz CSV.
+
+    Args:
+        metadata_list: Local metadata dictionaries
+        remote_csv: Soundiiz CSV file, base path of split CSV files, or directory
+        detector: Detector whose key normalization is used
+
+    Returns:
+        Tuple of (local_missing, remote_only): local tracks not in the CSV and
+        CSV entries without a local file
+    """
+    index = SoundiizIndex.from_csv(remote_csv, detector)
+    local_missing = [metadata for metadata in metadata_list if not index.match(metadata)]
+    remote_only = index.unmatched()
+
+    logger.info(
+        f"Diff: {len(local_missing)} local tracks missing remotely, "
+        f"{len(remote_only)} remote tracks without local file"
+    )
+    return local_missing, remote_only
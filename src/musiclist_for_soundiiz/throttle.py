@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Rate limits for scans of shared storage."""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bytes per MB of --max-read-mbps (same unit as the benchmark output)
+MB = 1024 * 1024
+
+# Seconds between progress messages of a throttled scan
+REPORT_INTERVAL = 10.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that paces callers instead of letting them burst.
+
+    acquire() takes its tokens immediately, even if that leaves the bucket in
+    debt, and sleeps until the debt would have been refilled. Concurrent
+    callers therefore queue up behind each other and the combined rate stays
+    at ``rate`` with bursts of at most ``burst`` tokens.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Capacity of the bucket (a tenth of a second of tokens, at
+                   least one, if None)
+            clock: Time source in seconds
+            sleep: Function sleeping for a number of seconds
+
+        Raises:
+            ValueError: If the rate is not positive
+        """
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate / 10, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens, waiting until the rate allows it.
+
+        Args:
+            amount: Number of tokens
+
+        Returns:
+            Seconds waited
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class Throttle:
+    """
+    Limits on files and bytes per second shared by all extraction workers.
+
+    Also counts what was read and logs the effective rate every
+    ``report_interval`` seconds while files are being opened.
+    """
+
+    def __init__(
+        self,
+        max_read_mbps: Optional[float] = None,
+        max_files_per_sec: Optional[float] = None,
+        report_interval: float = REPORT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize the throttle.
+
+        Args:
+            max_read_mbps: Maximum read throughput in MB/s, or None
+            max_files_per_sec: Maximum number of files opened per second, or None
+            report_interval: Seconds between progress messages
+            clock: Time source in seconds
+            sleep: Function sleeping for a number of seconds
+
+        Raises:
+            ValueError: If a limit is not positive
+        """
+        for name, limit in (("read rate", max_read_mbps), ("file rate", max_files_per_sec)):
+            if limit is not None and limit <= 0:
+                raise ValueError(f"Invalid {name}: {limit}")
+
+        self.bytes = (
+            TokenBucket(max_read_mbps * MB, clock=clock, sleep=sleep)
+            if max_read_mbps is not None
+            else None
+        )
+        self.files = (
+            TokenBucket(max_files_per_sec, clock=clock, sleep=sleep)
+            if max_files_per_sec is not None
+            else None
+        )
+        self._clock = clock
+        self._start = self._last_report = clock()
+        self.report_interval = report_interval
+        self._lock = threading.Lock()
+        self.files_read = 0
+        self.bytes_read = 0
+
+    def open_file(self) -> None:
+        """Wait for the files-per-second limit before opening a file."""
+        if self.files is not None:
+            self.files.acquire()
+        now = self._clock()
+        with self._lock:
+            self.files_read += 1
+            report = now - self._last_report >= self.report_interval
+            if report:
+                self._last_report = now
+        if report:
+            logger.info(f"Throttled scan: {self.files_read} files read ({self.summary()})")
+
+    def read(self, size: int) -> None:
+        """Wait for the read limit before reading size bytes."""
+        if self.bytes is not None and size > 0:
+            self.bytes.acquire(size)
+
+    def count(self, size: int) -> None:
+        """Record bytes actually read."""
+        with self._lock:
+            self.bytes_read += size
+
+    def summary(self) -> str:
+        """Describe the effective rate since the throttle was created."""
+        elapsed = max(self._clock() - self._start, 1e-9)
+        return f"{self.files_read / elapsed:.1f} files/s, {self.bytes_read / elapsed / MB:.2f} MB/s"
+
+
+class ThrottledFile:
+    """Binary file object whose reads are paced by a Throttle."""
+
+    def __init__(self, file: Any, throttle: Throttle):
+        """
+        Wrap a file.
+
+        Args:
+            file: File object with read, seek, tell and close
+            throttle: Throttle shared by all files of the scan
+        """
+        self.name = file.name
+        self._file = file
+        self._throttle = throttle
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Read up to size bytes after waiting for the read limit."""
+        if size is not None and size >= 0:
+            self._throttle.read(size)
+            data: bytes = self._file.read(size)
+        else:
+            data = self._file.read()
+            self._throttle.read(len(data))
+        self._throttle.count(len(data))
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        """Read into a writable buffer after waiting for the read limit."""
+        self._throttle.read(len(buffer))
+        read = int(self._file.readinto(buffer) or 0)
+        self._throttle.count(read)
+        return read
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """Move the position and return it."""
+        return int(self._file.seek(offset, whence))
+
+    def tell(self) -> int:
+        """Get the current position."""
+        return int(self._file.tell())
+
+    def close(self) -> None:
+        """Close the wrapped file."""
+        self._file.close()
+
+    def __enter__(self) -> "ThrottledFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Tests for album-level duplicate detection."""
+
+import pytest
+
+from musiclist_for_soundiiz.album_duplicates import (
+    AlbumDuplicateFinder,
+    _choose_bands,
+    format_album_report,
+)
+
+
+def _album(directory, artist, titles, album="Album"):
+    return [
+        {
+            "file_path": f"{directory}/{i:02d}.mp3",
+            "title": title,
+            "artist": artist,
+            "album": album,
+        }
+        for i, title in enumerate(titles, 1)
+    ]
+
+
+TITLES = [f"Track {i}" for i in range(1, 11)]
+
+
+def test_choose_bands():
+    """Test that the LSH threshold does not exceed the requested one."""
+    bands, rows = _choose_bands(128, 0.8)
+    assert bands * rows == 128
+    assert (1 / bands) ** (1 / rows) <= 0.8
+    assert _choose_bands(128, 0.01) == (128, 1)
+
+
+def test_finds_copied_album():
+    """Test that a copy in another directory is found with its score."""
+    metadata = (
+        _album("/Rock/Album", "Band", TITLES)
+        + _album("/Incoming/Album (FLAC)", "BAND", [t.upper() for t in TITLES[:9]])
+        + _album("/Jazz/Other", "Other Band", TITLES)
+    )
+
+    matches = AlbumDuplicateFinder().find(metadata)
+
+    assert len(matches) == 1
+    match = matches[0]
+    assert match["albums"] == ("/Incoming/Album (FLAC)", "/Rock/Album")
+    assert match["similarity"] == pytest.approx(0.9)
+    assert match["shared"] == 9
+    assert match["tracks"] == (9, 10)
+
+
+def test_dissimilar_albums_not_reported():
+    """Test that albums below the threshold are not reported."""
+    metadata = _album("/a", "Band", TITLES) + _album("/b", "Band", TITLES[:5] + ["x", "y", "z"])
+    assert AlbumDuplicateFinder(threshold=0.8).find(metadata) == []
+    assert len(AlbumDuplicateFinder(threshold=0.3).find(metadata)) == 1
+
+
+def test_small_albums_ignored():
+    """Test that directories with few tracks are skipped."""
+    metadata = _album("/a", "Band", TITLES[:2]) + _album("/b", "Band", TITLES[:2])
+    assert AlbumDuplicateFinder().find(metadata) == []
+    assert len(AlbumDuplicateFinder(min_tracks=2).find(metadata)) == 1
+
+
+def test_group_by_album_tag():
+    """Test grouping by album tag instead of directory."""
+    metadata = _album("/mixed", "Band", TITLES, album="First") + _album(
+        "/mixed", "Band", TITLES, album="Copy"
+    )
+    finder = AlbumDuplicateFinder(group_by="album")
+    assert [m["albums"] for m in finder.find(metadata)] == [("Copy - Band", "First - Band")]
+
+
+def test_many_albums_are_not_all_compared():
+    """Test that LSH only produces candidates for similar albums."""
+    metadata = []
+    for i in range(200):
+        metadata += _album(f"/lib/{i}", f"Artist {i}", TITLES)
+    metadata += _album("/copy/0", "Artist 0", TITLES)
+
+    matches = AlbumDuplicateFinder().find(metadata)
+
+    assert [m["albums"] for m in matches] == [("/copy/0", "/lib/0")]
+
+
+def test_invalid_arguments():
+    """Test argument validation."""
+    with pytest.raises(ValueError):
+        AlbumDuplicateFinder(threshold=0)
+    with pytest.raises(ValueError):
+        AlbumDuplicateFinder(group_by="genre")
+
+
+def test_format_album_report():
+    """Test the album report."""
+    assert format_album_report([]) == "No duplicate albums found."
+    report = format_album_report(
+        [{"albums": ("/a", "/b"), "similarity": 0.9, "shared": 9, "tracks": (9, 10)}]
+    )
+    assert "90% similar (9 shared tracks)" in report
+    assert "[2] /b (10 tracks)" in report
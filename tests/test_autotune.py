@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Tests for adaptive extraction concurrency."""
+
+import pytest
+
+from musiclist_for_soundiiz.autotune import ConcurrencyTuner
+
+
+class _FakeStorage:
+    """Storage whose throughput grows with jobs up to a knee."""
+
+    def __init__(self, knee, files_per_job=10.0):
+        self.knee = knee
+        self.files_per_job = files_per_job
+        self.now = 0.0
+
+    def run(self, tuner, files):
+        for _ in range(files):
+            rate = min(tuner.jobs, self.knee) * self.files_per_job
+            self.now += 1.0 / rate
+            tuner.record(tuner.jobs / rate)
+
+
+def test_tuner_finds_knee():
+    """Test that probing stops at the level after which throughput is flat."""
+    storage = _FakeStorage(knee=4)
+    tuner = ConcurrencyTuner(clock=lambda: storage.now)
+
+    storage.run(tuner, 2000)
+
+    assert tuner.jobs == 4
+    assert not tuner.probing
+    assert [jobs for jobs, _rate, _latency in tuner.history[:4]] == [1, 2, 4, 8]
+
+
+def test_tuner_respects_max_jobs():
+    """Test that the tuner settles at the maximum when throughput keeps growing."""
+    storage = _FakeStorage(knee=100)
+    tuner = ConcurrencyTuner(max_jobs=8, clock=lambda: storage.now)
+
+    storage.run(tuner, 2000)
+
+    assert tuner.jobs == 8
+    assert not tuner.probing
+
+
+def test_tuner_probes_again_when_throughput_changes():
+    """Test that a throughput change restarts probing."""
+    storage = _FakeStorage(knee=8)
+    tuner = ConcurrencyTuner(clock=lambda: storage.now)
+    storage.run(tuner, 2000)
+    assert tuner.jobs == 8
+
+    storage.knee = 2
+    storage.run(tuner, 2000)
+
+    assert tuner.jobs == 2
+    assert not tuner.probing
+
+
+def test_tuner_invalid_bounds():
+    """Test that invalid job bounds are rejected."""
+    with pytest.raises(ValueError):
+        ConcurrencyTuner(min_jobs=0)
+    with pytest.raises(ValueError):
+        ConcurrencyTuner(min_jobs=4, max_jobs=2)
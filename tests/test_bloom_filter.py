@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Tests for the on-disk Bloom filter of exported songs."""
+
+import os
+import stat
+
+import pytest
+
+from musiclist_for_soundiiz.bloom_filter import BloomFilter, build_from_exports, exact_confirmer
+from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector
+from musiclist_for_soundiiz.exporter import CSVExporter
+
+
+def _track(title, artist="Artist"):
+    return {"file_path": f"/{title}.mp3", "title": title, "artist": artist, "album": "Album"}
+
+
+def test_no_false_negatives_and_bounded_false_positives():
+    """Test that added keys are always found and others rarely."""
+    bloom = BloomFilter.for_capacity(5000, 0.01)
+    for i in range(5000):
+        bloom.add(f"song {i}|artist")
+
+    assert all(f"song {i}|artist" in bloom for i in range(5000))
+    false_positives = sum(f"other {i}|artist" in bloom for i in range(10000))
+    assert false_positives < 10000 * 0.02
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.2)
+
+
+def test_save_and_open(tmp_path):
+    """Test that a saved filter is memory-mapped read-only."""
+    path = tmp_path / "seen.bloom"
+    bloom = BloomFilter.for_capacity(100)
+    bloom.add("song|artist")
+    bloom.save(str(path))
+
+    with BloomFilter.open(str(path)) as opened:
+        assert len(opened) == 1
+        assert opened.num_bits == bloom.num_bits
+        assert "song|artist" in opened
+        assert "other|artist" not in opened
+        with pytest.raises(TypeError):
+            opened.add("other|artist")
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_saved_filter_file_mode(tmp_path):
+    """Test that a new filter gets the umask default and a rebuilt one keeps its mode."""
+    path = tmp_path / "seen.bloom"
+    bloom = BloomFilter.for_capacity(100)
+    old_umask = os.umask(0o022)
+    try:
+        bloom.save(str(path))
+    finally:
+        os.umask(old_umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+    path.chmod(0o664)
+    bloom.add("song|artist")
+    bloom.save(str(path))
+    assert stat.S_IMODE(path.stat().st_mode) == 0o664
+
+
+def test_open_rejects_other_files(tmp_path):
+    """Test that files of another format are rejected."""
+    path = tmp_path / "not.bloom"
+    path.write_bytes(b"title,artist\n" * 10)
+    with pytest.raises(ValueError):
+        BloomFilter.open(str(path))
+
+
+def test_invalid_arguments():
+    """Test that invalid sizes and rates are rejected."""
+    with pytest.raises(ValueError):
+        BloomFilter(0, 1)
+    with pytest.raises(ValueError):
+        BloomFilter.for_capacity(10, 1.5)
+
+
+def test_build_from_exports_and_split_seen(tmp_path):
+    """Test that songs of previous exports are split off, with exact confirmation."""
+    export_path = str(tmp_path / "old.csv")
+    CSVExporter(max_songs_per_file=2).export(
+        [_track("One"), _track("Two"), _track("Three")], export_path
+    )
+    filter_path = str(tmp_path / "seen.bloom")
+    build_from_exports(export_path, filter_path)
+
+    detector = DuplicateDetector()
+    metadata_list = [_track("ONE"), _track("Four"), {"file_path": "/untagged.mp3"}]
+    with BloomFilter.open(filter_path) as seen:
+        assert len(seen) == 3
+        new, old = detector.split_seen(metadata_list, seen, exact_confirmer(export_path))
+
+    assert [t["file_path"] for t in old] == ["/ONE.mp3"]
+    assert [t["file_path"] for t in new] == ["/Four.mp3", "/untagged.mp3"]
+
+
+def test_split_seen_confirmation_removes_false_positives():
+    """Test that keys rejected by the confirmation stay new."""
+    detector = DuplicateDetector()
+    everything = {"one|artist", "two|artist"}
+    new, old = detector.split_seen(
+        [_track("One"), _track("Two")], everything, lambda keys: keys & {"two|artist"}
+    )
+
+    assert [t["title"] for t in new] == ["One"]
+    assert [t["title"] for t in old] == ["Two"]
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Tests for CLI functionality."""
 
+import json
 from pathlib import Path
 
 import pytest
@@ -269,3 +270,206 @@ def test_main_generic_exception(tmp_path, monkeypatch):
     exit_code = main(["-i", str(music_dir)])
 
     assert exit_code == 1
+
+
+def test_main_since_export(tmp_path):
+    """Test that a delta export skips songs from a previous export."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    first_output = tmp_path / "first.csv"
+    second_output = tmp_path / "second.csv"
+
+    assert main(["-i", str(fixtures_dir), "-o", str(first_output)]) == 0
+    exit_code = main(
+        ["-i", str(fixtures_dir), "-o", str(second_output), "--since-export", str(first_output)]
+    )
+
+    assert exit_code == 0
+    assert not second_output.exists()
+
+
+def test_parse_args_max_memory():
+    """Test memory sizes and options that need the whole library in memory."""
+    assert parse_args(["-i", "/path", "--max-memory", "512M"]).max_memory == 512 * 1024 * 1024
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--max-memory", "lots"])
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--max-memory", "1G", "--fuzzy-duplicates"])
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--max-memory", "1G", "--list-aliases"])
+
+
+def test_parse_args_jobs():
+    """Test that --jobs takes a positive number or 'auto'."""
+    assert parse_args(["-i", "/path"]).jobs == 1
+    assert parse_args(["-i", "/path", "--jobs", "8"]).jobs == 8
+    assert parse_args(["-i", "/path", "-j", "AUTO"]).jobs == "auto"
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--jobs", "0"])
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--jobs", "many"])
+
+
+def test_main_max_memory(tmp_path):
+    """Test that the out-of-core mode exports the same songs."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    in_memory = tmp_path / "in_memory.csv"
+    out_of_core = tmp_path / "out_of_core.csv"
+
+    assert main(["-i", str(fixtures_dir), "-o", str(in_memory), "--remove-duplicates"]) == 0
+    exit_code = main(
+        [
+            "-i",
+            str(fixtures_dir),
+            "-o",
+            str(out_of_core),
+            "--remove-duplicates",
+            "--max-memory",
+            "1K",
+        ]
+    )
+
+    assert exit_code == 0
+    assert out_of_core.read_bytes() == in_memory.read_bytes()
+
+
+def test_main_duplicate_workers(tmp_path):
+    """Test that partitioned duplicate removal exports the same songs."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    single = tmp_path / "single.csv"
+    partitioned = tmp_path / "partitioned.csv"
+
+    assert main(["-i", str(fixtures_dir), "-o", str(single), "--remove-duplicates"]) == 0
+    exit_code = main(
+        [
+            "-i",
+            str(fixtures_dir),
+            "-o",
+            str(partitioned),
+            "--remove-duplicates",
+            "--duplicate-workers",
+            "2",
+        ]
+    )
+
+    assert exit_code == 0
+    assert partitioned.read_bytes() == single.read_bytes()
+
+
+def test_main_duplicate_report_jsonl(tmp_path):
+    """Test that a .jsonl duplicate report has one JSON object per group."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    report_file = tmp_path / "duplicates.jsonl"
+
+    exit_code = main(
+        [
+            "-i",
+            str(fixtures_dir),
+            "-o",
+            str(tmp_path / "output.csv"),
+            "--duplicate-report",
+            str(report_file),
+        ]
+    )
+
+    assert exit_code == 0
+    records = [json.loads(line) for line in report_file.read_text().splitlines()]
+    assert records
+    assert sum(record["count"] for record in records) == 4
+    assert all(record["count"] == len(record["files"]) for record in records)
+
+
+def test_main_seen_filter(tmp_path):
+    """Test that songs in a seen filter built from a previous export are skipped."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    first_output = tmp_path / "first.csv"
+    second_output = tmp_path / "second.csv"
+    seen_filter = tmp_path / "seen.bloom"
+
+    assert main(["-i", str(fixtures_dir), "-o", str(first_output)]) == 0
+    exit_code = main(
+        [
+            "-i",
+            str(fixtures_dir),
+            "-o",
+            str(second_output),
+            "--seen-filter",
+            str(seen_filter),
+            "--seen-source",
+            str(first_output),
+            "--confirm-seen",
+        ]
+    )
+
+    assert exit_code == 0
+    assert seen_filter.exists()
+    assert not second_output.exists()
+
+    # Without a source to build from, a missing filter is an error
+    assert main(["-i", str(fixtures_dir), "--seen-filter", str(tmp_path / "missing")]) == 1
+
+
+def test_main_overlapping_roots(tmp_path):
+    """Test that nested and repeated roots are scanned once."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    once = tmp_path / "once.csv"
+    overlapping = tmp_path / "overlapping.csv"
+
+    assert main(["-i", str(fixtures_dir), "-o", str(once)]) == 0
+    exit_code = main(
+        [
+            "-i",
+            str(fixtures_dir / "Rock"),
+            str(fixtures_dir),
+            str(fixtures_dir),
+            "-o",
+            str(overlapping),
+        ]
+    )
+
+    assert exit_code == 0
+    assert overlapping.read_bytes() == once.read_bytes()
+
+
+def test_main_keeps_relative_input_paths(tmp_path, monkeypatch):
+    """Test that files of a relative input directory are exported with relative paths."""
+    monkeypatch.chdir(Path(__file__).parent / "fixtures")
+    output = tmp_path / "playlist.m3u"
+
+    assert main(["-i", "music", "-o", str(output), "-f", "m3u"]) == 0
+
+    entries = [line for line in output.read_text(encoding="utf-8").splitlines() if line]
+    paths = [line for line in entries if not line.startswith("#")]
+    assert paths
+    assert all(path.startswith("music") for path in paths)
+
+
+def test_main_benchmark_schedule(tmp_path, capsys):
+    """Test that the schedule benchmark reports every order without exporting."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    output = tmp_path / "output.csv"
+
+    exit_code = main(["-i", str(fixtures_dir), "-o", str(output), "--benchmark-schedule"])
+
+    assert exit_code == 0
+    assert not output.exists()
+    printed = capsys.readouterr().out
+    assert all(schedule in printed for schedule in ("path", "inode", "physical"))
+
+
+def test_parse_args_rate_limits():
+    """Test that scan rate limits must be positive."""
+    args = parse_args(["-i", "/path", "--max-read-mbps", "2.5", "--max-files-per-sec", "50"])
+    assert (args.max_read_mbps, args.max_files_per_sec) == (2.5, 50)
+    assert parse_args(["-i", "/path"]).max_read_mbps is None
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--max-read-mbps", "0"])
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--max-files-per-sec", "-1"])
+
+
+def test_parse_args_isolation():
+    """Test the per-file timeout and memory limit options."""
+    args = parse_args(["-i", "/path", "--file-timeout", "30", "--file-memory-limit", "512M"])
+    assert (args.file_timeout, args.file_memory_limit) == (30, 512 * 1024 * 1024)
+    with pytest.raises(SystemExit):
+        parse_args(["-i", "/path", "--file-timeout", "0"])
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""Tests for audio content duplicate detection."""
+
+import os
+
+import pytest
+
+from musiclist_for_soundiiz.content_duplicates import (
+    ContentDuplicateFinder,
+    HashCache,
+    audio_payload_range,
+    hash_audio_payload,
+)
+from musiclist_for_soundiiz.throttle import MB, Throttle
+
+AUDIO = bytes(range(256)) * 64
+
+
+def _id3v2(payload_size: int) -> bytes:
+    """Build an ID3v2 header followed by a padded tag body."""
+    size = bytes([(payload_size >> shift) & 0x7F for shift in (21, 14, 7, 0)])
+    return b"ID3\x04\x00\x00" + size + b"\x00" * payload_size
+
+
+def _id3v1(title: bytes) -> bytes:
+    return b"TAG" + title.ljust(125, b"\x00")
+
+
+def _apev2(body: bytes) -> bytes:
+    """Build an APEv2 footer-only tag."""
+    footer = (
+        b"APETAGEX"
+        + (2000).to_bytes(4, "little")
+        + (len(body) + 32).to_bytes(4, "little")
+        + (1).to_bytes(4, "little")
+        + (0).to_bytes(4, "little")
+        + b"\x00" * 8
+    )
+    return body + footer
+
+
+def _flac(blocks) -> bytes:
+    data = b"fLaC"
+    for i, block in enumerate(blocks):
+        last = 0x80 if i == len(blocks) - 1 else 0
+        data += bytes([last | 4]) + len(block).to_bytes(3, "big") + block
+    return data
+
+
+@pytest.fixture
+def write(tmp_path):
+    def _write(name, data):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+
+    return _write
+
+
+def test_payload_range_plain(write):
+    """Test that files without tags are hashed completely."""
+    path = write("plain.mp3", AUDIO)
+    assert audio_payload_range(path) == (0, len(AUDIO))
+
+
+def test_payload_range_skips_mp3_tags(write):
+    """Test that ID3v2, APEv2 and ID3v1 tags are excluded."""
+    prefix = _id3v2(100)
+    path = write("tagged.mp3", prefix + AUDIO + _apev2(b"x" * 20) + _id3v1(b"Title"))
+    assert audio_payload_range(path) == (len(prefix), len(AUDIO))
+
+
+def test_payload_range_skips_flac_metadata(write):
+    """Test that FLAC metadata blocks are excluded."""
+    header = _flac([b"a" * 34, b"comments"])
+    path = write("song.flac", header + AUDIO)
+    assert audio_payload_range(path) == (len(header), len(AUDIO))
+
+
+def test_payload_range_corrupt_tag_falls_back(write):
+    """Test that an impossible tag size hashes the whole file."""
+    data = b"ID3\x04\x00\x00\x7f\x7f\x7f\x7f" + AUDIO
+    path = write("corrupt.mp3", data)
+    assert audio_payload_range(path) == (0, len(data))
+
+
+def test_retagged_files_have_same_hash(write):
+    """Test that tags do not change the payload hash."""
+    first = write("a.mp3", _id3v2(50) + AUDIO + _id3v1(b"One"))
+    second = write("b.mp3", _id3v2(300) + AUDIO + _apev2(b"tags"))
+    other = write("c.mp3", _id3v2(50) + AUDIO[::-1] + _id3v1(b"One"))
+
+    assert hash_audio_payload(first) == hash_audio_payload(second)
+    assert hash_audio_payload(first, buffer_size=100) == hash_audio_payload(second)
+    assert hash_audio_payload(first) != hash_audio_payload(other)
+
+
+def test_build_index_groups_identical_audio(write):
+    """Test that content duplicates are grouped regardless of metadata."""
+    metadata = [
+        {"file_path": write("a.mp3", _id3v2(10) + AUDIO), "title": "A"},
+        {"file_path": write("b.mp3", AUDIO + _id3v1(b"B")), "title": "B"},
+        {"file_path": write("c.mp3", AUDIO[::-1]), "title": "A"},
+        {"file_path": "/missing.mp3", "title": "A"},
+    ]
+
+    index = ContentDuplicateFinder(workers=2).build_index(metadata)
+
+    assert len(index) == 1
+    key, files = next(iter(index.duplicates.items()))
+    assert index.matched_by(key) == "content"
+    assert [m["title"] for m in files] == ["A", "B"]
+    assert "Matched by: audio content" in index.get_report()
+    kept, removed = index.remove_duplicates("keep_last")
+    assert [m["title"] for m in kept] == ["B", "A", "A"]
+    assert [m["title"] for m in removed] == ["A"]
+
+
+def test_staged_prefilter(write):
+    """Test that each stage only reads files that still collide."""
+    big = AUDIO * 8  # 128 KiB, longer than two 16 KiB edges
+    middle_changed = big[:60000] + b"x" + big[60001:]
+    paths = [
+        write("a.mp3", _id3v2(10) + big),
+        write("b.mp3", big + _id3v1(b"B")),
+        write("c.mp3", middle_changed),
+        write("d.mp3", big[::-1]),
+        write("e.mp3", AUDIO),
+    ]
+    finder = ContentDuplicateFinder(workers=2, edge_size=16 * 1024)
+
+    digests = finder.content_digests(paths)
+
+    assert set(digests) == set(paths[:3])
+    assert digests[paths[0]] == digests[paths[1]] != digests[paths[2]]
+    # All files are located, e.mp3 is eliminated by its payload size
+    assert finder.stats["payload"]["files"] == 5
+    assert finder.stats["edges"] == {"files": 4, "bytes_read": 4 * 32 * 1024}
+    # d.mp3 is eliminated by its edges, c.mp3 only by the full hash
+    assert finder.stats["full"] == {"files": 3, "bytes_read": 3 * len(big)}
+
+
+def test_small_payloads_skip_full_hash(write):
+    """Test that payloads covered by the edges are not read again."""
+    paths = [write("a.mp3", AUDIO), write("b.mp3", _id3v2(5) + AUDIO)]
+    finder = ContentDuplicateFinder(workers=1)
+
+    digests = finder.content_digests(paths)
+
+    assert digests[paths[0]] == digests[paths[1]] == hash_audio_payload(paths[0])
+    assert finder.stats["full"]["files"] == 0
+
+
+def test_throttle_paces_hashing(write):
+    """Test that every stage's reads are charged to the read limit."""
+    big = bytes(range(256)) * (4 * 4096)  # 4 MiB
+    paths = [write("a.mp3", big), write("b.mp3", _id3v2(10) + big)]
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    throttle = Throttle(max_read_mbps=10, clock=lambda: now[0], sleep=sleep)
+    finder = ContentDuplicateFinder(workers=2, throttle=throttle)
+
+    digests = finder.content_digests(paths)
+
+    assert digests[paths[0]] == digests[paths[1]]
+    hashed = finder.stats["edges"]["bytes_read"] + finder.stats["full"]["bytes_read"]
+    assert throttle.bytes_read >= hashed == 2 * (2 * 64 * 1024 + len(big))
+    assert throttle.files_read == 6
+    # 10 MB/s, minus the initial burst of a tenth of a second
+    assert now[0] == pytest.approx(throttle.bytes_read / (10 * MB) - 0.1, abs=0.05)
+
+
+def test_hash_cache_skips_reads(write, tmp_path):
+    """Test that unchanged files only need a stat on later runs."""
+    paths = [write("a.mp3", AUDIO), write("b.mp3", AUDIO), write("c.mp3", AUDIO[:-1])]
+    cache_path = str(tmp_path / "hashes.db")
+    digests = ContentDuplicateFinder(workers=1, cache_path=cache_path).content_digests(paths)
+
+    finder = ContentDuplicateFinder(workers=1, cache_path=cache_path)
+    assert finder.content_digests(paths) == digests
+    assert all(stage["bytes_read"] == 0 for stage in finder.stats.values())
+
+    # A modified file is read again
+    stat = os.stat(paths[0])
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert finder.content_digests(paths) == digests
+    assert finder.stats["payload"]["files"] == 1
+    assert finder.stats["edges"]["files"] == 1
+
+
+def test_hash_cache_stale_entry(tmp_path):
+    """Test that entries are only returned for matching size and mtime."""
+    cache = HashCache(str(tmp_path / "hashes.db"))
+    cache.put_many([("/a.mp3", 10, 5, 0, 10, "abc", None)])
+    assert cache.get("/a.mp3", 10, 5) == {"offset": 0, "length": 10, "edges": "abc", "digest": None}
+    assert cache.get("/a.mp3", 11, 5) is None
+    assert cache.get("/a.mp3", 10, 6) is None
+    cache.close()
+
+
+def test_invalid_workers():
+    """Test that at least one worker is required."""
+    with pytest.raises(ValueError):
+        ContentDuplicateFinder(workers=0)
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 """Tests for duplicate detection functionality."""
 
+import io
+import json
+
 import pytest
 
-from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector
+from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector, DuplicateIndex
 
 
 @pytest.fixture
@@ -204,3 +207,185 @@ def test_skip_entries_without_title_or_artist():
 
     # No duplicates should be found (entries without title/artist are skipped)
     assert len(duplicates) == 0
+
+
+def test_duplicate_index_reused_for_report_and_removal(sample_metadata, monkeypatch):
+    """Test that one index serves groups, report and all strategies."""
+    detector = DuplicateDetector()
+    calls = []
+    original = detector._group_positions
+    monkeypatch.setattr(
+        detector, "_group_positions", lambda metadata: calls.append(1) or original(metadata)
+    )
+
+    index = detector.build_index(sample_metadata)
+
+    assert isinstance(index, DuplicateIndex)
+    assert len(index) == 1
+    assert index.total_files == 3
+    assert "1 duplicate song groups" in index.get_report()
+    for strategy in ("keep_first", "keep_last", "keep_shortest_path"):
+        unique_list, removed_list = index.remove_duplicates(strategy)
+        assert len(unique_list) == 3
+        assert len(removed_list) == 2
+    assert len(calls) == 1
+
+
+def test_duplicate_index_preserves_order():
+    """Test that removal keeps the original order of the remaining entries."""
+    metadata = [
+        {"title": "A", "artist": "X", "file_path": "/1.mp3"},
+        {"title": "B", "artist": "Y", "file_path": "/2.mp3"},
+        {"title": "A", "artist": "X", "file_path": "/3.mp3"},
+        {"title": "C", "artist": "Z", "file_path": "/4.mp3"},
+    ]
+
+    unique_list, removed_list = (
+        DuplicateDetector().build_index(metadata).remove_duplicates("keep_last")
+    )
+
+    assert [m["file_path"] for m in unique_list] == ["/2.mp3", "/3.mp3", "/4.mp3"]
+    assert [m["file_path"] for m in removed_list] == ["/1.mp3"]
+
+
+def test_duplicate_index_same_path_twice():
+    """Test that entries sharing a file path are removed individually."""
+    entry = {"title": "A", "artist": "X", "file_path": "/music/a.mp3"}
+
+    unique_list, removed_list = DuplicateDetector().remove_duplicates([entry, dict(entry)])
+
+    assert len(unique_list) == 1
+    assert len(removed_list) == 1
+
+
+def test_duration_tolerance_separates_edits():
+    """Test that versions with very different lengths are not duplicates."""
+    metadata = [
+        {"title": "Song", "artist": "Artist", "duration": "190", "file_path": "/radio.mp3"},
+        {"title": "Song", "artist": "Artist", "duration": "465", "file_path": "/extended.mp3"},
+        {"title": "Song", "artist": "Artist", "duration": "192", "file_path": "/radio2.mp3"},
+        {"title": "Song", "artist": "Artist", "duration": "", "file_path": "/unknown.mp3"},
+    ]
+
+    assert len(DuplicateDetector().find_duplicates(metadata)) == 1
+
+    duplicates = DuplicateDetector(duration_tolerance=3).find_duplicates(metadata)
+
+    assert len(duplicates) == 1
+    assert [m["file_path"] for m in list(duplicates.values())[0]] == [
+        "/radio.mp3",
+        "/radio2.mp3",
+    ]
+
+
+def test_duration_tolerance_runs_do_not_chain():
+    """Test that runs are anchored at their shortest duration."""
+    metadata = [
+        {"title": "Song", "artist": "Artist", "duration": str(d), "file_path": f"/{d}.mp3"}
+        for d in (200, 204, 208, 212)
+    ]
+
+    index = DuplicateDetector(duration_tolerance=5).build_index(metadata)
+
+    assert sorted(index.groups.values()) == [[0, 1], [2, 3]]
+
+
+def test_invalid_duration_tolerance():
+    """Test that a negative tolerance is rejected."""
+    with pytest.raises(ValueError, match="Invalid duration tolerance"):
+        DuplicateDetector(duration_tolerance=-1)
+
+
+def test_isrc_first_matching():
+    """Test that ISRC is the primary key and title/artist the fallback."""
+    metadata = [
+        # Same ISRC, different tags
+        {"title": "Song", "artist": "Artist", "isrc": "US-AB1-20-00001", "file_path": "/1.mp3"},
+        {"title": "Song (Remaster)", "artist": "A.", "isrc": "USAB12000001", "file_path": "/2.mp3"},
+        # Same tags, different ISRC: different recordings
+        {"title": "Live", "artist": "Band", "isrc": "GBAAA0000001", "file_path": "/3.mp3"},
+        {"title": "Live", "artist": "Band", "isrc": "GBAAA0000002", "file_path": "/4.mp3"},
+        # Untagged copy of the first song joins its ISRC group
+        {"title": "song", "artist": "artist", "isrc": "", "file_path": "/5.mp3"},
+        # Untagged songs matched by title/artist
+        {"title": "Other", "artist": "X", "isrc": "", "file_path": "/6.mp3"},
+        {"title": "Other", "artist": "X", "file_path": "/7.mp3"},
+    ]
+
+    index = DuplicateDetector(use_isrc=True).build_index(metadata)
+
+    assert index.groups == {"isrc:USAB12000001": [0, 1, 4], "other|x": [5, 6]}
+    assert index.matched_by("isrc:USAB12000001") == "isrc"
+    assert index.matched_by("other|x") == "title_artist"
+
+    report = index.get_report()
+    assert "Matched by: ISRC USAB12000001" in report
+    assert "Matched by: title/artist" in report
+
+
+def test_isrc_fallback_ambiguous_title_artist():
+    """Test that untagged tracks are not attached to ambiguous ISRC groups."""
+    metadata = [
+        {"title": "Live", "artist": "Band", "isrc": "GBAAA0000001", "file_path": "/1.mp3"},
+        {"title": "Live", "artist": "Band", "isrc": "GBAAA0000002", "file_path": "/2.mp3"},
+        {"title": "Live", "artist": "Band", "isrc": "", "file_path": "/3.mp3"},
+    ]
+
+    index = DuplicateDetector(use_isrc=True).build_index(metadata)
+
+    assert len(index) == 0
+
+
+def test_isrc_with_duration_tolerance():
+    """Test that untagged tracks only join an ISRC group within the duration tolerance."""
+    metadata = [
+        {"title": "Song", "artist": "Artist", "isrc": "USAB12000001", "duration": "190"},
+        {"title": "Song", "artist": "Artist", "isrc": "", "duration": "465"},
+        {"title": "Song", "artist": "Artist", "isrc": "", "duration": "467"},
+        {"title": "Song", "artist": "Artist", "isrc": "", "duration": "192"},
+    ]
+
+    index = DuplicateDetector(use_isrc=True, duration_tolerance=5).build_index(metadata)
+
+    assert sorted(index.groups.values()) == [[0, 3], [1, 2]]
+    assert index.groups["isrc:USAB12000001"] == [0, 3]
+
+
+def test_write_report_text_matches_get_report(sample_metadata):
+    """Test that the streamed text report equals the in-memory report."""
+    index = DuplicateDetector().build_index(sample_metadata)
+    output = io.StringIO()
+
+    index.write_report(output)
+
+    assert output.getvalue() == index.get_report()
+
+
+def test_write_report_jsonl(sample_metadata):
+    """Test the machine-readable report."""
+    index = DuplicateDetector().build_index(sample_metadata)
+    output = io.StringIO()
+
+    index.write_report(output, "jsonl")
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(records) == len(index)
+    assert records[0]["key"] == "song a|artist 1"
+    assert records[0]["matched_by"] == "title_artist"
+    assert records[0]["count"] == 3
+    assert records[0]["files"][0] == "/music/song_a_1.mp3"
+
+
+def test_write_report_empty_and_invalid_format():
+    """Test reports without duplicates and unknown formats."""
+    index = DuplicateDetector().build_index([])
+    output = io.StringIO()
+    index.write_report(output)
+    assert output.getvalue() == "No duplicates found."
+
+    output = io.StringIO()
+    index.write_report(output, "jsonl")
+    assert output.getvalue() == ""
+
+    with pytest.raises(ValueError):
+        index.write_report(output, "xml")
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Tests for delta exports against previous exports."""
+
+import pytest
+
+from musiclist_for_soundiiz.export_history import (
+    ExportedKeySet,
+    filter_new_tracks,
+    find_export_files,
+    iter_exported_tracks,
+    load_exported_keys,
+)
+from musiclist_for_soundiiz.exporter import CSVExporter, JSONExporter
+
+
+@pytest.fixture
+def previous_metadata():
+    """Metadata of a previous export."""
+    return [
+        {"title": "Song A", "artist": "Artist 1", "album": "Album 1", "isrc": ""},
+        {"title": "Song, B", "artist": 'Artist "2"', "album": "Album 2", "isrc": "ISRC002"},
+        {"title": "Song C", "artist": "Artist 3", "album": "Album 3", "isrc": ""},
+    ]
+
+
+def test_key_set_membership():
+    """Test adding and looking up keys across multiple runs."""
+    key_set = ExportedKeySet()
+    key_set.RUN_SIZE = 2
+    for key in ["a|x", "b|y", "c|z", "a|x"]:
+        key_set.add(key)
+
+    assert len(key_set) == 3
+    assert "a|x" in key_set
+    assert "c|z" in key_set
+    assert "d|w" not in key_set
+
+
+def test_find_export_files_split(tmp_path, previous_metadata):
+    """Test that split chunk files are found from the base path."""
+    CSVExporter(max_songs_per_file=1).export(previous_metadata, str(tmp_path / "old.csv"))
+
+    files = find_export_files(str(tmp_path / "old.csv"))
+
+    assert [f.name for f in files] == ["old_1.csv", "old_2.csv", "old_3.csv"]
+
+
+def test_find_export_files_missing(tmp_path):
+    """Test that a missing export raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        find_export_files(str(tmp_path / "missing.csv"))
+
+
+def test_iter_exported_tracks_csv_roundtrip(tmp_path, previous_metadata):
+    """Test that CSV exports are read back with escaping undone."""
+    CSVExporter().export(previous_metadata, str(tmp_path / "old.csv"))
+
+    tracks = list(iter_exported_tracks(str(tmp_path / "old.csv")))
+
+    assert len(tracks) == 3
+    assert tracks[1]["title"] == "Song, B"
+    assert tracks[1]["artist"] == 'Artist "2"'
+    assert tracks[1]["isrc"] == "ISRC002"
+
+
+def test_load_exported_keys_json_directory(tmp_path, previous_metadata):
+    """Test loading keys from a directory of JSON chunks."""
+    JSONExporter(max_songs_per_file=2, write_manifest=True).export(
+        previous_metadata, str(tmp_path / "old.json")
+    )
+
+    key_set = load_exported_keys(str(tmp_path))
+
+    assert len(key_set) == 3
+
+
+def test_filter_new_tracks(tmp_path, previous_metadata):
+    """Test that only tracks missing from the previous export are kept."""
+    CSVExporter().export(previous_metadata, str(tmp_path / "old.csv"))
+    key_set = load_exported_keys(str(tmp_path / "old.csv"))
+
+    current = [
+        {"title": "SONG A", "artist": "artist 1", "file_path": "/music/a.mp3"},
+        {"title": "Song D", "artist": "Artist 4", "file_path": "/music/d.mp3"},
+    ]
+    new_tracks, skipped = filter_new_tracks(current, key_set)
+
+    assert skipped == 1
+    assert [t["title"] for t in new_tracks] == ["Song D"]
@@ -2,6 +2,8 @@
 """Tests for metadata exporters."""
 
 import json
+import os
+import stat
 
 import pytest
 
@@ -344,3 +346,102 @@ class TestGetExporter:
             get_exporter("invalid")
 
         assert "Unsupported format" in str(exc_info.value)
+
+
+class TestChunkWrites:
+    """Test cases for hashed, atomic chunk writes and manifests."""
+
+    def test_unchanged_chunk_is_not_rewritten(self, tmp_path, sample_metadata):
+        """Test that re-exporting identical content leaves the file untouched."""
+        exporter = CSVExporter()
+        output_file = tmp_path / "output.csv"
+
+        exporter.export(sample_metadata, str(output_file))
+        first_mtime = output_file.stat().st_mtime_ns
+        first_inode = output_file.stat().st_ino
+
+        exporter.export(sample_metadata, str(output_file))
+
+        assert output_file.stat().st_mtime_ns == first_mtime
+        assert output_file.stat().st_ino == first_inode
+
+    def test_changed_chunk_is_rewritten(self, tmp_path, sample_metadata):
+        """Test that changed content replaces the existing file."""
+        exporter = CSVExporter()
+        output_file = tmp_path / "output.csv"
+
+        exporter.export(sample_metadata, str(output_file))
+        exporter.export(sample_metadata[:1], str(output_file))
+
+        content = output_file.read_text(encoding="utf-8")
+        assert "Song 1" in content
+        assert "Song, with comma" not in content
+        # No temporary files should be left behind
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["output.csv"]
+
+    def test_manifest_lists_chunks(self, tmp_path):
+        """Test that the manifest lists each chunk's hash and song count."""
+        metadata = [
+            {"title": f"Song {i}", "artist": "Artist", "album": "Album", "isrc": ""}
+            for i in range(5)
+        ]
+        exporter = CSVExporter(max_songs_per_file=2, write_manifest=True)
+        output_file = tmp_path / "output.csv"
+
+        exporter.export(metadata, str(output_file))
+
+        manifest = json.loads((tmp_path / "output.manifest.json").read_text(encoding="utf-8"))
+        assert manifest["total_songs"] == 5
+        assert [entry["file"] for entry in manifest["files"]] == [
+            "output_1.csv",
+            "output_2.csv",
+            "output_3.csv",
+        ]
+        assert [entry["songs"] for entry in manifest["files"]] == [2, 2, 1]
+        assert all(entry["changed"] for entry in manifest["files"])
+
+        # Second run: nothing changed
+        exporter.export(metadata, str(output_file))
+        manifest = json.loads((tmp_path / "output.manifest.json").read_text(encoding="utf-8"))
+        assert not any(entry["changed"] for entry in manifest["files"])
+
+    def test_no_manifest_by_default(self, tmp_path, sample_metadata):
+        """Test that no manifest is written unless requested."""
+        exporter = JSONExporter()
+        exporter.export(sample_metadata, str(tmp_path / "output.json"))
+
+        assert not (tmp_path / "output.manifest.json").exists()
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_written_files_respect_umask(self, tmp_path, sample_metadata):
+        """Test that new files get the umask default and rewrites keep the mode."""
+        output_file = tmp_path / "output.csv"
+        manifest_file = tmp_path / "output.manifest.json"
+        old_umask = os.umask(0o022)
+        try:
+            CSVExporter(write_manifest=True).export(sample_metadata, str(output_file))
+        finally:
+            os.umask(old_umask)
+
+        assert stat.S_IMODE(output_file.stat().st_mode) == 0o644
+        assert stat.S_IMODE(manifest_file.stat().st_mode) == 0o644
+
+        output_file.chmod(0o640)
+        CSVExporter().export(sample_metadata[:1], str(output_file))
+        assert stat.S_IMODE(output_file.stat().st_mode) == 0o640
+
+    def test_line_endings_follow_the_platform(self, tmp_path, sample_metadata, monkeypatch):
+        """Test that text formats use the platform line ending and CSV keeps "\\n"."""
+        monkeypatch.setattr(os, "linesep", "\r\n")
+        for exporter, name in [
+            (TXTExporter(), "output.txt"),
+            (M3UExporter(), "output.m3u"),
+            (CSVExporter(), "output.csv"),
+        ]:
+            exporter.export(sample_metadata, str(tmp_path / name))
+
+        for name in ("output.txt", "output.m3u"):
+            data = (tmp_path / name).read_bytes()
+            assert b"\r\n" in data
+            assert b"\n" not in data.replace(b"\r\n", b"")
+        assert b"\r\n" not in (tmp_path / "output.csv").read_bytes()
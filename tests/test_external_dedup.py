@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Tests for out-of-core duplicate removal."""
+
+import random
+
+import pytest
+
+from musiclist_for_soundiiz import external_dedup
+from musiclist_for_soundiiz.duplicate_detector import STRATEGIES, DuplicateDetector
+from musiclist_for_soundiiz.export_history import ExportedKeySet, filter_new_tracks
+from musiclist_for_soundiiz.exporter import CSVExporter
+from musiclist_for_soundiiz.external_dedup import ExternalDeduplicator
+
+
+def _library(size=500, seed=3):
+    rng = random.Random(seed)
+    library = []
+    for i in range(size):
+        song = rng.randrange(size // 3)
+        library.append(
+            {
+                "title": f"Song {song}" if rng.random() > 0.5 else f"SONG {song}",
+                "artist": f"Artist {song % 7}",
+                "album": "Album",
+                "file_path": "/music/" + "x" * rng.randrange(10) + f"/{i}.mp3",
+            }
+        )
+    library.append({"title": "", "artist": "No Title", "album": "", "file_path": "/music/a.mp3"})
+    return library
+
+
+def _dedup(library, **kwargs):
+    deduplicator = ExternalDeduplicator(**kwargs)
+    for metadata in library:
+        deduplicator.add(metadata)
+    records = deduplicator.finish()
+    return deduplicator, records
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("max_memory", [1024, 1 << 30])
+def test_matches_in_memory_removal(strategy, max_memory):
+    """Test that spilled and in-memory runs keep the same records."""
+    library = _library()
+    expected, _removed = DuplicateDetector().remove_duplicates(library, strategy)
+
+    deduplicator, records = _dedup(library, strategy=strategy, max_memory=max_memory)
+    try:
+        if max_memory == 1024:
+            assert len(deduplicator._runs) > 1
+        assert len(records) == len(expected)
+        assert list(records) == expected
+    finally:
+        deduplicator.cleanup()
+
+
+def test_keeps_all_without_strategy():
+    """Test that no records are removed without a strategy."""
+    library = _library(50)
+    with ExternalDeduplicator(strategy=None, max_memory=512) as deduplicator:
+        for metadata in library:
+            deduplicator.add(metadata)
+        assert list(deduplicator.finish()) == library
+        assert deduplicator.duplicate_groups == 0
+
+
+def test_exclude_keys_matches_delta_export():
+    """Test that excluded keys behave like removal followed by a delta filter."""
+    library = _library()
+    detector = DuplicateDetector()
+    exported = ExportedKeySet(detector.track_key(m) for m in library[::5] if m["title"])
+    unique, _removed = detector.remove_duplicates(library, "keep_last")
+    expected, skipped = filter_new_tracks(unique, exported)
+
+    with ExternalDeduplicator(
+        strategy="keep_last", max_memory=2048, exclude_keys=exported
+    ) as deduplicator:
+        for metadata in library:
+            deduplicator.add(metadata)
+        assert list(deduplicator.finish()) == expected
+        assert deduplicator.excluded == skipped
+
+
+def test_spilled_records_slices():
+    """Test indexing and forward/backward slicing of kept records."""
+    library = _library(100)
+    with ExternalDeduplicator(strategy=None) as deduplicator:
+        for metadata in library:
+            deduplicator.add(metadata)
+        records = deduplicator.finish()
+
+        assert records[10:20] == library[10:20]
+        assert records[20:25] == library[20:25]
+        assert records[0:3] == library[0:3]
+        assert records[-1] == library[-1]
+        assert records[95:200] == library[95:]
+        with pytest.raises(IndexError):
+            records[len(library)]
+        with pytest.raises(ValueError):
+            records[::2]
+
+
+def test_export_spilled_records(tmp_path):
+    """Test that exporters write spilled records in chunks."""
+    library = _library(50)
+    with ExternalDeduplicator(strategy="keep_first", max_memory=512) as deduplicator:
+        for metadata in library:
+            deduplicator.add(metadata)
+        records = deduplicator.finish()
+        CSVExporter(max_songs_per_file=10).export(records, str(tmp_path / "out.csv"))
+
+    unique, _removed = DuplicateDetector().remove_duplicates(library)
+    CSVExporter(max_songs_per_file=10).export(unique, str(tmp_path / "ref.csv"))
+
+    ref_files = sorted(tmp_path.glob("ref_*.csv"))
+    assert ref_files
+    for ref_file in ref_files:
+        out_file = tmp_path / ref_file.name.replace("ref_", "out_")
+        assert out_file.read_bytes() == ref_file.read_bytes()
+
+
+def test_cleanup_removes_spill_files():
+    """Test that spill files are deleted."""
+    with ExternalDeduplicator(max_memory=256) as deduplicator:
+        for metadata in _library(50):
+            deduplicator.add(metadata)
+        spill_dir = deduplicator._dir
+        assert spill_dir.exists()
+    assert not spill_dir.exists()
+
+
+def test_invalid_arguments():
+    """Test argument validation."""
+    with pytest.raises(ValueError):
+        ExternalDeduplicator(strategy="keep_best")
+    with pytest.raises(ValueError):
+        ExternalDeduplicator(max_memory=0)
+
+
+def test_merge_passes_bound_open_runs(monkeypatch):
+    """Test that many runs are merged in passes with a bounded fan-in."""
+    monkeypatch.setattr(external_dedup, "MAX_MERGE_RUNS", 4)
+    read_run = ExternalDeduplicator._read_run
+    open_runs = [0]
+    max_open = [0]
+
+    def counting_read_run(run_path):
+        open_runs[0] += 1
+        max_open[0] = max(max_open[0], open_runs[0])
+        try:
+            yield from read_run(run_path)
+        finally:
+            open_runs[0] -= 1
+
+    monkeypatch.setattr(ExternalDeduplicator, "_read_run", staticmethod(counting_read_run))
+    library = _library()
+    expected, _removed = DuplicateDetector().remove_duplicates(library, "keep_first")
+
+    deduplicator, records = _dedup(library, max_memory=1024)
+    try:
+        assert deduplicator._spilled_runs > 16
+        assert len(deduplicator._runs) <= 4
+        assert max_open[0] <= 4
+        assert list(records) == expected
+        assert len(list(deduplicator._dir.glob("run_*"))) == len(deduplicator._runs)
+    finally:
+        deduplicator.cleanup()
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 """Tests for music file metadata extraction."""
 
+import os
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
-from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.extractor import MusicFileExtractor, compute_track_id
 
 
 class TestMusicFileExtractor:
@@ -158,6 +162,78 @@ class TestMusicFileExtractor:
         files_non_recursive = extractor.find_music_files(str(tmp_path), recursive=False)
         assert len(files_non_recursive) == 1
 
+    def test_find_music_files_parallel_walk(self, tmp_path):
+        """Test that the parallel walker finds the same files in the same order."""
+        for i in range(5):
+            subdir = tmp_path / f"artist{i}" / "album"
+            subdir.mkdir(parents=True)
+            (subdir / f"song{i}.mp3").touch()
+            (subdir / f"cover{i}.jpg").touch()
+            (subdir / f"._song{i}.mp3").touch()
+        (tmp_path / ".hidden").mkdir()
+        (tmp_path / ".hidden" / "song.flac").touch()
+        (tmp_path / "top.ogg").touch()
+        (tmp_path / "link").symlink_to(tmp_path / "artist0")
+
+        sequential = MusicFileExtractor().find_music_files(str(tmp_path))
+        parallel = MusicFileExtractor(walk_jobs=4).find_music_files(str(tmp_path))
+
+        assert len(sequential) == 7
+        assert parallel == sequential
+
+    def test_unique_files(self, tmp_path):
+        """Test that hardlinks and symlinks of a file are parsed once."""
+        fixture = Path(__file__).parent / "fixtures" / "music" / "Rock"
+        source = sorted(fixture.rglob("*.mp3"))[0]
+        first = tmp_path / "a" / "song.mp3"
+        first.parent.mkdir()
+        first.write_bytes(source.read_bytes())
+        (tmp_path / "b").mkdir()
+        os.link(first, tmp_path / "b" / "hardlink.mp3")
+        (tmp_path / "b" / "symlink.mp3").symlink_to(first)
+
+        assert len(MusicFileExtractor().extract_all(str(tmp_path))) == 3
+
+        extractor = MusicFileExtractor(unique_files=True)
+        metadata_list = extractor.extract_all(str(tmp_path))
+        assert [m["file_path"] for m in metadata_list] == [str(first)]
+        assert extractor.aliases == 2
+        # Only the physical files are remembered, not their metadata
+        assert list(extractor._files.values()) == [None]
+
+        extractor = MusicFileExtractor(unique_files=True, list_aliases=True)
+        with patch.object(extractor, "extract_metadata", wraps=extractor.extract_metadata) as parse:
+            metadata_list = extractor.extract_all(str(tmp_path))
+        assert parse.call_count == 1
+        assert [m["filename"] for m in metadata_list] == ["song.mp3", "hardlink.mp3", "symlink.mp3"]
+        assert metadata_list[1]["title"] == metadata_list[0]["title"]
+
+    def test_invalid_walk_jobs(self):
+        """Test that walk_jobs must be positive."""
+        with pytest.raises(ValueError):
+            MusicFileExtractor(walk_jobs=0)
+
+    @pytest.mark.parametrize("jobs", [4, "auto"])
+    def test_extract_all_parallel(self, tmp_path, jobs):
+        """Test that parallel extraction returns the same metadata in the same order."""
+        source = Path(__file__).parent / "fixtures" / "music" / "Rock" / "test_file.mp3"
+        for i in range(20):
+            (tmp_path / f"Artist - Song {i:02d}.mp3").write_bytes(source.read_bytes())
+        (tmp_path / "broken.mp3").write_bytes(b"not audio")
+
+        sequential = MusicFileExtractor().extract_all(str(tmp_path))
+        parallel = MusicFileExtractor(jobs=jobs).extract_all(str(tmp_path))
+
+        assert len(sequential) == 20
+        assert parallel == sequential
+
+    def test_invalid_jobs(self):
+        """Test that jobs must be positive or 'auto'."""
+        with pytest.raises(ValueError):
+            MusicFileExtractor(jobs=0)
+        with pytest.raises(ValueError):
+            MusicFileExtractor(jobs="fast")
+
     def test_find_music_files_case_insensitive(self, tmp_path):
         """Test that file extensions are matched case-insensitively."""
         extractor = MusicFileExtractor()
@@ -232,3 +308,17 @@ class TestMusicFileExtractor:
 
         # Files without proper metadata should be skipped
         assert "Skipping file" in caplog.text or len(metadata_list) == 0
+
+    def test_track_id_prefers_isrc(self):
+        """Test that the track ID only depends on the ISRC when present."""
+        track_id = compute_track_id("Song", "Artist", "Album", "US-AB1-20-00001", "180")
+
+        assert track_id == compute_track_id("Other", "Other", "Other", "usab12000001", "999")
+        assert len(track_id) == 16
+
+    def test_track_id_from_normalized_tags(self):
+        """Test that the track ID falls back to normalized tags and duration."""
+        track_id = compute_track_id("Song  Title", "Artist", "Album", "", "180")
+
+        assert track_id == compute_track_id("song title", "ARTIST", "album", "", "180")
+        assert track_id != compute_track_id("Song Title", "Artist", "Album", "", "420")
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Tests for fuzzy duplicate matching."""
+
+import pytest
+
+from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector
+from musiclist_for_soundiiz.fuzzy_matching import FuzzyNormalizer, cluster_similar_keys
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("Song (Remastered 2011)", "song"),
+        ("Song - Remaster", "song"),
+        ("Song - 2011 Remastered Version", "song"),
+        ("Song [Live at Wembley]", "song"),
+        ("Song (feat. Someone)", "song"),
+        ("Artist feat. X", "artist"),
+        ("Artist ft. X & Y", "artist"),
+        ("Beyoncé", "beyonce"),
+        ("ＳＯＮＧ", "song"),
+        ("Straße", "strasse"),
+        ("Don't Stop!", "don t stop"),
+        ("Simon & Garfunkel", "simon and garfunkel"),
+        ("Alive", "alive"),
+        ("Daft Punk", "daft punk"),
+        ("???", "???"),
+    ],
+)
+def test_normalizer(raw, expected):
+    """Test the normalization pipeline."""
+    assert FuzzyNormalizer()(raw) == expected
+
+
+def test_normalizer_memoizes():
+    """Test that each unique string is normalized once."""
+    normalizer = FuzzyNormalizer()
+    for _ in range(3):
+        normalizer("Song (Live)")
+        normalizer("Other Song")
+
+    assert len(normalizer) == 2
+
+
+def test_cluster_similar_keys():
+    """Test that similar keys in the same block are merged."""
+    representatives = cluster_similar_keys(
+        ["yesterday|the beatles", "yesterdy|the beatles", "let it be|the beatles"],
+        threshold=0.9,
+    )
+
+    assert representatives["yesterdy|the beatles"] == "yesterday|the beatles"
+    assert representatives["let it be|the beatles"] == "let it be|the beatles"
+
+
+def test_cluster_skips_keys_in_different_blocks():
+    """Test that keys sharing no block are never compared."""
+    representatives = cluster_similar_keys(["abc|x", "xbc|y"], threshold=0.1)
+
+    assert representatives["abc|x"] != representatives["xbc|y"]
+
+
+def test_fuzzy_detector_groups_variants():
+    """Test fuzzy duplicate detection on tag variants."""
+    metadata = [
+        {"title": "Song", "artist": "Artist", "file_path": "/1.mp3"},
+        {"title": "Song (Remastered 2011)", "artist": "Artist", "file_path": "/2.mp3"},
+        {"title": "Song - Remaster", "artist": "Artist feat. X", "file_path": "/3.mp3"},
+        {"title": "Sông", "artist": "ARTIST", "file_path": "/4.mp3"},
+        {"title": "Other", "artist": "Artist", "file_path": "/5.mp3"},
+    ]
+
+    exact = DuplicateDetector().find_duplicates(metadata)
+    fuzzy = DuplicateDetector(fuzzy=True).find_duplicates(metadata)
+
+    assert len(exact) == 0
+    assert len(fuzzy) == 1
+    assert [m["file_path"] for m in list(fuzzy.values())[0]] == [
+        "/1.mp3",
+        "/2.mp3",
+        "/3.mp3",
+        "/4.mp3",
+    ]
+
+
+def test_invalid_similarity_threshold():
+    """Test that an out-of-range threshold is rejected."""
+    with pytest.raises(ValueError, match="Invalid similarity threshold"):
+        DuplicateDetector(fuzzy=True, similarity_threshold=1.5)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Tests for the incremental duplicate index."""
+
+import os
+import random
+import stat
+
+import pytest
+
+from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector
+from musiclist_for_soundiiz.incremental_index import IncrementalDuplicateIndex
+
+
+def _track(path, title="Song", artist="Artist"):
+    return {"file_path": path, "title": title, "artist": artist, "album": "Album"}
+
+
+def test_add_and_remove():
+    """Test that groups follow additions and removals."""
+    index = IncrementalDuplicateIndex()
+    index.add(_track("/a.mp3"))
+    assert len(index) == 0
+
+    index.add(_track("/b.mp3", "SONG"))
+    index.add(_track("/c.mp3", "Other"))
+    assert len(index) == 1
+    assert [t["file_path"] for t in index.duplicates["song|artist"]] == ["/a.mp3", "/b.mp3"]
+
+    assert index.remove(_track("/a.mp3"))
+    assert not index.remove(_track("/a.mp3"))
+    assert len(index) == 0
+    assert index.total_tracks == 2
+
+
+def test_groups_changed_since():
+    """Test that only groups changed after a version are returned."""
+    index = IncrementalDuplicateIndex()
+    index.add(_track("/a.mp3"))
+    index.add(_track("/b.mp3"))
+    seen = index.add(_track("/c.mp3", "Other"))
+
+    assert index.groups_changed_since(seen) == {}
+
+    index.add(_track("/d.mp3", "Other"))
+    index.remove(_track("/a.mp3"))
+    changed = index.groups_changed_since(seen)
+
+    assert set(changed) == {"other|artist", "song|artist"}
+    assert len(changed["other|artist"]) == 2
+    assert [t["file_path"] for t in changed["song|artist"]] == ["/b.mp3"]
+    assert set(index.groups_changed_since(0)) == {"other|artist", "song|artist"}
+
+
+def test_readding_track_updates_group():
+    """Test that re-adding a path with new tags moves it to its new group."""
+    index = IncrementalDuplicateIndex()
+    index.add(_track("/a.mp3"))
+    index.add(_track("/b.mp3"))
+    seen = index.version
+
+    index.add(_track("/b.mp3", "Renamed"))
+
+    assert len(index) == 0
+    assert set(index.groups_changed_since(seen)) == {"song|artist", "renamed|artist"}
+    assert index.total_tracks == 2
+
+
+def test_matches_full_detection():
+    """Test that random changes give the same groups as a full rebuild."""
+    rng = random.Random(7)
+    index = IncrementalDuplicateIndex()
+    library = {}
+    for _step in range(2000):
+        path = f"/{rng.randrange(300)}.mp3"
+        if path in library and rng.random() < 0.4:
+            index.remove(library.pop(path))
+        else:
+            track = _track(path, f"Song {rng.randrange(60)}", f"Artist {rng.randrange(3)}")
+            library.pop(path, None)
+            library[path] = track
+            index.add(track)
+
+    expected = DuplicateDetector().build_index(list(library.values()))
+    actual = index.to_duplicate_index()
+
+    assert actual.groups == expected.groups
+    assert len(index) == len(expected)
+    assert actual.remove_duplicates("keep_last") == expected.remove_duplicates("keep_last")
+
+
+def test_save_and_load(tmp_path):
+    """Test that the index, its version and its change history persist."""
+    index = IncrementalDuplicateIndex(DuplicateDetector(case_sensitive=True))
+    index.add(_track("/a.mp3"))
+    index.add(_track("/b.mp3"))
+    seen = index.add(_track("/c.mp3", "song"))
+    index.remove(_track("/a.mp3"))
+    path = tmp_path / "index.json"
+    index.save(str(path))
+
+    loaded = IncrementalDuplicateIndex.load(str(path))
+
+    assert loaded.version == index.version
+    assert loaded.detector.case_sensitive
+    assert loaded.duplicates == index.duplicates
+    assert loaded.groups_changed_since(seen) == index.groups_changed_since(seen)
+    assert loaded.add(_track("/d.mp3")) == index.version + 1
+    assert len(loaded) == 1
+
+
+def test_load_rejects_unknown_format(tmp_path):
+    """Test that files of another format are rejected."""
+    path = tmp_path / "index.json"
+    path.write_text('{"format": 99}')
+    with pytest.raises(ValueError):
+        IncrementalDuplicateIndex.load(str(path))
+
+
+def test_unsupported_detectors():
+    """Test that matching across keys is rejected."""
+    for detector in (
+        DuplicateDetector(fuzzy=True),
+        DuplicateDetector(duration_tolerance=3),
+        DuplicateDetector(use_isrc=True),
+    ):
+        with pytest.raises(ValueError):
+            IncrementalDuplicateIndex(detector)
+    IncrementalDuplicateIndex(DuplicateDetector(fuzzy=True, similarity_threshold=1.0))
+
+
+def test_track_without_path():
+    """Test that tracks need an identity."""
+    with pytest.raises(ValueError):
+        IncrementalDuplicateIndex().add({"title": "Song", "artist": "Artist"})
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+def test_saved_index_respects_umask(tmp_path):
+    """Test that the saved index is not left owner-only by the atomic write."""
+    index = IncrementalDuplicateIndex()
+    index.add(_track("/a.mp3"))
+    path = tmp_path / "index.json"
+    old_umask = os.umask(0o022)
+    try:
+        index.save(str(path))
+    finally:
+        os.umask(old_umask)
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
@@ -33,6 +33,7 @@ class TestRealAudioFiles:
         assert metadata["album"] == "Loneliness"
         assert metadata["filename"] == "test_file.mp3"
         assert "file_path" in metadata
+        assert len(metadata["track_id"]) == 16
 
     def test_extract_flac_metadata(self, fixtures_dir):
         """Test metadata extraction from real FLAC file."""
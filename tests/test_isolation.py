@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Tests for extraction in isolated worker processes."""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.isolation import WorkerPool
+
+FIXTURES = Path(__file__).parent / "fixtures" / "music"
+
+unix_only = pytest.mark.skipif(sys.platform == "win32", reason="needs FIFOs and rlimits")
+
+
+def _id3_bomb(path):
+    """Write an MP3 whose ID3v2 header announces a 256 MB tag."""
+    path.write_bytes(b"ID3\x04\x00\x00" + bytes([0x7F] * 4) + bytes(100))
+    return path
+
+
+def test_isolated_extraction_returns_same_metadata():
+    """Test that worker processes return the same metadata as in-process extraction."""
+    expected = MusicFileExtractor().extract_all(str(FIXTURES))
+
+    for jobs in (1, 3):
+        extractor = MusicFileExtractor(jobs=jobs, file_timeout=30, max_files_per_sec=1000)
+        assert extractor.extract_all(str(FIXTURES)) == expected
+        assert extractor.failures == []
+        assert extractor.throttle.bytes_read > 0
+
+
+@unix_only
+def test_timeout_replaces_worker(tmp_path):
+    """Test that a hanging file times out and the next file still extracts."""
+    fifo = tmp_path / "hang.mp3"
+    os.mkfifo(fifo)
+    song = FIXTURES / "Rock" / "test_file.mp3"
+
+    with WorkerPool(timeout=0.5) as pool:
+        with pytest.raises(TimeoutError):
+            pool.extract(fifo)
+        metadata, bytes_read = pool.extract(song)
+
+    assert metadata["file_path"] == str(song)
+    assert bytes_read > 0
+    assert (pool.timeouts, pool.crashes) == (1, 0)
+
+
+@unix_only
+def test_memory_limit(tmp_path):
+    """Test that a file needing a huge allocation fails without killing the scan."""
+    _id3_bomb(tmp_path / "bomb.mp3")
+    song = FIXTURES / "Rock" / "test_file.mp3"
+    (tmp_path / song.name).write_bytes(song.read_bytes())
+
+    extractor = MusicFileExtractor(file_memory_limit=200 * 1024 * 1024)
+    metadata_list = extractor.extract_all(str(tmp_path))
+
+    assert [m["filename"] for m in metadata_list] == [song.name]
+    assert extractor.failures == [
+        (str(tmp_path / "bomb.mp3"), "Failed to extract metadata: Memory limit exceeded")
+    ]
+
+
+@unix_only
+def test_memory_limit_with_mmap_backend(tmp_path):
+    """Test that mapped files larger than the memory limit still extract."""
+    song = FIXTURES / "Rock" / "test_file.mp3"
+    large = tmp_path / "large.mp3"
+    large.write_bytes(song.read_bytes())
+    # Sparse padding makes the file larger than the address space limit
+    os.truncate(large, 512 * 1024 * 1024)
+    expected = MusicFileExtractor().extract_metadata(large)
+
+    extractor = MusicFileExtractor(file_memory_limit=200 * 1024 * 1024, read_backend="mmap")
+    metadata_list = extractor.extract_all(str(tmp_path))
+
+    assert extractor.failures == []
+    assert metadata_list == [expected]
+
+
+@unix_only
+def test_dead_worker_is_replaced(tmp_path):
+    """Test that a worker dying mid-file fails that file and is replaced."""
+    fifo = tmp_path / "hang.mp3"
+    os.mkfifo(fifo)
+    song = FIXTURES / "Rock" / "test_file.mp3"
+    errors = []
+
+    def extract_fifo():
+        try:
+            pool.extract(fifo)
+        except RuntimeError as e:
+            errors.append(e)
+
+    with WorkerPool() as pool:
+        thread = threading.Thread(target=extract_fifo)
+        thread.start()
+        while not pool._workers:
+            time.sleep(0.01)
+        pool._workers[0].process.kill()
+        thread.join(timeout=10)
+
+        assert len(errors) == 1
+        assert pool.extract(song)[0]["file_path"] == str(song)
+        assert pool.crashes == 1
+
+
+def test_invalid_isolation_settings():
+    """Test that the timeout and memory limit must be positive."""
+    with pytest.raises(ValueError):
+        WorkerPool(timeout=0)
+    with pytest.raises(ValueError):
+        MusicFileExtractor(file_memory_limit=0)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Tests for memory-mapped tag reading."""
+
+import errno
+import io
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from musiclist_for_soundiiz import mmap_reader
+from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.mmap_reader import MappedFile, MmapBackend, filesystem_type
+
+FIXTURES = Path(__file__).parent / "fixtures" / "music"
+
+
+def test_mapped_file_behaves_like_a_file(tmp_path):
+    """Test reads and seeks against a regular file."""
+    path = tmp_path / "data.bin"
+    path.write_bytes(bytes(range(256)) * 4)
+
+    with MappedFile(open(path, "rb")) as mapped, open(path, "rb") as regular:
+        for offset, whence, size in [
+            (0, os.SEEK_SET, 10),
+            (5, os.SEEK_CUR, 100),
+            (-128, os.SEEK_END, 200),
+            (2000, os.SEEK_SET, 10),
+            (0, os.SEEK_SET, -1),
+        ]:
+            assert mapped.seek(offset, whence) == regular.seek(offset, whence)
+            assert mapped.read(size) == regular.read(size)
+            assert mapped.tell() == regular.tell()
+        assert mapped.name == str(path)
+
+        with pytest.raises(ValueError):
+            mapped.seek(-1)
+
+
+def test_large_file_maps_head_and_tail_windows(tmp_path):
+    """Test that only the ends of a large file are mapped and reads still match."""
+    window = mmap_reader.mmap.ALLOCATIONGRANULARITY
+    path = tmp_path / "large.bin"
+    path.write_bytes(os.urandom(window * 5 + 123))
+
+    with MappedFile(open(path, "rb"), window) as mapped, open(path, "rb") as regular:
+        assert [len(view) for _, view in mapped._windows] == [window, window + 123]
+        for offset, size in [
+            (0, 100),  # Head window
+            (window - 10, 20),  # Across the end of the head window
+            (window * 2, 1000),  # Between the windows
+            (window * 4 - 5, 10),  # Across the start of the tail window
+            (window * 5, 200),  # Tail window, past the end
+        ]:
+            mapped.seek(offset)
+            regular.seek(offset)
+            assert mapped.read(size) == regular.read(size)
+            assert mapped.tell() == regular.tell()
+
+
+def test_backend_falls_back_to_regular_reads(tmp_path, monkeypatch):
+    """Test that empty files and files on network filesystems are not mapped."""
+    data = tmp_path / "song.mp3"
+    data.write_bytes(b"ID3" + bytes(100))
+    empty = tmp_path / "empty.mp3"
+    empty.touch()
+
+    backend = MmapBackend()
+    with backend.open(data) as f:
+        assert isinstance(f, MappedFile)
+    with backend.open(empty) as f:
+        assert isinstance(f, io.BufferedReader)
+
+    monkeypatch.setattr(mmap_reader, "filesystem_type", lambda path: "nfs4")
+    with MmapBackend().open(data) as f:
+        assert isinstance(f, io.BufferedReader)
+        assert f.read(3) == b"ID3"
+
+
+def test_backend_reads_normally_without_address_space(tmp_path, monkeypatch):
+    """Test that a mapping failing with ENOMEM (e.g. under a memory limit) falls back."""
+    path = tmp_path / "song.mp3"
+    path.write_bytes(b"ID3" + bytes(100))
+
+    def no_memory(*args, **kwargs):
+        raise OSError(errno.ENOMEM, "Cannot allocate memory")
+
+    monkeypatch.setattr(mmap_reader.mmap, "mmap", no_memory)
+    with MmapBackend().open(path) as f:
+        assert isinstance(f, io.BufferedReader)
+        assert f.read(3) == b"ID3"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc/self/mounts")
+def test_filesystem_type(tmp_path):
+    """Test that the filesystem of a local path is found."""
+    assert filesystem_type(tmp_path)
+
+
+def test_extract_with_mmap_backend():
+    """Test that mapped files give the same metadata for every fixture format."""
+    expected = MusicFileExtractor().extract_all(str(FIXTURES))
+    assert len(expected) == 5
+    assert MusicFileExtractor(read_backend="mmap").extract_all(str(FIXTURES)) == expected
+
+
+def test_invalid_read_backend():
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError):
+        MusicFileExtractor(read_backend="direct")
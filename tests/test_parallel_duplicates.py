@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Tests for hash-partitioned duplicate detection."""
+
+import random
+import time
+
+import pytest
+
+from musiclist_for_soundiiz import parallel_duplicates
+from musiclist_for_soundiiz.duplicate_detector import DuplicateDetector
+from musiclist_for_soundiiz.parallel_duplicates import PartitionedDuplicateDetector
+
+
+def _library(size=2000, seed=5):
+    rng = random.Random(seed)
+    library = []
+    for i in range(size):
+        song = rng.randrange(size // 4)
+        library.append(
+            {
+                "title": f"Song {song}" if rng.random() > 0.3 else f"song {song} ",
+                "artist": f"Artist {song % 11}",
+                "duration": rng.choice(["180", "183", "240", "", "-1"]),
+                "file_path": f"/music/{i}.mp3",
+            }
+        )
+    library.append({"title": "", "artist": "Nobody", "file_path": "/music/x.mp3"})
+    return library
+
+
+@pytest.mark.parametrize("duration_tolerance", [None, 0, 5])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_groups_match_single_process(duration_tolerance, workers, monkeypatch):
+    """Test that partitioned groups are identical to the single-process ones."""
+    monkeypatch.setattr(parallel_duplicates, "BATCH_SIZE", 100)
+    library = _library()
+    detector = DuplicateDetector(duration_tolerance=duration_tolerance)
+
+    expected = detector.build_index(library)
+    index = PartitionedDuplicateDetector(detector, workers=workers).build_index(library)
+
+    assert len(expected) > 0
+    assert index.groups == expected.groups
+    assert index.get_report() == expected.get_report()
+
+
+def test_streaming_add():
+    """Test adding tracks while scanning before building the index."""
+    library = _library(500)
+    detector = DuplicateDetector()
+    with PartitionedDuplicateDetector(detector, workers=2) as partitioned:
+        for metadata in library[:300]:
+            partitioned.add(metadata)
+        index = partitioned.build_index(library)
+
+    assert index.groups == detector.build_index(library).groups
+
+
+def test_added_tracks_must_match_list():
+    """Test that a list shorter than the added tracks is rejected."""
+    library = _library(50)
+    with PartitionedDuplicateDetector(workers=2) as partitioned:
+        for metadata in library:
+            partitioned.add(metadata)
+        with pytest.raises(ValueError):
+            partitioned.build_index(library[:10])
+
+
+def test_fuzzy_falls_back_to_single_process():
+    """Test that fuzzy matching uses the single-process detector."""
+    library = [
+        {"title": "Song (Remastered)", "artist": "Band", "file_path": "/a.mp3"},
+        {"title": "Song", "artist": "Band", "file_path": "/b.mp3"},
+    ]
+    partitioned = PartitionedDuplicateDetector(DuplicateDetector(fuzzy=True), workers=2)
+    assert not partitioned.partitioned
+    assert len(partitioned.build_index(library)) == 1
+
+
+def test_empty_library():
+    """Test building an index without tracks."""
+    assert len(PartitionedDuplicateDetector(workers=2).build_index([])) == 0
+
+
+def test_invalid_workers():
+    """Test that at least one worker is required."""
+    with pytest.raises(ValueError):
+        PartitionedDuplicateDetector(workers=0)
+
+
+def test_parent_does_not_normalize(monkeypatch):
+    """Test that streamed tracks are normalized in the workers, not in the parent."""
+    monkeypatch.setattr(parallel_duplicates, "BATCH_SIZE", 100)
+    library = _library(500)
+    detector = DuplicateDetector()
+    calls = []
+    normalize_key = detector._normalize_key
+    # Forked workers count in their own copy of the list
+    monkeypatch.setattr(
+        detector, "_normalize_key", lambda *args: calls.append(args) or normalize_key(*args)
+    )
+
+    with PartitionedDuplicateDetector(detector, workers=2) as partitioned:
+        for metadata in library:
+            partitioned.add(metadata)
+        index = partitioned.build_index(library)
+
+    assert calls == []
+    assert index.groups == DuplicateDetector().build_index(library).groups
+
+
+def test_parent_work_is_cheaper_than_single_process():
+    """Test that the parent spends much less CPU per track than grouping in one process."""
+    library = _library(100000)
+    detector = DuplicateDetector()
+
+    def cpu_seconds(run):
+        timings = []
+        for _ in range(3):
+            start = time.process_time()
+            run()
+            timings.append(time.process_time() - start)
+        return min(timings)
+
+    single = cpu_seconds(lambda: detector.build_index(library))
+    # process_time() only counts the parent, not the worker processes
+    parent = cpu_seconds(
+        lambda: PartitionedDuplicateDetector(detector, workers=2).build_index(library)
+    )
+
+    assert parent < 0.75 * single
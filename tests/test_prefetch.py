@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Tests for readahead hints during extraction."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from musiclist_for_soundiiz import prefetch
+from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.prefetch import Prefetcher
+
+
+@pytest.fixture
+def advice(monkeypatch):
+    """Record posix_fadvise calls as (file name, advice)."""
+    calls = []
+    names = {}
+    real_open = os.open
+
+    def fake_open(path, flags, *args):
+        fd = real_open(path, flags, *args)
+        names[fd] = Path(path).name
+        return fd
+
+    def fake_fadvise(fd, offset, length, advice_type):
+        calls.append((names[fd], advice_type))
+
+    monkeypatch.setattr(prefetch.os, "open", fake_open)
+    monkeypatch.setattr(prefetch.os, "posix_fadvise", fake_fadvise, raising=False)
+    monkeypatch.setattr(prefetch.os, "POSIX_FADV_WILLNEED", "willneed", raising=False)
+    monkeypatch.setattr(prefetch.os, "POSIX_FADV_DONTNEED", "dontneed", raising=False)
+    return calls
+
+
+def _files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"{i}.mp3"
+        path.write_bytes(b"x")
+        paths.append(path)
+    return paths
+
+
+def test_ahead_hints_depth_files_ahead(tmp_path, advice):
+    """Test that files are hinted depth positions before they are yielded."""
+    prefetcher = Prefetcher(depth=2)
+    paths = _files(tmp_path, 4)
+
+    scanned = prefetcher.ahead(paths)
+    assert next(scanned) == paths[0]
+    assert advice == [("0.mp3", "willneed"), ("1.mp3", "willneed"), ("2.mp3", "willneed")]
+
+    prefetcher.release(paths[0])
+    assert advice[-1] == ("0.mp3", "dontneed")
+    assert list(scanned) == paths[1:]
+
+    prefetcher.close()
+    assert not prefetcher._fds
+
+
+def test_disabled_without_fadvise(tmp_path, monkeypatch):
+    """Test that paths pass through unchanged where posix_fadvise is missing."""
+    monkeypatch.delattr(prefetch.os, "posix_fadvise", raising=False)
+    prefetcher = Prefetcher(depth=4)
+    paths = _files(tmp_path, 3)
+
+    assert not prefetcher.enabled
+    assert list(prefetcher.ahead(paths)) == paths
+    prefetcher.release(paths[0])
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_extract_all_with_prefetch(tmp_path, advice, jobs):
+    """Test that extraction with prefetching hints and releases every file."""
+    source = Path(__file__).parent / "fixtures" / "music" / "Rock" / "test_file.mp3"
+    for i in range(6):
+        (tmp_path / f"Artist - Song {i}.mp3").write_bytes(source.read_bytes())
+
+    expected = MusicFileExtractor().extract_all(str(tmp_path))
+    assert MusicFileExtractor(jobs=jobs, prefetch=2).extract_all(str(tmp_path)) == expected
+
+    assert sorted(name for name, kind in advice if kind == "willneed") == sorted(
+        name for name, kind in advice if kind == "dontneed"
+    )
+    assert len(advice) == 12
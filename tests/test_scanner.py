@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Tests for concurrent scanning of several input directories."""
+
+import os
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+
+from musiclist_for_soundiiz import scanner
+from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.scanner import group_by_device, normalize_roots, scan_roots
+
+_Stat = namedtuple("_Stat", "st_dev")
+
+
+@pytest.fixture
+def fake_devices(monkeypatch):
+    """Map directory names to fake device ids."""
+    devices = {}
+    real_stat = os.stat
+
+    def fake_stat(path, *args, **kwargs):
+        name = os.path.basename(path)
+        return _Stat(devices[name]) if name in devices else real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(scanner.os, "stat", fake_stat)
+    return devices
+
+
+class _RecordingExtractor(MusicFileExtractor):
+    """Extractor that records which thread scanned which directory."""
+
+    def __init__(self, barrier=None):
+        super().__init__()
+        self.barrier = barrier
+        self.threads = {}
+        self.lock = threading.Lock()
+
+    def extract_all(self, directory, recursive=True):
+        with self.lock:
+            self.threads[directory] = threading.current_thread().name
+        if self.barrier is not None and directory in ("b", "d"):
+            # Only passes if both devices are scanned at the same time
+            self.barrier.wait(timeout=5)
+        if directory == "broken":
+            raise PermissionError(directory)
+        return [{"file_path": f"{directory}/song.mp3"}]
+
+
+def test_group_by_device(fake_devices):
+    """Test that directories are grouped by device in the given order."""
+    fake_devices.update({"a": 1, "b": 2, "c": 1})
+    assert group_by_device(["a", "b", "c"]) == {1: [0, 2], 2: [1]}
+
+
+def test_scan_roots_keeps_order(fake_devices):
+    """Test that results come in root order with one thread per device."""
+    fake_devices.update({"a": 1, "b": 2, "c": 1, "d": 3})
+    extractor = _RecordingExtractor(threading.Barrier(2))
+
+    results = list(scan_roots(extractor, ["a", "b", "c", "d"]))
+
+    assert [root for root, _metadata in results] == ["a", "b", "c", "d"]
+    assert results[2][1] == [{"file_path": "c/song.mp3"}]
+    assert extractor.threads["a"] == extractor.threads["c"]
+    assert extractor.threads["b"] != extractor.threads["d"]
+
+
+def test_scan_roots_raises_in_order(fake_devices):
+    """Test that a scan error is raised when its directory is reached."""
+    fake_devices.update({"a": 1, "broken": 2})
+    scanned = scan_roots(_RecordingExtractor(), ["a", "broken"])
+
+    assert next(scanned)[0] == "a"
+    with pytest.raises(PermissionError):
+        next(scanned)
+
+
+def test_scan_roots_real_directories():
+    """Test scanning real directories."""
+    fixtures_dir = Path(__file__).parent / "fixtures" / "music"
+    extractor = MusicFileExtractor()
+    results = list(scan_roots(extractor, [str(fixtures_dir), str(fixtures_dir / "Rock")]))
+
+    assert len(results) == 2
+    assert results[0][1] == extractor.extract_all(str(fixtures_dir))
+
+
+def test_normalize_roots(tmp_path):
+    """Test that repeated and nested roots are dropped and kept roots are not resolved."""
+    (tmp_path / "music" / "rock").mkdir(parents=True)
+    (tmp_path / "other").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "music")
+    rock, other, link, music = (
+        str(tmp_path / "music" / "rock"),
+        str(tmp_path / "other"),
+        str(tmp_path / "link"),
+        str(tmp_path / "music"),
+    )
+
+    roots = [rock, other, link, music]
+
+    assert normalize_roots(roots) == [other, link]
+    assert normalize_roots(roots, recursive=False) == [rock, other, link]
+
+
+def test_normalize_roots_keeps_relative_paths(tmp_path, monkeypatch):
+    """Test that relative roots are returned as given."""
+    (tmp_path / "music" / "rock").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    assert normalize_roots(["music/rock", "music", "./music"]) == ["music"]
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Tests for disk-order scheduling of file reads."""
+
+import errno
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from musiclist_for_soundiiz import schedule as schedule_module
+from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.schedule import (
+    SCHEDULES,
+    benchmark_schedules,
+    iter_schedule,
+    physical_offset,
+    schedule_order,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "music"
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Files whose inodes are not in path order."""
+    paths = []
+    for name in ["d.mp3", "b.mp3", "c.mp3", "a.mp3"]:
+        path = tmp_path / name
+        path.write_bytes(os.urandom(8192))
+        paths.append(path)
+    return sorted(paths)
+
+
+def test_path_schedule_keeps_order(files):
+    """Test that the path schedule is the identity."""
+    assert schedule_order(files, "path") == [0, 1, 2, 3]
+
+
+def test_inode_schedule(files):
+    """Test that the inode schedule sorts by inode number."""
+    order = schedule_order(files, "inode")
+
+    assert sorted(order) == [0, 1, 2, 3]
+    inodes = [os.stat(files[index]).st_ino for index in order]
+    assert inodes == sorted(inodes)
+
+
+def test_physical_schedule(files):
+    """Test that the physical schedule sorts by disk offset where available."""
+    order = schedule_order(files, "physical")
+
+    assert sorted(order) == [0, 1, 2, 3]
+    offsets = [physical_offset(files[index]) for index in order]
+    if None not in offsets:
+        assert offsets == sorted(offsets)
+
+
+def test_physical_offset_of_empty_file(tmp_path):
+    """Test that files without extents have no offset."""
+    path = tmp_path / "empty.mp3"
+    path.touch()
+    assert physical_offset(path) is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="FIEMAP is Linux only")
+def test_file_without_offset_keeps_fiemap(files, monkeypatch):
+    """Test that a file without a located extent does not disable FIEMAP for the device."""
+    offsets = {files[0]: None, files[1]: 300, files[2]: 100, files[3]: 200}
+    calls = []
+
+    def fiemap(file_path):
+        calls.append(file_path)
+        return offsets[file_path]
+
+    monkeypatch.setattr(schedule_module, "_fiemap", fiemap)
+
+    assert schedule_order(files, "physical") == [2, 3, 1, 0]
+    assert calls == files
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="FIEMAP is Linux only")
+def test_unsupported_fiemap_falls_back_to_inode_order(files, monkeypatch):
+    """Test that an unsupported ioctl is tried once per device."""
+    calls = []
+
+    def fiemap(file_path):
+        calls.append(file_path)
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(schedule_module, "_fiemap", fiemap)
+
+    assert schedule_order(files, "physical") == schedule_order(files, "inode")
+    assert len(calls) == 1
+
+
+def test_iter_schedule_orders_batches(files):
+    """Test that files are ordered within consecutive batches."""
+    order = list(iter_schedule(files, "inode", batch_size=3))
+
+    assert order == schedule_order(files[:3], "inode") + [3]
+    with pytest.raises(ValueError):
+        list(iter_schedule(files, "inode", batch_size=0))
+
+
+def test_unknown_schedule(files):
+    """Test that unknown schedules are rejected."""
+    with pytest.raises(ValueError):
+        schedule_order(files, "random")
+    with pytest.raises(ValueError):
+        MusicFileExtractor(schedule="random")
+
+
+@pytest.mark.parametrize("schedule", ["inode", "physical"])
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_extract_all_restores_canonical_order(schedule, jobs):
+    """Test that scheduled extraction returns metadata in path order."""
+    expected = MusicFileExtractor().extract_all(str(FIXTURES))
+    extractor = MusicFileExtractor(schedule=schedule, jobs=jobs)
+
+    assert extractor.extract_all(str(FIXTURES)) == expected
+
+
+def test_benchmark_schedules(files):
+    """Test that every schedule is measured."""
+    results = benchmark_schedules(files)
+
+    assert set(results) == set(SCHEDULES)
+    assert all(result["files_per_sec"] > 0 for result in results.values())
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Tests for diffing the library against a Soundiiz CSV."""
+
+import pytest
+
+from musiclist_for_soundiiz.exporter import CSVExporter
+from musiclist_for_soundiiz.soundiiz_diff import SoundiizIndex, diff_library, normalize_isrc
+
+
+@pytest.fixture
+def remote_csv(tmp_path):
+    """Soundiiz CSV with one ISRC-tagged and two untagged entries."""
+    remote = [
+        {"title": "Song A", "artist": "Artist 1", "album": "Album 1", "isrc": "US-AB1-20-00001"},
+        {"title": "Song B", "artist": "Artist 2", "album": "Album 2", "isrc": ""},
+        {"title": "Remote Only", "artist": "Artist 9", "album": "Album 9", "isrc": ""},
+    ]
+    path = tmp_path / "soundiiz.csv"
+    CSVExporter().export(remote, str(path))
+    return str(path)
+
+
+def test_normalize_isrc():
+    """Test ISRC normalization."""
+    assert normalize_isrc("us-ab1-20-00001 ") == "USAB12000001"
+    assert normalize_isrc("") == ""
+    assert normalize_isrc(None) == ""
+
+
+def test_diff_library(remote_csv):
+    """Test local-missing and remote-only results."""
+    local = [
+        # Matched by ISRC despite different tags
+        {"title": "Song A (Remaster)", "artist": "Artist 1", "isrc": "USAB12000001"},
+        # Matched by title|artist
+        {"title": "song b", "artist": "ARTIST 2", "isrc": ""},
+        # Not in the CSV
+        {"title": "Local Only", "artist": "Artist 5", "isrc": ""},
+    ]
+
+    local_missing, remote_only = diff_library(local, remote_csv)
+
+    assert [t["title"] for t in local_missing] == ["Local Only"]
+    assert [t["title"] for t in remote_only] == ["Remote Only"]
+
+
+def test_isrc_mismatch_does_not_fall_back_to_tagged_rows(remote_csv):
+    """Test that a different ISRC is not matched through title|artist."""
+    index = SoundiizIndex.from_csv(remote_csv)
+
+    assert not index.match({"title": "Song A", "artist": "Artist 1", "isrc": "GBXYZ9900001"})
+    assert index.match({"title": "Song A", "artist": "Artist 1", "isrc": ""})
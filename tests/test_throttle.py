@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Tests for scan rate limits."""
+
+import io
+import logging
+import threading
+from pathlib import Path
+
+import pytest
+
+from musiclist_for_soundiiz.extractor import MusicFileExtractor
+from musiclist_for_soundiiz.throttle import MB, Throttle, ThrottledFile, TokenBucket
+
+FIXTURES = Path(__file__).parent / "fixtures" / "music"
+
+
+class FakeClock:
+    """Clock whose time only moves when sleeping."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_paces_after_burst():
+    """Test that calls beyond the burst are spaced evenly at the rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(10, burst=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(6)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.1] * 4)
+    assert clock.now == pytest.approx(0.4)
+
+
+def test_token_bucket_large_request_waits_proportionally():
+    """Test that a request larger than the burst waits for its whole debt."""
+    clock = FakeClock()
+    bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+
+    assert bucket.burst == 10
+    assert bucket.acquire(60) == pytest.approx(0.5)
+    # Idle time refills at most a burst
+    clock.now += 10
+    assert bucket.acquire(10) == 0.0
+    assert bucket.acquire(10) == pytest.approx(0.1)
+
+
+def test_token_bucket_shared_by_threads():
+    """Test that concurrent callers together stay at the rate."""
+    clock = FakeClock()
+    lock = threading.Lock()
+
+    def sleep(seconds):
+        with lock:
+            clock.sleeps.append(seconds)
+
+    bucket = TokenBucket(10, burst=1, clock=clock, sleep=sleep)
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # With time frozen, each caller queues behind the previous ones
+    assert sorted(clock.sleeps) == pytest.approx([0.1, 0.2, 0.3, 0.4])
+
+
+def test_invalid_limits():
+    """Test that limits must be positive."""
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    with pytest.raises(ValueError):
+        Throttle(max_read_mbps=-1)
+    with pytest.raises(ValueError):
+        MusicFileExtractor(max_files_per_sec=0)
+
+
+def test_throttled_file_counts_and_limits_reads():
+    """Test that reads are charged to the byte limit and counted."""
+    clock = FakeClock()
+    throttle = Throttle(max_read_mbps=1, clock=clock, sleep=clock.sleep)
+    raw = io.BytesIO(bytes(2 * MB))
+    raw.name = "song.mp3"
+
+    with ThrottledFile(raw, throttle) as f:
+        assert f.read(MB // 2) == bytes(MB // 2)
+        f.seek(-10, io.SEEK_END)
+        assert f.tell() == 2 * MB - 10
+        assert len(f.read()) == 10
+
+    assert throttle.bytes_read == MB // 2 + 10
+    assert clock.now == pytest.approx(0.4, abs=0.01)
+    assert raw.closed
+
+
+def test_throttle_reports_effective_rate(caplog):
+    """Test the periodic progress message with the effective rate."""
+    clock = FakeClock()
+    throttle = Throttle(max_files_per_sec=4, report_interval=1, clock=clock, sleep=clock.sleep)
+
+    with caplog.at_level(logging.INFO, logger="musiclist_for_soundiiz.throttle"):
+        for _ in range(8):
+            throttle.open_file()
+        throttle.count(MB)
+
+    assert throttle.files_read == 8
+    assert any("Throttled scan" in message for message in caplog.messages)
+    assert throttle.summary() == f"{8 / clock.now:.1f} files/s, {1 / clock.now:.2f} MB/s"
+
+
+def test_extractor_with_limits_returns_same_metadata():
+    """Test that throttled extraction reads every file and returns the same metadata."""
+    expected = MusicFileExtractor().extract_all(str(FIXTURES))
+
+    for read_backend in ("read", "mmap"):
+        extractor = MusicFileExtractor(
+            jobs=2, read_backend=read_backend, max_read_mbps=1000, max_files_per_sec=1000
+        )
+        assert extractor.extract_all(str(FIXTURES)) == expected
+        assert extractor.throttle.files_read == len(expected)
+        assert extractor.throttle.bytes_read > 0